@@ -1 +1,2 @@
 from . import discrete
+from . import linear
@@ -1,5 +1,16 @@
+from .value_table import ValueTable, UncachedValueTable
+from .base_agent import BaseAgent
 from .random_agent import RandomAgent
 from .player import PlayerAgent
 from .monte_carlo import MonteCarloAgent
 from .td_zero import TDZeroAgent
 from .td_lambda import TDLambdaAgent
+from .q_learning import QLearningAgent, ExpectedSarsaAgent
+from .trajectory import TrajectoryBuffer, Transitions
+from .dynamic_programming import DynamicProgrammingAgent, VALUE_ITERATION, POLICY_ITERATION
+from .traces import EligibilityTrace, ACCUMULATING, REPLACING
+from .priority_queue import IndexedPriorityQueue
+from .prioritized_sweeping import PrioritizedSweepingAgent
+from .dyna import DynaModel
+from .exploration import EpsilonGreedy, VisitCountEpsilonGreedy, Boltzmann, UCB
+from .step_sizes import ConstantStepSize, VisitCountStepSize, HarmonicStepSize, AdaptiveStepSize
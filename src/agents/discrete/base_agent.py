@@ -1,16 +1,72 @@
 """
 Base agent for running in a discrete environment
 """
-import random
+import json
+import os
+
+import numpy as np
+
+from .exploration import EpsilonGreedy, VisitCountEpsilonGreedy, Boltzmann, UCB
+from .step_sizes import ConstantStepSize, VisitCountStepSize, HarmonicStepSize, AdaptiveStepSize
+from .value_table import ValueTable
+
+# How many uniform draws to take from the generator at a time
+DRAW_BATCH_SIZE = 1024
+
+# Exploration and step size classes by name, for rebuilding them from checkpoints
+COMPONENT_CLASSES = {
+    cls.__name__: cls for cls in (
+        EpsilonGreedy, VisitCountEpsilonGreedy, Boltzmann, UCB,
+        ConstantStepSize, VisitCountStepSize, HarmonicStepSize, AdaptiveStepSize,
+    )
+}
 
 
 class BaseAgent:
 
-    def __init__(self, gamma=0, alpha=0, lambd=0):
+    # Attributes which describe the episode in progress.
+    # When running a batch of environments, each one gets its own copy.
+    EPISODE_ATTRS = ('episode_return',)
+    # Constructor arguments, which are saved in checkpoints
+    HYPERPARAMETERS = ('gamma', 'alpha', 'lambd')
+    # Constructor arguments which are exploration or step size objects,
+    # saved in checkpoints as their class name and settings
+    COMPONENTS = ('exploration', 'step_size')
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, exploration=None, step_size=None):
         self.gamma = gamma
         self.alpha = alpha
         self.lambd = lambd
+        # Picks actions from the values, see exploration.py
+        self.exploration = exploration or EpsilonGreedy()
+        # Says how far to move each value, see step_sizes.py
+        self.step_size = step_size or ConstantStepSize()
         self.episodes = 0
+        # Most recent TD error, or the like, for telemetry to read
+        self.td_error = None
+        self.seed()
+
+    def seed(self, seed=None):
+        """
+        Give the agent its own random generator, from an int, a SeedSequence,
+        or None for fresh entropy. All of the agent's randomness comes from it.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.uniforms = []
+        self.uniform_index = 0
+
+    def draw_uniform(self):
+        """
+        A uniform draw in [0, 1). Draws are taken from the generator in batches,
+        since asking NumPy for one number at a time costs more than the number.
+        """
+        i = self.uniform_index
+        if i == len(self.uniforms):
+            self.uniforms = self.rng.random(DRAW_BATCH_SIZE).tolist()
+            i = 0
+
+        self.uniform_index = i + 1
+        return self.uniforms[i]
 
     def start_environment(self, env):
         """
@@ -18,6 +74,14 @@ class BaseAgent:
         """
         self.states = [s for s in range(env.observation_space.n)]
         self.actions = [a for a in range(env.action_space.n)]
+        self.exploration.start_environment(self)
+        self.step_size.start_environment(self)
+
+    def make_table(self, initial=0, dtype=float):
+        """
+        Create a dense state-action table sized for the current environment
+        """
+        return ValueTable(len(self.states), len(self.actions), initial, dtype)
 
     def start_episode(self):
         """
@@ -25,6 +89,7 @@ class BaseAgent:
         """
         self.episodes += 1
         self.episode_return = 0
+        self.exploration.start_episode(self.episodes)
 
     def observe(self, observation):
         """
@@ -38,19 +103,29 @@ class BaseAgent:
         """
         return self.get_action_randomly()
 
-    def get_action_greedily(self, state):
-        best_action = None
-        best_value = float('-inf')
-        for possible_action in self.actions:
-            action_value = self.values[state][possible_action]
-            if action_value > best_value:
-                best_value = self.values[state][possible_action]
-                best_action = possible_action
+    def get_epsilon(self):
+        """
+        Current exploration rate, or None if the exploration policy doesn't have one
+        """
+        return self.exploration.get_epsilon()
 
-        return best_action
+    def get_action_greedily(self, state):
+        return self.values.argmax(state)
 
     def get_action_randomly(self):
-        return random.choice(self.actions)
+        return self.actions[int(self.draw_uniform() * len(self.actions))]
+
+    def get_actions_epsilon_greedily(self, states, epsilon):
+        """
+        Batched epsilon-greedy selection, one action per state
+        """
+        actions = self.values.array[states].argmax(axis=1)
+        explore = self.rng.random(len(states)) < epsilon
+        num_explore = explore.sum()
+        if num_explore:
+            actions[explore] = self.rng.integers(len(self.actions), size=num_explore)
+
+        return actions
 
     def receive_reward(self, reward):
         """
@@ -58,18 +133,50 @@ class BaseAgent:
         """
         self.episode_return += reward
 
+    def bootstrap_values(self, next_states):
+        """
+        Value of the greedy policy in each next state (or a single next state)
+        """
+        return self.values.array[next_states].max(axis=-1)
+
+    def replay(self, transitions):
+        """
+        Off-policy one-step Q-learning update from a batch of stored transitions,
+        so experience can be reused without stepping the environment again.
+        Transitions are sampled with replacement, so a pair which comes up
+        several times moves by the mean of its updates.
+        Returns the TD errors.
+        """
+        values = self.values.array
+        states, actions = transitions.states, transitions.actions
+        next_values = np.where(transitions.dones, 0, self.bootstrap_values(transitions.next_states))
+        td_errors = transitions.rewards + self.gamma * next_values - values[states, actions]
+        self.values.add_mean(states, actions, self.step_size.batch(states, actions, td_errors) * td_errors)
+        return td_errors
+
+    def plan(self, state, action, reward, next_state, done):
+        """
+        Dyna-Q: remember a real transition in the model,
+        then learn from a batch of `planning_steps` simulated ones
+        """
+        self.model.add(state, action, reward, next_state, done)
+        self.replay(self.model.sample(self.planning_steps, self.rng))
+
     def print_values(self):
         """
         Print tabular value function as a table for debugging
         """
-        values = getattr(self, 'values', {})
-        action_names = getattr(self, 'ACTION_NAMES')
+        values = getattr(self, 'values', None)
+        if values is None:
+            return
+
+        action_names = getattr(self, 'ACTION_NAMES', None)
         if action_names:
             print('\t\t' + '\t\t'.join(action_names))
         print('\t\t'.join(['STATE', *[str(a) for a in self.actions]]))
-        for state, actions in values.items():
-            sorted_actions = [actions[a] for a in self.actions]
-            print('\t\t'.join(['{}'] + ['{:.2f}' for _ in self.actions]).format(state, *sorted_actions))
+        row_format = '\t\t'.join(['{}'] + ['{:.2f}' for _ in self.actions])
+        for state, row in values.items():
+            print(row_format.format(state, *row.tolist()))
 
     def finish_episode(self, final_observation):
         """
@@ -77,3 +184,166 @@ class BaseAgent:
         """
         return self.episode_return
 
+
+    def start_batch(self, num_envs):
+        """
+        Prepare to run episodes in num_envs environments in lockstep
+        """
+        self.batch_episodes = [None] * num_envs
+
+    def start_episodes(self, env_ids):
+        """
+        Start a new episode in each of the given environments
+        """
+        for env_id in env_ids:
+            if self.batch_episodes[env_id] is not None:
+                # Let the new episode reuse anything kept from the last one
+                self.load_episode(env_id)
+
+            self.start_episode()
+            self.batch_episodes[env_id] = self.save_episode()
+
+    def get_next_actions(self, observations, env_ids=None):
+        """
+        Observe one observation per environment, and return one action per environment.
+        Given `env_ids`, the observations are from just those environments, in that order.
+        Agents with a vectorized implementation (TD(0), TD(lambda), Monte Carlo, Q-learning
+        and Expected SARSA) override the batched methods. This fallback swaps each
+        environment's episode state in and out, which is slower than running a single
+        environment, so it's only there so every agent works with the batched runner.
+        """
+        actions = np.empty(len(observations), dtype=np.int64)
+        env_ids = range(len(observations)) if env_ids is None else env_ids
+        for i, (env_id, observation) in enumerate(zip(env_ids, observations)):
+            self.load_episode(env_id)
+            self.observe(observation)
+            actions[i] = self.get_next_action()
+            self.batch_episodes[env_id] = self.save_episode()
+
+        return actions
+
+    def receive_rewards(self, rewards, env_ids=None):
+        """
+        Receive one reward per environment, or per environment in `env_ids`
+        """
+        env_ids = range(len(rewards)) if env_ids is None else env_ids
+        for env_id, reward in zip(env_ids, rewards):
+            self.load_episode(env_id)
+            self.receive_reward(reward)
+            self.batch_episodes[env_id] = self.save_episode()
+
+    def finish_episodes(self, env_ids, final_observations):
+        """
+        Finish the episodes in the given environments
+        Returns an array of episode returns
+        """
+        returns = np.empty(len(env_ids))
+        for i, (env_id, final_observation) in enumerate(zip(env_ids, final_observations)):
+            self.load_episode(env_id)
+            returns[i] = self.finish_episode(final_observation)
+            self.batch_episodes[env_id] = self.save_episode()
+
+        return returns
+
+    def save_episode(self):
+        return {attr: getattr(self, attr) for attr in self.EPISODE_ATTRS}
+
+    def load_episode(self, env_id):
+        self.__dict__.update(self.batch_episodes[env_id])
+
+    def get_components(self):
+        """
+        The exploration policy and step size to rebuild this agent with
+        """
+        return {name: getattr(self, name) for name in self.COMPONENTS}
+
+    def save(self, path, **extra):
+        """
+        Save every state-action table, the episode count, hyperparameters and
+        components to an uncompressed .npz file, along with any extra arrays.
+        Written to a temporary file first, so a crash never leaves a broken checkpoint.
+        """
+        meta = {
+            'agent': type(self).__name__,
+            'episodes': self.episodes,
+            'hyperparameters': {name: getattr(self, name) for name in self.HYPERPARAMETERS},
+            'components': {
+                name: {
+                    'class': type(component).__name__,
+                    'settings': {setting: getattr(component, setting) for setting in component.SETTINGS},
+                }
+                for name, component in self.get_components().items()
+            },
+        }
+        arrays = {
+            'table_' + name: table.array
+            for name, table in vars(self).items() if isinstance(table, ValueTable)
+        }
+        arrays.update({'extra_' + name: np.asarray(value) for name, value in extra.items()})
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """
+        Restore tables and counters saved by `save` into this agent
+        Returns a dict of the extra arrays that were saved
+        """
+        extra = {}
+        with np.load(path) as checkpoint:
+            meta = json.loads(checkpoint['meta'].item())
+            for key in checkpoint.files:
+                if key.startswith('table_'):
+                    setattr(self, key[len('table_'):], ValueTable.from_array(checkpoint[key]))
+                elif key.startswith('extra_'):
+                    extra[key[len('extra_'):]] = checkpoint[key]
+
+        for name, value in meta['hyperparameters'].items():
+            setattr(self, name, value)
+
+        self.episodes = meta['episodes']
+        table = getattr(self, 'values', None)
+        if table is not None and not hasattr(self, 'states'):
+            self.states = list(range(table.num_states))
+            self.actions = list(range(table.num_actions))
+
+        for component in (self.exploration, self.step_size):
+            # Only make a component's tables if the checkpoint didn't have them,
+            # so restored counts aren't wiped
+            if not all(hasattr(self, name) for name in component.TABLES):
+                component.start_environment(self)
+
+            component.load(self)
+
+        return extra
+
+    @classmethod
+    def from_checkpoint(cls, path):
+        """
+        Create an agent of whichever class saved the checkpoint, and restore it
+        """
+        with np.load(path) as checkpoint:
+            meta = json.loads(checkpoint['meta'].item())
+
+        agent_class = find_subclass(cls, meta['agent'])
+        components = {
+            name: COMPONENT_CLASSES[component['class']](**component['settings'])
+            for name, component in meta.get('components', {}).items()
+        }
+        agent = agent_class(**meta['hyperparameters'], **components)
+        agent.load(path)
+        return agent
+
+
+def find_subclass(cls, name):
+    if cls.__name__ == name:
+        return cls
+
+    for subclass in cls.__subclasses__():
+        found = find_subclass(subclass, name)
+        if found:
+            return found
+
+    return None
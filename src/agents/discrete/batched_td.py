@@ -0,0 +1,89 @@
+"""
+Batched episode bookkeeping shared by the on-policy TD agents
+"""
+import numpy as np
+
+from .base_agent import BaseAgent
+
+
+class BatchedTDAgent(BaseAgent):
+    """
+    Runs a batch of environments for agents which learn from each step's
+    (state, action, reward, next state, next action), like TD(0) and TD(lambda).
+    Every environment's episode state is kept in arrays, where -1 (or NaN for
+    rewards) stands in for None, and subclasses learn in `update_batch`.
+    """
+
+    def start_batch(self, num_envs):
+        self.batch_obs = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_prev_obs = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_action = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_prev_action = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_reward = np.full(num_envs, np.nan)
+        self.batch_prev_reward = np.full(num_envs, np.nan)
+        self.batch_returns = np.zeros(num_envs)
+
+    def start_episodes(self, env_ids):
+        self.episodes += len(env_ids)
+        self.exploration.start_episode(self.episodes)
+        self.batch_obs[env_ids] = -1
+        self.batch_action[env_ids] = -1
+        self.batch_reward[env_ids] = np.nan
+        self.batch_returns[env_ids] = 0
+
+    def get_next_actions(self, observations, env_ids=None):
+        ids = slice(None) if env_ids is None else env_ids
+        self.batch_prev_obs[ids] = self.batch_obs[ids]
+        self.batch_obs[ids] = observations
+        actions = self.exploration.select_batch(self, self.batch_obs[ids])
+        self.batch_prev_action[ids] = self.batch_action[ids]
+        self.batch_action[ids] = actions
+        return actions
+
+    def receive_rewards(self, rewards, env_ids=None):
+        ids = slice(None) if env_ids is None else env_ids
+        self.batch_returns[ids] += rewards
+        self.batch_prev_reward[ids] = self.batch_reward[ids]
+        self.batch_reward[ids] = rewards
+        self.update_batch(np.arange(len(rewards)) if env_ids is None else np.asarray(env_ids))
+
+    def update_batch(self, env_ids):
+        """
+        Learn from the step each of the given environments just took
+        """
+        raise NotImplementedError
+
+    def get_updates(self, env_ids):
+        """
+        The previous and current state-action pairs, and the reward between them,
+        of each of the given environments which has a step to learn from.
+        Returns (env_ids, prev_states, prev_actions, rewards, states, actions), or None
+        """
+        prev_state, prev_action = self.batch_prev_obs[env_ids], self.batch_prev_action[env_ids]
+        prev_reward = self.batch_prev_reward[env_ids]
+        should_update = (prev_state >= 0) & (prev_action >= 0) & ~np.isnan(prev_reward)
+        if not should_update.any():
+            return None
+
+        env_ids = env_ids[should_update]
+        return (
+            env_ids, prev_state[should_update], prev_action[should_update], prev_reward[should_update],
+            self.batch_obs[env_ids], self.batch_action[env_ids],
+        )
+
+    def finish_episodes(self, env_ids, final_observations):
+        """
+        Perform the final update for each finished environment
+        Returns an array of episode returns
+        """
+        env_ids = np.asarray(env_ids)
+        self.values[final_observations] = 0
+        self.batch_prev_obs[env_ids] = self.batch_obs[env_ids]
+        self.batch_obs[env_ids] = final_observations
+        # Dummy action in the terminal state, its value is zero anyway
+        self.batch_prev_action[env_ids] = self.batch_action[env_ids]
+        self.batch_action[env_ids] = 0
+        self.batch_prev_reward[env_ids] = self.batch_reward[env_ids]
+        self.batch_reward[env_ids] = 0
+        self.update_batch(env_ids)
+        return self.batch_returns[env_ids].copy()
@@ -0,0 +1,69 @@
+"""
+Learned sample model for Dyna-Q planning
+"""
+import numpy as np
+
+from .trajectory import Transitions
+
+
+class DynaModel:
+    """
+    Remembers the last `outcomes` observed (next state, reward, done) outcomes of
+    every state-action pair in fixed size arrays, and replays them as simulated
+    experience. Keeping a few outcomes per pair, instead of only the last one,
+    lets the samples follow the odds of a stochastic environment.
+    """
+
+    def __init__(self, num_states, num_actions, outcomes=32):
+        size = num_states * num_actions
+        self.num_actions = num_actions
+        self.outcomes = outcomes
+        self.next_states = np.zeros((size, outcomes), dtype=np.int32)
+        self.rewards = np.zeros((size, outcomes), dtype=np.float32)
+        self.dones = np.zeros((size, outcomes), dtype=np.bool_)
+        self.counts = np.zeros(size, dtype=np.int64)  # Outcomes seen for each pair
+        # Flat keys of every pair seen so far, so samples only come from real experience
+        self.observed = np.empty(size, dtype=np.int64)
+        self.num_observed = 0
+
+    def __len__(self):
+        return self.num_observed
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Remember an outcome, replacing the pair's oldest once its slots are full
+        """
+        key = state * self.num_actions + action
+        count = self.counts[key]
+        if count == 0:
+            self.observed[self.num_observed] = key
+            self.num_observed += 1
+
+        slot = count % self.outcomes
+        self.next_states[key, slot] = next_state
+        self.rewards[key, slot] = reward
+        self.dones[key, slot] = done
+        self.counts[key] = count + 1
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Remember one outcome from each environment of a vectorized environment
+        """
+        for transition in zip(states.tolist(), actions.tolist(), rewards.tolist(),
+                              next_states.tolist(), dones.tolist()):
+            self.add(*transition)
+
+    def sample(self, batch_size, rng=None):
+        """
+        Simulate a batch of transitions with a NumPy Generator: pick observed pairs
+        uniformly, then one of each pair's remembered outcomes
+        """
+        assert self.num_observed > 0, 'Cannot sample from an empty model'
+        rng = rng or np.random.default_rng()
+        keys = self.observed[rng.integers(self.num_observed, size=batch_size)]
+        filled = np.minimum(self.counts[keys], self.outcomes)
+        slots = (rng.random(batch_size) * filled).astype(np.int64)
+        states, actions = np.divmod(keys, self.num_actions)
+        return Transitions(
+            states, actions, self.rewards[keys, slots], self.next_states[keys, slots], self.dones[keys, slots],
+        )
@@ -0,0 +1,118 @@
+"""
+Model-based dynamic programming solution to discrete environments,
+planning with the environment's transition model instead of sampling episodes
+"""
+import numpy as np
+
+from ...envs.tables import TransitionTable
+from .base_agent import BaseAgent
+
+VALUE_ITERATION = 'value_iteration'
+POLICY_ITERATION = 'policy_iteration'
+
+
+class DynamicProgrammingAgent(BaseAgent):
+
+    ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + ('obs',)
+    HYPERPARAMETERS = ('gamma', 'method', 'tolerance', 'max_iterations')
+    # Plans instead of exploring or taking steps
+    COMPONENTS = ()
+
+    def __init__(self, gamma=0, method=VALUE_ITERATION, tolerance=1e-8, max_iterations=10 * 1000):
+        super().__init__(gamma)
+        assert method in (VALUE_ITERATION, POLICY_ITERATION), 'Unknown method {}'.format(method)
+        self.method = method
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def start_environment(self, env):
+        """
+        Setup observation space and solve the environment's transition model
+        """
+        super().start_environment(env)
+        self.set_model(TransitionTable.from_env(env))
+        self.values = self.make_table(0)
+        self.iterations = self.solve()
+
+    def set_model(self, table):
+        """
+        Precompute the parts of the Bellman backup which don't depend on the values
+        """
+        self.model = table
+        # Expected immediate reward for each state-action pair
+        self.expected_rewards = (table.probs * table.rewards).sum(axis=-1)
+        # Probability of each outcome which doesn't end the episode
+        self.continue_probs = np.where(table.dones, 0, table.probs)
+
+    def backup(self, state_values):
+        """
+        Bellman backup of every state-action value from a vector of state values
+        """
+        next_values = state_values[self.model.next_states]
+        return self.expected_rewards + self.gamma * (self.continue_probs * next_values).sum(axis=-1)
+
+    def solve(self):
+        """
+        Fill in the action-value table, returns the number of sweeps it took
+        """
+        if self.method == POLICY_ITERATION:
+            return self.policy_iteration()
+
+        return self.value_iteration()
+
+    def value_iteration(self):
+        state_values = np.zeros(len(self.states))
+        for iteration in range(1, self.max_iterations + 1):
+            action_values = self.backup(state_values)
+            new_state_values = action_values.max(axis=1)
+            delta = np.abs(new_state_values - state_values).max()
+            state_values = new_state_values
+            if delta < self.tolerance:
+                break
+
+        self.values.array[:] = self.backup(state_values)
+        self.values.invalidate()
+        return iteration
+
+    def policy_iteration(self):
+        all_states = np.arange(len(self.states))
+        policy = np.zeros(len(self.states), dtype=np.int64)
+        state_values = np.zeros(len(self.states))
+        iterations = 0
+        while iterations < self.max_iterations:
+            # Evaluate the current policy, starting from the last estimate
+            while iterations < self.max_iterations:
+                iterations += 1
+                new_state_values = self.backup(state_values)[all_states, policy]
+                delta = np.abs(new_state_values - state_values).max()
+                state_values = new_state_values
+                if delta < self.tolerance:
+                    break
+
+            # Improve the policy greedily, keeping the old action on ties
+            action_values = self.backup(state_values)
+            best_values = action_values.max(axis=1)
+            is_stable = action_values[all_states, policy] >= best_values - self.tolerance
+            if is_stable.all():
+                break
+
+            policy = np.where(is_stable, policy, action_values.argmax(axis=1))
+
+        self.values.array[:] = self.backup(state_values)
+        self.values.invalidate()
+        return iterations
+
+    def warm_start(self, agent):
+        """
+        Copy the planned action values into another tabular agent,
+        which must have already started the same environment
+        """
+        agent.values.array[:] = self.values.array
+        agent.values.invalidate()
+
+    def observe(self, obs):
+        self.obs = obs
+
+    def get_next_action(self):
+        return self.get_action_greedily(self.obs)
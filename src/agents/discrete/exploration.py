@@ -0,0 +1,211 @@
+"""
+Exploration policies, which pick an agent's next action from its action values.
+
+Every policy follows a schedule which is worked out once per episode (or looked
+up from a precomputed table), so choosing an action is cheap. Greedy actions
+come from the value table's per-state cache. Like step sizes, any visit counts
+are kept in tables on the agent, named in `TABLES`, so they're saved in checkpoints.
+"""
+import numpy as np
+
+from .value_table import ValueTable
+
+
+class EpsilonGreedy:
+    """
+    Takes a random action with probability epsilon, otherwise the greedy one.
+    Epsilon decays with the episode count as max(floor, 1 / episodes**power).
+    """
+
+    # Constructor arguments, which are saved in checkpoints
+    SETTINGS = ('floor', 'power')
+    # Tables this policy keeps on the agent
+    TABLES = ()
+
+    def __init__(self, floor=0.05, power=0.4):
+        self.floor = floor
+        self.power = power
+        self.epsilon = 1.0
+
+    def start_environment(self, agent):
+        pass
+
+    def load(self, agent):
+        pass
+
+    def start_episode(self, episode):
+        self.epsilon = max(self.floor, 1 / max(episode, 1)**self.power)
+
+    def get_epsilon(self, state=None):
+        return self.epsilon
+
+    def select(self, agent, state):
+        if agent.draw_uniform() >= self.epsilon:
+            return agent.values.argmax(state)
+
+        return agent.get_action_randomly()
+
+    def select_batch(self, agent, states):
+        return agent.get_actions_epsilon_greedily(states, self.epsilon)
+
+    def get_epsilons(self, states):
+        """
+        Epsilon for each of an array of states
+        """
+        return np.full(np.shape(states), self.epsilon)
+
+    def probabilities(self, agent, states):
+        """
+        Probability of each action in each of an array of states, shape (states, actions)
+        """
+        values = agent.values.array[states]
+        num_actions = values.shape[-1]
+        epsilon = self.get_epsilons(states)[..., None]
+        is_greedy = np.arange(num_actions) == values.argmax(axis=-1)[..., None]
+        return epsilon / num_actions + (1 - epsilon) * is_greedy
+
+
+class VisitCountEpsilonGreedy(EpsilonGreedy):
+    """
+    Keeps a separate epsilon for each state, decaying with how many times
+    that state has been visited, so rarely seen states are still explored
+    after the well trodden ones have settled down.
+    """
+
+    # Precompute epsilon for this many visits, after that the last one is used
+    SCHEDULE_SIZE = 10 * 1000
+    TABLES = ('exploration_visits',)
+
+    def __init__(self, floor=0.05, power=0.4):
+        super().__init__(floor, power)
+        visits = np.maximum(np.arange(self.SCHEDULE_SIZE), 1)
+        self.schedule = np.maximum(floor, 1 / visits**power)
+
+    def start_environment(self, agent):
+        # One column, since visits are counted per state
+        agent.exploration_visits = ValueTable(len(agent.states), 1, dtype=np.int64)
+        self.load(agent)
+
+    def load(self, agent):
+        self.visits = agent.exploration_visits.array[:, 0]
+
+    def start_episode(self, episode):
+        pass
+
+    def get_epsilon(self, state=None):
+        if state is None:
+            return self.epsilon
+
+        return float(self.get_epsilons(state))
+
+    def select(self, agent, state):
+        self.visits[state] += 1
+        self.epsilon = self.get_epsilon(state)
+        return super().select(agent, state)
+
+    def select_batch(self, agent, states):
+        np.add.at(self.visits, states, 1)
+        epsilons = self.get_epsilons(states)
+        self.epsilon = float(epsilons.mean())
+        return agent.get_actions_epsilon_greedily(states, epsilons)
+
+    def get_epsilons(self, states):
+        return self.schedule[np.minimum(self.visits[states], self.SCHEDULE_SIZE - 1)]
+
+
+class Boltzmann:
+    """
+    Softmax over the action values: actions are picked with probability
+    proportional to exp(value / temperature). The temperature cools with the
+    episode count as max(min_temperature, temperature / episodes**power).
+    """
+
+    SETTINGS = ('temperature', 'min_temperature', 'power')
+    TABLES = ()
+
+    def __init__(self, temperature=1.0, min_temperature=0.01, power=0.5):
+        self.temperature = temperature
+        self.min_temperature = min_temperature
+        self.power = power
+        self.current_temperature = temperature
+
+    def start_environment(self, agent):
+        pass
+
+    def load(self, agent):
+        pass
+
+    def start_episode(self, episode):
+        self.current_temperature = max(self.min_temperature, self.temperature / max(episode, 1)**self.power)
+
+    def get_epsilon(self, state=None):
+        return None
+
+    def select(self, agent, state):
+        cumulative = np.cumsum(self.probabilities(agent, state))
+        return min(int(np.searchsorted(cumulative, agent.draw_uniform() * cumulative[-1], side='right')),
+                   len(cumulative) - 1)
+
+    def select_batch(self, agent, states):
+        cumulative = np.cumsum(self.probabilities(agent, states), axis=-1)
+        uniforms = agent.rng.random(len(states))[:, None] * cumulative[:, -1:]
+        actions = (uniforms >= cumulative).sum(axis=-1)
+        return np.minimum(actions, cumulative.shape[-1] - 1)
+
+    def probabilities(self, agent, states):
+        preferences = agent.values.array[states] / self.current_temperature
+        preferences = np.exp(preferences - preferences.max(axis=-1, keepdims=True))
+        return preferences / preferences.sum(axis=-1, keepdims=True)
+
+
+class UCB:
+    """
+    Upper confidence bound: picks the action with the best value plus a bonus
+    of c * sqrt(log(state visits) / action visits), trying every action once first.
+    Deterministic apart from ties, so the agent's values drive all exploration.
+    """
+
+    SETTINGS = ('c',)
+    TABLES = ('exploration_counts',)
+
+    def __init__(self, c=1.0):
+        self.c = c
+
+    def start_environment(self, agent):
+        agent.exploration_counts = agent.make_table(0, dtype=np.int64)
+        self.load(agent)
+
+    def load(self, agent):
+        self.counts = agent.exploration_counts.array
+        # Every pick adds one to the state's count and to one of its actions' counts
+        self.state_counts = self.counts.sum(axis=1)
+
+    def start_episode(self, episode):
+        pass
+
+    def get_epsilon(self, state=None):
+        return None
+
+    def scores(self, agent, states):
+        counts = self.counts[states]
+        bonus = self.c * np.sqrt(np.log(np.maximum(self.state_counts[states], 1))[..., None] / np.maximum(counts, 1))
+        # Untried actions come first
+        return np.where(counts == 0, np.inf, agent.values.array[states] + bonus)
+
+    def select(self, agent, state):
+        action = int(self.scores(agent, state).argmax())
+        self.counts[state, action] += 1
+        self.state_counts[state] += 1
+        return action
+
+    def select_batch(self, agent, states):
+        actions = self.scores(agent, states).argmax(axis=-1)
+        np.add.at(self.counts, (states, actions), 1)
+        np.add.at(self.state_counts, states, 1)
+        return actions
+
+    def probabilities(self, agent, states):
+        scores = self.scores(agent, states)
+        probs = np.zeros(scores.shape)
+        np.put_along_axis(probs, scores.argmax(axis=-1)[..., None], 1.0, -1)
+        return probs
@@ -2,13 +2,189 @@
 Tabular Monte Carlo solution to frozen lake,
 using epsilon-greedy exploration
 """
-import random
+import functools
+
+import numpy as np
+
 from .base_agent import BaseAgent
 
+# Steps of an episode handled by each matrix product in discounted_returns
+RETURNS_BLOCK_SIZE = 32
+
+
+def discounted_returns(rewards, gamma):
+    """
+    The return from every step, G[t] = rewards[t] + gamma * G[t + 1], without a Python loop.
+    A matrix product gives each step's return from the rest of its block of steps,
+    then the return carried in from later blocks is the same sum over the blocks' first steps,
+    with a discount of gamma ** RETURNS_BLOCK_SIZE. Only small powers of gamma are
+    multiplied together, so long episodes don't lose precision.
+    """
+    num_timesteps, size = len(rewards), RETURNS_BLOCK_SIZE
+    num_blocks = -(-num_timesteps // size)
+    blocks = np.zeros((num_blocks, size))
+    blocks.reshape(-1)[:num_timesteps] = rewards
+    discounts, carry_discounts = get_block_discounts(float(gamma))
+    returns = blocks @ discounts
+    if num_blocks > 1:
+        block_returns = discounted_returns(returns[:, 0], float(gamma) ** size)
+        returns[:-1] += np.outer(block_returns[1:], carry_discounts)
+
+    return returns.reshape(-1)[:num_timesteps]
+
+
+@functools.lru_cache(maxsize=16)
+def get_block_discounts(gamma):
+    """
+    discounts[k, j], how much the reward at offset k in a block counts towards the return at offset j,
+    and carry_discounts[j], how much the return from the start of the next block counts
+    """
+    offsets = np.arange(RETURNS_BLOCK_SIZE)
+    lags = offsets[:, None] - offsets[None, :]
+    discounts = np.where(lags >= 0, gamma ** np.maximum(lags, 0), 0.0)
+    return discounts, gamma ** (RETURNS_BLOCK_SIZE - offsets)
+
+
+class EpisodeBuffer:
+    """
+    Preallocated lists holding the steps of one episode.
+    Overwritten rather than reallocated between episodes, and doubled in size when full.
+    Plain lists are used since they are written one element at a time,
+    which is much cheaper than setting elements of a NumPy array.
+    """
+
+    def __init__(self, capacity=128):
+        self.states = [0] * capacity
+        self.actions = [0] * capacity
+        self.rewards = [0.0] * capacity
+        self.is_first_visit = [True] * capacity
+        self.seen = set()
+        self.length = 0
+
+    def clear(self):
+        self.length = 0
+        self.seen.clear()
+
+    def append(self, state, action, track_first_visits=False):
+        """
+        Record a state-action pair, returns whether it's the first visit this episode
+        """
+        t = self.length
+        if t == len(self.states):
+            self.grow()
+
+        self.states[t] = state
+        self.actions[t] = action
+        self.rewards[t] = 0.0
+        is_first_visit = True
+        if track_first_visits:
+            is_first_visit = (state, action) not in self.seen
+            self.seen.add((state, action))
+
+        self.is_first_visit[t] = is_first_visit
+        self.length = t + 1
+        return is_first_visit
+
+    def get_returns(self, gamma):
+        """
+        Array of the discounted return from each step
+        """
+        return discounted_returns(np.fromiter(self.rewards, float, self.length), gamma)
+
+    def add_reward(self, reward):
+        """
+        Reward for the most recent step
+        """
+        self.rewards[self.length - 1] += reward
+
+    def grow(self):
+        capacity = len(self.states)
+        self.states.extend([0] * capacity)
+        self.actions.extend([0] * capacity)
+        self.rewards.extend([0.0] * capacity)
+        self.is_first_visit.extend([True] * capacity)
+
+
+class EpisodeBatch:
+    """
+    The steps of one episode in each of a batch of environments, in arrays with a row per environment,
+    so each step of the whole batch is recorded with a few NumPy writes.
+    Doubled in length when any row is full.
+    """
+
+    def __init__(self, num_envs, capacity=128):
+        self.env_ids = np.arange(num_envs)
+        self.states = np.zeros((num_envs, capacity), dtype=np.int64)
+        self.actions = np.zeros((num_envs, capacity), dtype=np.int64)
+        self.rewards = np.zeros((num_envs, capacity))
+        self.lengths = np.zeros(num_envs, dtype=np.int64)
+
+    def clear(self, env_ids):
+        self.lengths[env_ids] = 0
+
+    def append(self, states, actions, env_ids=None):
+        """
+        Record a state-action pair for every environment, or each of `env_ids`
+        """
+        env_ids = self.env_ids if env_ids is None else env_ids
+        lengths = self.lengths[env_ids]
+        if lengths.max() == self.states.shape[1]:
+            self.grow()
+
+        steps = env_ids, lengths
+        self.states[steps] = states
+        self.actions[steps] = actions
+        self.rewards[steps] = 0.0
+        self.lengths[env_ids] = lengths + 1
+
+    def add_rewards(self, rewards, env_ids=None):
+        """
+        Rewards for every environment's most recent step, or each of `env_ids`
+        """
+        env_ids = self.env_ids if env_ids is None else env_ids
+        self.rewards[env_ids, self.lengths[env_ids] - 1] += rewards
+
+    def get_episode(self, env_id, buffer, track_first_visits=False):
+        """
+        Copy one environment's episode into an EpisodeBuffer, to learn from
+        """
+        length = self.lengths[env_id]
+        states, actions = self.states[env_id, :length], self.actions[env_id, :length]
+        buffer.states, buffer.actions = states.tolist(), actions.tolist()
+        buffer.rewards = self.rewards[env_id, :length].tolist()
+        is_first_visit = np.ones(length, dtype=bool)
+        if track_first_visits:
+            keys = states * (self.actions.max() + 1) + actions
+            is_first_visit[:] = False
+            is_first_visit[np.unique(keys, return_index=True)[1]] = True
+        buffer.is_first_visit = is_first_visit.tolist()
+        buffer.length = length
+        return buffer
+
+    def grow(self):
+        self.states = np.concatenate([self.states, np.zeros_like(self.states)], axis=1)
+        self.actions = np.concatenate([self.actions, np.zeros_like(self.actions)], axis=1)
+        self.rewards = np.concatenate([self.rewards, np.zeros_like(self.rewards)], axis=1)
+
 
 class MonteCarloAgent(BaseAgent):
 
     ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + ('obs', 'buffer')
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + ('first_visit',)
+    # Episodes at least this long are learned from with NumPy, shorter ones element by element
+    VECTORIZE_LENGTH = 64
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, first_visit=False, exploration=None, step_size=None):
+        super().__init__(gamma, alpha, lambd, exploration, step_size)
+        # First visit MC only learns from the first time a state-action pair
+        # is seen in each episode, every visit MC learns from all of them.
+        self.first_visit = first_visit
+        # Without a step size schedule, values are the average of every return seen
+        self.is_sample_average = step_size is None
+        self.buffer = EpisodeBuffer()
+        # Per-pair totals for one long episode, made when first needed and kept zeroed between episodes
+        self.scratch_counts, self.scratch_sums = None, None
 
     def start_environment(self, env):
         """
@@ -16,15 +192,20 @@ class MonteCarloAgent(BaseAgent):
         """
         super().start_environment(env)
         # How many times we've seen a state-action pair
-        self.visits = {
-            state: {action: 0 for action in self.actions}
-            for state in self.states
-        }
+        self.visits = self.make_table(0, dtype=int)
         # The value of a given state action pair - initialize optimistically
-        self.values = {
-            state: {action: 0.5 for action in self.actions}
-            for state in self.states
-        }
+        self.values = self.make_table(0.5)
+        self.scratch_counts, self.scratch_sums = None, None
+
+    def get_components(self):
+        """
+        Leave out the step size when averaging, so the agent is rebuilt without one
+        """
+        components = super().get_components()
+        if self.is_sample_average:
+            del components['step_size']
+
+        return components
 
     def start_episode(self):
         """
@@ -32,8 +213,7 @@ class MonteCarloAgent(BaseAgent):
         """
         super().start_episode()
         self.obs = None
-        self.rewards = []
-        self.visited = []
+        self.buffer.clear()
 
     def observe(self, obs):
         """
@@ -46,47 +226,130 @@ class MonteCarloAgent(BaseAgent):
         Select next action from action space using learned policy
         """
         state = self.obs
-        epsilon = max(0.05, 1 / self.episodes**0.4)
-        if random.random() >= epsilon:
-            # Follow greedy policy
-            action = self.get_action_greedily(state)
-        else:
-            # Follow random policy
-            action = self.get_action_randomly()
+        action = self.exploration.select(self, state)
 
-        self.visited.append((state, action))
-        self.visits[state][action] += 1
+        self.buffer.append(state, action, self.first_visit)
         return action
 
-
     def receive_reward(self, reward):
         """
         Keep track off all rewards for this episode
         """
-        self.rewards.append(reward)
+        super().receive_reward(reward)
+        self.buffer.add_reward(reward)
 
     def finish_episode(self, final_obs):
-        num_timesteps = len(self.rewards)
-
-        # Calculate episode returns from time T-1 to 0
-        # The episode return for timestep t is the return that was
-        # collected from timestep t onwards.
-        episode_returns = []
-        return_t = 0
-        for t in reversed(range(num_timesteps)):
-            reward = self.rewards[t]
-            return_t = reward + self.gamma * return_t
-            episode_returns.append(return_t)
-
-        # Reverse returns so it is indexed from 0 to T-1
-        episode_returns = list(reversed(episode_returns))
-
-        # Run through states from time 0 to T-1
-        for t in range(num_timesteps):
-            state_t, action_t = self.visited[t]
-            return_t = episode_returns[t]
-            # Incrmentally update action-value function
-            error_t =  return_t - self.values[state_t][action_t]
-            self.values[state_t][action_t] += (1 / self.visits[state_t][action_t]) * error_t
-
-        return 0 # is this meaningful?
+        """
+        Update the action-value function from this episode's returns.
+        The return for timestep t is the return that was collected from timestep t onwards.
+        """
+        self.learn(self.buffer)
+        return super().finish_episode(final_obs)
+
+    def learn(self, buffer):
+        if buffer.length >= self.VECTORIZE_LENGTH:
+            self.learn_vectorized(buffer)
+        elif buffer.length:
+            self.learn_backwards(buffer)
+
+    def learn_backwards(self, buffer):
+        """
+        Accumulate the return from time T-1 to 0, updating each pair's value as it's reached.
+        Element by element, which is cheapest for short episodes.
+        """
+        states, actions, rewards, is_first_visit = buffer.states, buffer.actions, buffer.rewards, buffer.is_first_visit
+        values, visits = self.values.array.reshape(-1), self.visits.array.reshape(-1)
+        gamma, step_size, num_actions = self.gamma, self.step_size, len(self.actions)
+        is_sample_average = self.is_sample_average
+        return_t, total_error, num_updates = 0.0, 0.0, 0
+        for t in reversed(range(buffer.length)):
+            return_t = rewards[t] + gamma * return_t
+            if not is_first_visit[t]:
+                continue
+
+            key = states[t] * num_actions + actions[t]
+            count = visits.item(key) + 1
+            visits[key] = count
+            value = values.item(key)
+            error = return_t - value
+            if is_sample_average:
+                values[key] = value + error / count
+            else:
+                values[key] = value + step_size.get(states[t], actions[t], error) * error
+            total_error += abs(error)
+            num_updates += 1
+
+        self.values.invalidate(states[:buffer.length])
+        self.td_error = total_error / num_updates
+
+    def learn_vectorized(self, buffer):
+        """
+        The same update as learn_backwards, with NumPy doing the per-pair work, for long episodes.
+        With a step size schedule, repeat visits to a pair this episode
+        are each computed from the value before the episode, so the pair
+        moves by the mean of their updates.
+        """
+        num_timesteps, num_actions = buffer.length, len(self.actions)
+        returns = buffer.get_returns(self.gamma)
+        states = np.fromiter(buffer.states, np.int64, num_timesteps)
+        actions = np.fromiter(buffer.actions, np.int64, num_timesteps)
+        if self.first_visit:
+            is_first_visit = np.fromiter(buffer.is_first_visit, bool, num_timesteps)
+            states, actions, returns = states[is_first_visit], actions[is_first_visit], returns[is_first_visit]
+
+        keys = states * num_actions + actions
+        values, visits = self.values.array.reshape(-1), self.visits.array.reshape(-1)
+        old_values = values[keys]
+        errors = returns - old_values
+        self.td_error = np.abs(errors).mean()
+        if self.is_sample_average:
+            # Sum each pair's visits and returns in scratch tables, rather than sorting the keys,
+            # then move each value to the average of all the returns seen so far.
+            # Repeated keys all write the same new value.
+            if self.scratch_counts is None:
+                self.scratch_counts, self.scratch_sums = np.zeros(len(values), dtype=int), np.zeros(len(values))
+            counts, return_sums = self.scratch_counts, self.scratch_sums
+            np.add.at(counts, keys, 1)
+            np.add.at(return_sums, keys, returns)
+            visits[keys] += counts[keys]
+            values[keys] = old_values + (return_sums[keys] - counts[keys] * old_values) / visits[keys]
+            counts[keys] = 0
+            return_sums[keys] = 0
+            self.values.invalidate(states)
+        else:
+            np.add.at(visits, keys, 1)
+            self.values.add_mean(states, actions, self.step_size.batch(states, actions, errors) * errors)
+
+
+    def start_batch(self, num_envs):
+        """
+        Record the episodes of every environment together
+        """
+        self.batch = EpisodeBatch(num_envs)
+        self.batch_returns = np.zeros(num_envs)
+
+    def start_episodes(self, env_ids):
+        self.episodes += len(env_ids)
+        self.exploration.start_episode(self.episodes)
+        self.batch_returns[env_ids] = 0
+        self.batch.clear(env_ids)
+
+    def get_next_actions(self, observations, env_ids=None):
+        actions = self.exploration.select_batch(self, observations)
+        self.batch.append(observations, actions, env_ids)
+        return actions
+
+    def receive_rewards(self, rewards, env_ids=None):
+        self.batch_returns[slice(None) if env_ids is None else env_ids] += rewards
+        self.batch.add_rewards(rewards, env_ids)
+
+    def finish_episodes(self, env_ids, final_observations):
+        """
+        Learn from each finished environment's episode
+        Returns an array of episode returns
+        """
+        buffer = EpisodeBuffer(capacity=0)
+        for env_id in env_ids:
+            self.learn(self.batch.get_episode(env_id, buffer, self.first_visit))
+
+        return self.batch_returns[env_ids].copy()
@@ -0,0 +1,168 @@
+"""
+Model-based prioritized sweeping, learning a transition model from experience
+and planning with it, using epsilon-greedy exploration
+"""
+import numpy as np
+
+from .base_agent import BaseAgent
+from .priority_queue import IndexedPriorityQueue
+
+
+class PrioritizedSweepingAgent(BaseAgent):
+    """
+    Counts the outcomes of every state-action pair to estimate a model.
+    After each real step, state-action pairs whose expected backup would change
+    their value by more than `theta` are queued by how much, and up to
+    `planning_steps` of them are backed up. When a state's value changes,
+    every pair seen leading into it is queued too, so a reward spreads back
+    through the model instead of waiting for episodes to retrace the path.
+    """
+
+    ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + ('obs', 'prev_obs', 'action', 'reward')
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + ('planning_steps', 'theta')
+
+    def __init__(self, gamma=0, alpha=1, lambd=0, planning_steps=10, theta=1e-4, exploration=None,
+                 step_size=None):
+        super().__init__(gamma, alpha, lambd, exploration, step_size)
+        self.planning_steps = planning_steps
+        self.theta = theta
+
+    def start_environment(self, env):
+        """
+        Setup observation space and an empty model
+        """
+        super().start_environment(env)
+        # Optimistic values, so unexplored pairs look worth trying
+        self.values = self.make_table(1)
+        # Each state's greedy value, kept as a list since backups read it one at a time
+        self.state_values = self.values.array.max(axis=1).tolist()
+        self.visits = self.make_table(0, dtype=np.int64)
+        self.reward_sums = self.make_table(0)
+        # Flat state-action key -> {next state: count}, for transitions which didn't end the episode
+        self.successors = [{} for _ in range(len(self.states) * len(self.actions))]
+        # Next state -> flat keys of the state-action pairs seen leading to it
+        self.predecessors = [set() for _ in self.states]
+        self.queue = IndexedPriorityQueue()
+
+    def start_episode(self):
+        super().start_episode()
+        self.obs, self.prev_obs = None, None
+        self.action, self.reward = None, None
+
+    def observe(self, new_obs):
+        """
+        Observe data from envrionment, completing the previous transition
+        """
+        self.obs, self.prev_obs = new_obs, self.obs
+        if self.action is not None:
+            self.learn(self.prev_obs, self.action, self.reward, new_obs, False)
+
+    def get_next_action(self):
+        """
+        Select next action from action space using learned policy
+        """
+        self.action = self.exploration.select(self, self.obs)
+        return self.action
+
+    def receive_reward(self, reward):
+        super().receive_reward(reward)
+        self.reward = reward
+
+    def finish_episode(self, final_obs):
+        """
+        Perform final update for end of episode
+        Returns episode return
+        """
+        if self.action is not None:
+            self.learn(self.obs, self.action, self.reward, final_obs, True)
+
+        return super().finish_episode(final_obs)
+
+    def learn(self, state, action, reward, next_state, done):
+        """
+        Add a real transition to the model, then plan
+        """
+        key = state * len(self.actions) + action
+        self.visits.array[state, action] += 1
+        self.reward_sums.array[state, action] += reward
+        if not done:
+            successors = self.successors[key]
+            successors[next_state] = successors.get(next_state, 0) + 1
+            self.predecessors[next_state].add(key)
+
+        self.prioritize(key)
+        self.plan()
+
+    def backup(self, key):
+        """
+        Expected one-step return of a state-action pair under the model
+        """
+        state, action = divmod(key, len(self.actions))
+        state_values = self.state_values
+        next_value = 0
+        for next_state, count in self.successors[key].items():
+            next_value += count * state_values[next_state]
+
+        expected = self.reward_sums.array[state, action] + self.gamma * next_value
+        return expected / self.visits.array[state, action]
+
+    def prioritize(self, key):
+        """
+        Queue a state-action pair if backing it up would change its value enough
+        """
+        state, action = divmod(key, len(self.actions))
+        priority = abs(self.backup(key) - self.values.array[state, action])
+        if priority > self.theta:
+            self.queue.push(key, priority)
+
+    def plan(self):
+        """
+        Back up the highest priority pairs, queueing the predecessors of each changed state
+        """
+        values, num_actions = self.values.array, len(self.actions)
+        for _ in range(self.planning_steps):
+            if not self.queue:
+                break
+
+            key, _ = self.queue.pop()
+            state, action = divmod(key, num_actions)
+            target = self.backup(key)
+            td_error = target - values[state, action]
+            values[state, action] += self.step_size.get(state, action, td_error) * td_error
+            self.values.invalidate(state)
+            self.td_error = td_error
+            state_value = values[state].max()
+            if state_value != self.state_values[state]:
+                self.state_values[state] = state_value
+                for predecessor in self.predecessors[state]:
+                    self.prioritize(predecessor)
+
+    def save(self, path, **extra):
+        """
+        Save the successor counts as (key, next state, count) rows, alongside the tables
+        """
+        rows = [
+            (key, next_state, count)
+            for key, successors in enumerate(self.successors)
+            for next_state, count in successors.items()
+        ]
+        model = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        super().save(path, model=model, **extra)
+
+    def load(self, path):
+        """
+        Restore a checkpoint, sizing the model from the restored values
+        so it works with or without start_environment first
+        """
+        extra = super().load(path)
+        num_states, num_actions = self.values.num_states, self.values.num_actions
+        self.successors = [{} for _ in range(num_states * num_actions)]
+        self.predecessors = [set() for _ in range(num_states)]
+        for key, next_state, count in extra.pop('model').tolist():
+            self.successors[key][next_state] = count
+            self.predecessors[next_state].add(key)
+
+        self.state_values = self.values.array.max(axis=1).tolist()
+        self.queue = IndexedPriorityQueue()
+        return extra
@@ -0,0 +1,98 @@
+"""
+Binary max-heap which can raise the priority of a key that's already queued
+"""
+
+
+class IndexedPriorityQueue:
+    """
+    Max-heap of hashable keys. Tracks where each key sits in the heap,
+    so pushing a queued key again updates it in place instead of adding a duplicate.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.priorities = []
+        self.positions = {}  # Key -> index in the heap
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def clear(self):
+        self.keys, self.priorities, self.positions = [], [], {}
+
+    def push(self, key, priority):
+        """
+        Queue a key, or raise its priority if it's already queued with a lower one
+        """
+        position = self.positions.get(key)
+        if position is None:
+            self.keys.append(key)
+            self.priorities.append(priority)
+            position = len(self.keys) - 1
+            self.positions[key] = position
+            self.sift_up(position)
+        elif priority > self.priorities[position]:
+            self.priorities[position] = priority
+            self.sift_up(position)
+
+    def update(self, key, priority):
+        """
+        Set a queued key's priority, higher or lower
+        """
+        position = self.positions[key]
+        old_priority, self.priorities[position] = self.priorities[position], priority
+        if priority > old_priority:
+            self.sift_up(position)
+        else:
+            self.sift_down(position)
+
+    def peek(self):
+        return self.keys[0], self.priorities[0]
+
+    def pop(self):
+        """
+        Remove and return the (key, priority) with the highest priority
+        """
+        key, priority = self.keys[0], self.priorities[0]
+        last_key, last_priority = self.keys.pop(), self.priorities.pop()
+        del self.positions[key]
+        if self.keys:
+            self.keys[0], self.priorities[0] = last_key, last_priority
+            self.positions[last_key] = 0
+            self.sift_down(0)
+
+        return key, priority
+
+    def sift_up(self, position):
+        priorities = self.priorities
+        while position > 0:
+            parent = (position - 1) // 2
+            if priorities[parent] >= priorities[position]:
+                break
+
+            self.swap(position, parent)
+            position = parent
+
+    def sift_down(self, position):
+        priorities, size = self.priorities, len(self.priorities)
+        while True:
+            largest, left = position, 2 * position + 1
+            if left < size and priorities[left] > priorities[largest]:
+                largest = left
+            if left + 1 < size and priorities[left + 1] > priorities[largest]:
+                largest = left + 1
+            if largest == position:
+                break
+
+            self.swap(position, largest)
+            position = largest
+
+    def swap(self, i, j):
+        keys, priorities = self.keys, self.priorities
+        keys[i], keys[j] = keys[j], keys[i]
+        priorities[i], priorities[j] = priorities[j], priorities[i]
+        self.positions[keys[i]] = i
+        self.positions[keys[j]] = j
@@ -0,0 +1,188 @@
+"""
+Tabular off-policy Q-learning and Expected SARSA,
+using epsilon-greedy exploration and optional experience replay
+"""
+import numpy as np
+
+from .base_agent import BaseAgent
+from .dyna import DynaModel
+from .trajectory import Transitions
+
+
+class QLearningAgent(BaseAgent):
+    """
+    Learns the greedy policy's action values, whatever policy picked the actions.
+    Since it's off-policy, old transitions stay useful: given a replay buffer,
+    each real step is stored and then `replay_updates` minibatches of
+    `batch_size` stored transitions are learned from.
+    With `planning_steps`, it's Dyna-Q: each real step also goes into a learned
+    model, and that many simulated transitions are learned from.
+    """
+
+    ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + ('obs', 'prev_obs', 'action', 'reward')
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + ('batch_size', 'replay_updates', 'planning_steps')
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, replay_buffer=None, batch_size=32, replay_updates=1,
+                 planning_steps=0, exploration=None, step_size=None):
+        super().__init__(gamma, alpha, lambd, exploration, step_size)
+        self.replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.replay_updates = replay_updates
+        self.planning_steps = planning_steps
+        self.model = None
+
+    def start_environment(self, env):
+        """
+        Setup observation space
+        """
+        super().start_environment(env)
+        # Initialize state-action values somewhat optimistically
+        self.values = self.make_table(0.5)
+        self.model = DynaModel(len(self.states), len(self.actions)) if self.planning_steps else None
+
+    def load(self, path):
+        """
+        Restore from a checkpoint, with an empty model to plan with if there isn't one,
+        since the model's remembered outcomes aren't saved
+        """
+        extra = super().load(path)
+        if self.planning_steps and self.model is None:
+            self.model = DynaModel(self.values.num_states, self.values.num_actions)
+
+        return extra
+
+    def start_episode(self):
+        super().start_episode()
+        self.obs, self.prev_obs = None, None
+        self.action, self.reward = None, None
+
+    def observe(self, new_obs):
+        """
+        Observe data from envrionment, completing the previous transition
+        """
+        self.obs, self.prev_obs = new_obs, self.obs
+        if self.action is not None:
+            self.learn(self.prev_obs, self.action, self.reward, new_obs, False)
+
+    def get_next_action(self):
+        """
+        Select next action from action space using learned policy
+        """
+        self.action = self.exploration.select(self, self.obs)
+        return self.action
+
+    def receive_reward(self, reward):
+        super().receive_reward(reward)
+        self.reward = reward
+
+    def learn(self, state, action, reward, next_state, done):
+        """
+        Learn from a single real transition, then from replayed experience
+        """
+        values = self.values.array
+        next_value = 0 if done else self.bootstrap_values(next_state)
+        td_error = reward + self.gamma * next_value - values[state, action]
+        values[state, action] += self.step_size.get(state, action, td_error) * td_error
+        self.values.invalidate(state)
+        self.td_error = td_error
+        if self.replay_buffer is not None:
+            self.replay_buffer.add(state, action, reward, next_state, done)
+            for _ in range(self.replay_updates):
+                self.replay(self.replay_buffer.sample(self.batch_size, self.rng))
+        if self.model is not None:
+            self.plan(state, action, reward, next_state, done)
+
+        return td_error
+
+    def finish_episode(self, final_obs):
+        """
+        Perform final update for end of episode
+        Returns episode return
+        """
+        if self.action is not None:
+            self.learn(self.obs, self.action, self.reward, final_obs, True)
+
+        return super().finish_episode(final_obs)
+
+
+    def start_batch(self, num_envs):
+        """
+        Keep the episode state of every environment in arrays,
+        where -1 (or NaN for rewards) stands in for None
+        """
+        self.batch_obs = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_action = np.full(num_envs, -1, dtype=np.int64)
+        self.batch_reward = np.full(num_envs, np.nan)
+        self.batch_returns = np.zeros(num_envs)
+
+    def start_episodes(self, env_ids):
+        self.episodes += len(env_ids)
+        self.exploration.start_episode(self.episodes)
+        self.batch_action[env_ids] = -1
+        self.batch_returns[env_ids] = 0
+
+    def get_next_actions(self, observations, env_ids=None):
+        """
+        Learn from the transition each environment just completed, then pick its next action
+        """
+        env_ids = np.arange(len(self.batch_obs)) if env_ids is None else np.asarray(env_ids)
+        is_learning = self.batch_action[env_ids] >= 0
+        if is_learning.any():
+            learning_ids = env_ids[is_learning]
+            self.learn_batch(
+                self.batch_obs[learning_ids], self.batch_action[learning_ids], self.batch_reward[learning_ids],
+                observations[is_learning], np.zeros(len(learning_ids), dtype=bool),
+            )
+
+        actions = self.exploration.select_batch(self, observations)
+        self.batch_obs[env_ids] = observations
+        self.batch_action[env_ids] = actions
+        return actions
+
+    def receive_rewards(self, rewards, env_ids=None):
+        ids = slice(None) if env_ids is None else env_ids
+        self.batch_returns[ids] += rewards
+        self.batch_reward[ids] = rewards
+
+    def learn_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Learn from one real transition per environment, each computed from
+        the values before this batch, then from replayed experience
+        """
+        self.td_error = np.abs(self.replay(Transitions(states, actions, rewards, next_states, dones))).mean()
+        if self.replay_buffer is not None:
+            self.replay_buffer.add_batch(states, actions, rewards, next_states, dones)
+            for _ in range(self.replay_updates):
+                self.replay(self.replay_buffer.sample(self.batch_size * len(states), self.rng))
+        if self.model is not None:
+            self.model.add_batch(states, actions, rewards, next_states, dones)
+            for _ in range(self.planning_steps):
+                self.replay(self.model.sample(len(states), self.rng))
+
+    def finish_episodes(self, env_ids, final_observations):
+        """
+        Learn from the final transition of each finished environment
+        Returns an array of episode returns
+        """
+        env_ids = np.asarray(env_ids)
+        self.learn_batch(
+            self.batch_obs[env_ids], self.batch_action[env_ids], self.batch_reward[env_ids],
+            np.asarray(final_observations), np.ones(len(env_ids), dtype=bool),
+        )
+        self.batch_action[env_ids] = -1
+        return self.batch_returns[env_ids].copy()
+
+
+class ExpectedSarsaAgent(QLearningAgent):
+    """
+    Like Q-learning, but bootstraps from the expected value of the next state
+    under the exploration policy instead of the greedy policy.
+    """
+
+    def bootstrap_values(self, next_states):
+        """
+        Expected value of each next state under the exploration policy
+        """
+        next_values = self.values.array[next_states]
+        return (self.exploration.probabilities(self, next_states) * next_values).sum(axis=-1)
@@ -0,0 +1,154 @@
+"""
+Step sizes, which say how far an agent moves a value towards each new target.
+
+A schedule's `get` takes the state-action pair being updated and its TD error,
+and returns the step size to use, `batch` does the same for arrays of them.
+Any per-entry state, like visit counts, is kept in tables the same shape as the
+agent's values, which are set on the agent so they're saved in checkpoints along
+with everything else, and named in `TABLES`. Counts go up once per update of an entry, including
+simulated updates from planning or replay.
+"""
+import numpy as np
+
+
+class ConstantStepSize:
+    """
+    The same step size for every update, the agent's alpha unless given
+    """
+
+    # Constructor arguments, which are saved in checkpoints
+    SETTINGS = ('alpha',)
+    # Tables this step size keeps on the agent
+    TABLES = ()
+
+    def __init__(self, alpha=None):
+        self.alpha = alpha
+        self.value = alpha
+
+    def start_environment(self, agent):
+        self.value = agent.alpha if self.alpha is None else self.alpha
+
+    def load(self, agent):
+        self.start_environment(agent)
+
+    def get(self, state, action, td_error):
+        return self.value
+
+    def batch(self, states, actions, td_errors):
+        return self.value
+
+
+class VisitCountStepSize:
+    """
+    Step size max(minimum, 1 / n**power) for the nth update of each state-action pair.
+    A power of 1 gives the sample average, smaller powers keep learning for longer.
+    """
+
+    # Precompute step sizes for this many updates, after that they're worked out as needed
+    SCHEDULE_SIZE = 10 * 1000
+    SETTINGS = ('power', 'minimum')
+    TABLES = ('step_counts',)
+
+    def __init__(self, power=0.5, minimum=0.0):
+        self.power = power
+        self.minimum = minimum
+        self.schedule_array = self.get_schedule(np.maximum(np.arange(self.SCHEDULE_SIZE), 1))
+        self.schedule = self.schedule_array.tolist()
+
+    def get_schedule(self, counts):
+        return np.maximum(self.minimum, 1 / counts**self.power)
+
+    def start_environment(self, agent):
+        agent.step_counts = agent.make_table(0, dtype=np.int64)
+        self.counts = agent.step_counts.array
+
+    def load(self, agent):
+        self.counts = agent.step_counts.array
+
+    def get(self, state, action, td_error):
+        counts = self.counts
+        n = counts[state, action] + 1
+        counts[state, action] = n
+        if n < self.SCHEDULE_SIZE:
+            return self.schedule[n]
+
+        return float(self.get_schedule(n))
+
+    def batch(self, states, actions, td_errors):
+        np.add.at(self.counts, (states, actions), 1)
+        n = self.counts[states, actions]
+        step_sizes = self.schedule_array[np.minimum(n, self.SCHEDULE_SIZE - 1)]
+        is_past_schedule = n >= self.SCHEDULE_SIZE
+        if is_past_schedule.any():
+            step_sizes[is_past_schedule] = self.get_schedule(n[is_past_schedule])
+
+        return step_sizes
+
+
+class HarmonicStepSize(VisitCountStepSize):
+    """
+    Step size a / (a + n - 1) for the nth update of each state-action pair,
+    which starts at 1 and stays large for about the first `a` updates
+    before falling off like 1 / n.
+    """
+
+    SETTINGS = ('a', 'minimum')
+
+    def __init__(self, a=10.0, minimum=0.0):
+        self.a = a
+        super().__init__(1.0, minimum)
+
+    def get_schedule(self, counts):
+        return np.maximum(self.minimum, self.a / (self.a + counts - 1))
+
+
+class AdaptiveStepSize:
+    """
+    A step size for each state-action pair, tuned as it learns (delta-bar-delta).
+    While an entry's TD errors keep the same sign, its value is still heading
+    somewhere, so its step size grows by `increase`. When they flip sign it's
+    overshooting, so its step size shrinks by a factor of `decrease`.
+    The sign is compared with a moving average of past errors, with weight `smoothing`.
+    """
+
+    SETTINGS = ('initial', 'increase', 'decrease', 'smoothing', 'minimum', 'maximum')
+    TABLES = ('adaptive_step_sizes', 'adaptive_error_averages')
+
+    def __init__(self, initial=0.1, increase=0.005, decrease=0.2, smoothing=0.7, minimum=1e-3, maximum=1.0):
+        self.initial = initial
+        self.increase = increase
+        self.decrease = decrease
+        self.smoothing = smoothing
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def start_environment(self, agent):
+        agent.adaptive_step_sizes = agent.make_table(self.initial)
+        agent.adaptive_error_averages = agent.make_table(0)
+        self.load(agent)
+
+    def load(self, agent):
+        self.sizes = agent.adaptive_step_sizes.array
+        self.error_averages = agent.adaptive_error_averages.array
+
+    def get(self, state, action, td_error):
+        sizes, error_averages = self.sizes, self.error_averages
+        step_size, error_average = sizes[state, action], error_averages[state, action]
+        agreement = error_average * td_error
+        if agreement > 0:
+            step_size = min(self.maximum, step_size + self.increase)
+        elif agreement < 0:
+            step_size = max(self.minimum, step_size * (1 - self.decrease))
+
+        sizes[state, action] = step_size
+        error_averages[state, action] = (1 - self.smoothing) * td_error + self.smoothing * error_average
+        return step_size
+
+    def batch(self, states, actions, td_errors):
+        step_sizes, error_averages = self.sizes[states, actions], self.error_averages[states, actions]
+        agreement = error_averages * td_errors
+        step_sizes = np.where(agreement > 0, np.minimum(self.maximum, step_sizes + self.increase), step_sizes)
+        step_sizes = np.where(agreement < 0, np.maximum(self.minimum, step_sizes * (1 - self.decrease)), step_sizes)
+        self.sizes[states, actions] = step_sizes
+        self.error_averages[states, actions] = (1 - self.smoothing) * td_errors + self.smoothing * error_averages
+        return step_sizes
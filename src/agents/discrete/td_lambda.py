@@ -2,13 +2,26 @@
 Tabular TD-Lambda solution to frozen lake,
 using epsilon-greedy exploration
 """
-import random
+import numpy as np
+
 from .base_agent import BaseAgent
+from .batched_td import BatchedTDAgent
+from .traces import EligibilityTrace, ACCUMULATING, REPLACING
 
 
-class TDLambdaAgent(BaseAgent):
+class TDLambdaAgent(BatchedTDAgent):
 
     ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + (
+        'obs', 'prev_obs', 'action', 'prev_action', 'reward', 'eligibility',
+    )
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + ('trace', 'trace_threshold')
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, trace=ACCUMULATING, trace_threshold=1e-4, exploration=None,
+                 step_size=None):
+        super().__init__(gamma, alpha, lambd, exploration, step_size)
+        self.trace = trace
+        self.trace_threshold = trace_threshold
 
     def start_environment(self, env):
         """
@@ -16,10 +29,7 @@ class TDLambdaAgent(BaseAgent):
         """
         super().start_environment(env)
         # Initialize state-action values somewhat optimistically
-        self.values = {
-            state: {action: 1 for action in self.actions}
-            for state in self.states
-        }
+        self.values = self.make_table(1)
 
     def start_episode(self):
         """
@@ -30,10 +40,8 @@ class TDLambdaAgent(BaseAgent):
         self.obs, self.prev_obs = None, None
         self.action, self.prev_action = None, None
         self.reward = None
-        self.eligibility = {
-            state: {action: 0 for action in self.actions}
-            for state in self.states
-        }
+        # Only state-action pairs with eligibility above the threshold are tracked
+        self.eligibility = EligibilityTrace(self.trace, self.trace_threshold)
 
     def observe(self, new_obs):
         """
@@ -45,23 +53,7 @@ class TDLambdaAgent(BaseAgent):
         """
         Select next action from action space using learned policy
         """
-        epsilon = max(0.05, 1 / self.episodes**0.4)
-        if random.random() >= epsilon:
-            # Follow greedy policy
-            state = self.obs
-            best_action = None
-            best_value = float('-inf')
-            for possible_action in self.actions:
-                action_value = self.values[state][possible_action]
-                if action_value > best_value:
-                    best_value = self.values[state][possible_action]
-                    best_action = possible_action
-
-            action = best_action
-        else:
-            # Follow random policy
-            action = random.choice(self.actions)
-
+        action = self.exploration.select(self, self.obs)
         self.action, self.prev_action = action, self.action
         return action
 
@@ -78,18 +70,18 @@ class TDLambdaAgent(BaseAgent):
 
         if should_update:
             # Calculate TD error between previous state and current state
-            td_target = prev_reward + self.gamma * self.values[state][action]
-            td_error = td_target - self.values[prev_state][prev_action]
-            for s in self.states:
-                for a in self.actions:
-                    # Update eligibility trace
-                    self.eligibility[s][a] *= self.gamma * self.lambd
-                    if s == prev_state and a == prev_action:
-                        self.eligibility[s][a] += 1
-
-                    # Update action-value function accordind to eligibility
-                    update = self.alpha * td_error * self.eligibility[s][a]
-                    self.values[s][a] += update
+            values = self.values.array
+            td_target = prev_reward + self.gamma * values[state, action]
+            td_error = td_target - values[prev_state, prev_action]
+            # Update eligibility trace
+            self.eligibility.decay(self.gamma * self.lambd)
+            self.eligibility.visit(prev_state * values.shape[1] + prev_action)
+            # Update action-value function accordind to eligibility,
+            # every traced entry takes the step size of the pair just visited
+            step_size = self.step_size.get(prev_state, prev_action, td_error)
+            self.eligibility.apply(values.reshape(-1), step_size * td_error)
+            self.values.invalidate(self.eligibility.indices // values.shape[1])
+            self.td_error = td_error
 
 
     def finish_episode(self, final_obs):
@@ -100,9 +92,69 @@ class TDLambdaAgent(BaseAgent):
         # Set value of all actions for terminal state to zero.
         # And then take a dummy action
         self.observe(final_obs)
-        self.values[final_obs] = {action: 0 for action in self.actions}
+        self.values[final_obs] = 0
         self.get_next_action()
         # Perform final TD update.
         self.receive_reward(0)
         return super().finish_episode(final_obs)
 
+
+    def start_batch(self, num_envs):
+        """
+        Every environment's eligibility trace is kept in one sparse set, sorted by
+        key env_id * table size + flat table index, so they're all updated at once
+        """
+        super().start_batch(num_envs)
+        self.trace_keys = np.empty(0, dtype=np.int64)
+        self.trace_weights = np.empty(0)
+
+    def start_episodes(self, env_ids):
+        super().start_episodes(env_ids)
+        keep = ~np.isin(self.trace_keys // self.values.array.size, env_ids)
+        self.trace_keys, self.trace_weights = self.trace_keys[keep], self.trace_weights[keep]
+
+    def update_batch(self, env_ids):
+        """
+        Apply the TD(lambda) update for the given environments at once.
+        Each environment decays and visits its own trace, then every traced entry
+        moves by its environment's step size times TD error, computed from
+        the values before this batch. An entry traced by several environments
+        moves by the mean of their updates.
+        """
+        updates = self.get_updates(env_ids)
+        if updates is None:
+            return
+
+        env_ids, prev_state, prev_action, prev_reward, state, action = updates
+        values = self.values.array
+        table_size, num_actions = values.size, values.shape[1]
+        td_error = prev_reward + self.gamma * values[state, action] - values[prev_state, prev_action]
+        steps = np.zeros(len(self.batch_obs))
+        steps[env_ids] = self.step_size.batch(prev_state, prev_action, td_error) * td_error
+
+        # Decay the traces of the environments being updated, and forget negligible entries
+        keys, weights = self.trace_keys, self.trace_weights
+        is_updating = np.zeros(len(self.batch_obs), dtype=bool)
+        is_updating[env_ids] = True
+        weights = np.where(is_updating[keys // table_size], weights * (self.gamma * self.lambd), weights)
+        if self.trace_threshold > 0:
+            keep = weights >= self.trace_threshold
+            keys, weights = keys[keep], weights[keep]
+
+        # Visit each environment's previous state-action pair, the new keys are already in order
+        visited = env_ids * table_size + prev_state * num_actions + prev_action
+        positions = np.searchsorted(keys, visited)
+        is_traced = positions < len(keys)
+        is_traced[is_traced] = keys[positions[is_traced]] == visited[is_traced]
+        if self.trace == REPLACING:
+            weights[positions[is_traced]] = 1.0
+        else:
+            weights[positions[is_traced]] += 1.0
+        keys = np.insert(keys, positions[~is_traced], visited[~is_traced])
+        weights = np.insert(weights, positions[~is_traced], 1.0)
+        self.trace_keys, self.trace_weights = keys, weights
+
+        trace_envs, trace_indices = np.divmod(keys, table_size)
+        trace_states, trace_actions = np.divmod(trace_indices, num_actions)
+        self.values.add_mean(trace_states, trace_actions, steps[trace_envs] * weights)
+        self.td_error = np.abs(td_error).mean()
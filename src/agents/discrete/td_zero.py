@@ -1,14 +1,28 @@
 """
 Tabular Temporal Difference solution
-using epsilon-greedy exploration
+using epsilon-greedy exploration, or any other exploration policy
 """
-import random
+import numpy as np
+
 from .base_agent import BaseAgent
+from .batched_td import BatchedTDAgent
+from .dyna import DynaModel
 
 
-class TDZeroAgent(BaseAgent):
+class TDZeroAgent(BatchedTDAgent):
+    """
+    With `planning_steps`, each real transition is also stored in a learned model,
+    and that many simulated transitions are learned from after every update (Dyna-Q).
+    """
 
     ACTION_NAMES = ['LEFT', 'DOWN', 'RIGHT', 'UP']
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + ('obs', 'prev_obs', 'action', 'prev_action', 'reward')
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + ('planning_steps',)
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, planning_steps=0, exploration=None, step_size=None):
+        super().__init__(gamma, alpha, lambd, exploration, step_size)
+        self.planning_steps = planning_steps
+        self.model = None
 
     def start_environment(self, env):
         """
@@ -16,10 +30,19 @@ class TDZeroAgent(BaseAgent):
         """
         super().start_environment(env)
         # Initialize state-action values somewhat optimistically
-        self.values = {
-            state: {action: 0.5 for action in self.actions}
-            for state in self.states
-        }
+        self.values = self.make_table(0.5)
+        self.model = DynaModel(len(self.states), len(self.actions)) if self.planning_steps else None
+
+    def load(self, path):
+        """
+        Restore from a checkpoint, with an empty model to plan with if there isn't one,
+        since the model's remembered outcomes aren't saved
+        """
+        extra = super().load(path)
+        if self.planning_steps and self.model is None:
+            self.model = DynaModel(self.values.num_states, self.values.num_actions)
+
+        return extra
 
     def start_episode(self):
         """
@@ -40,15 +63,7 @@ class TDZeroAgent(BaseAgent):
         """
         Select next action from action space using learned policy
         """
-        epsilon = max(0.05, 1 / self.episodes**0.4)
-        if random.random() >= epsilon:
-            # Follow greedy policy
-            state = self.obs
-            action = self.get_action_greedily(state)
-        else:
-            # Follow random policy
-            action = self.get_action_randomly()
-
+        action = self.exploration.select(self, self.obs)
         self.action, self.prev_action = action, self.action
         return action
 
@@ -62,14 +77,19 @@ class TDZeroAgent(BaseAgent):
         action, prev_action = self.action, self.prev_action
         should_update  = not any([x is None for x in (prev_action, prev_state, prev_reward)])
 
-        prev_val = self.values[prev_state][prev_action] if should_update else None
+        values = self.values.array
+        prev_val = values[prev_state, prev_action] if should_update else None
         td_target = None
         td_error = None
 
         if should_update:
-            td_target = prev_reward + self.gamma * self.values[state][action]
-            td_error = td_target - self.values[prev_state][prev_action]
-            self.values[prev_state][prev_action] += self.alpha * td_error
+            td_target = prev_reward + self.gamma * values[state, action]
+            td_error = td_target - values[prev_state, prev_action]
+            values[prev_state, prev_action] += self.step_size.get(prev_state, prev_action, td_error) * td_error
+            self.values.invalidate(prev_state)
+            self.td_error = td_error
+            if self.model is not None:
+                self.plan(prev_state, prev_action, prev_reward, state, False)
 
         # print('\nUpdating:\t', prev_state, '/', prev_action)
         # print('Target:\t\t', state, '/', action)
@@ -88,9 +108,32 @@ class TDZeroAgent(BaseAgent):
         # Set value of all actions for terminal state to zero.
         # And then take a dummy action
         self.observe(final_obs)
-        self.values[final_obs] = {action: 0 for action in self.actions}
+        self.values[final_obs] = 0
         self.get_next_action()
         # Perform final TD update.
         self.receive_reward(0)
         return super().finish_episode(final_obs)
 
+
+    def update_batch(self, env_ids):
+        """
+        Apply the TD(0) update for the given environments at once,
+        each computed from the values before this batch. A pair updated
+        by several environments moves by the mean of their updates.
+        """
+        updates = self.get_updates(env_ids)
+        if updates is None:
+            return
+
+        _, prev_state, prev_action, prev_reward, state, action = updates
+        values = self.values.array
+        td_target = prev_reward + self.gamma * values[state, action]
+        td_error = td_target - values[prev_state, prev_action]
+        step_size = self.step_size.batch(prev_state, prev_action, td_error)
+        self.values.add_mean(prev_state, prev_action, step_size * td_error)
+        self.td_error = np.abs(td_error).mean()
+        if self.model is not None:
+            self.model.add_batch(prev_state, prev_action, prev_reward, state, np.zeros(len(state), dtype=bool))
+            # As many planning steps as each environment would take alone
+            for _ in range(self.planning_steps):
+                self.replay(self.model.sample(len(state), self.rng))
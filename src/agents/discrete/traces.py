@@ -0,0 +1,72 @@
+"""
+Sparse eligibility traces which only track recently visited entries
+"""
+import numpy as np
+
+ACCUMULATING = 'accumulating'
+REPLACING = 'replacing'
+
+
+class EligibilityTrace:
+    """
+    Eligibility over flat table indices, stored as a compact active set.
+
+    Entries whose eligibility decays below `threshold` are dropped, so the
+    cost of each step depends on the length of the trace, not the table size.
+    A threshold of 0 keeps every entry visited this episode.
+    """
+
+    def __init__(self, mode=ACCUMULATING, threshold=1e-4):
+        assert mode in (ACCUMULATING, REPLACING), 'Unknown trace mode {}'.format(mode)
+        self.mode = mode
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the trace, eg. at the start of an episode
+        """
+        self.indices = np.empty(0, dtype=np.int64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def decay(self, factor):
+        """
+        Decay all eligibility and forget entries which have become negligible
+        """
+        self.weights *= factor
+        if self.threshold > 0:
+            keep = self.weights >= self.threshold
+            if not keep.all():
+                self.indices = self.indices[keep]
+                self.weights = self.weights[keep]
+
+    def visit(self, index):
+        """
+        Mark a flat index (or an array of them) as just visited
+        """
+        for i in np.atleast_1d(index):
+            position = np.flatnonzero(self.indices == i)
+            if position.size == 0:
+                self.indices = np.append(self.indices, i)
+                self.weights = np.append(self.weights, 1.0)
+            elif self.mode == REPLACING:
+                self.weights[position] = 1.0
+            else:
+                self.weights[position] += 1.0
+
+    def apply(self, flat_values, step):
+        """
+        Add step * eligibility to every active entry of a flat array
+        """
+        flat_values[self.indices] += step * self.weights
+
+    def to_array(self, size):
+        """
+        Dense copy of the trace, for debugging
+        """
+        dense = np.zeros(size)
+        dense[self.indices] = self.weights
+        return dense
@@ -0,0 +1,144 @@
+"""
+Ring buffer of transitions, for keeping experience around after an episode ends
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+Transitions = namedtuple('Transitions', ['states', 'actions', 'rewards', 'next_states', 'dones'])
+
+# Field name -> dtype
+FIELDS = {
+    'states': np.int32,
+    'actions': np.int32,
+    'rewards': np.float32,
+    'next_states': np.int32,
+    'dones': np.bool_,
+}
+
+
+class TrajectoryBuffer:
+    """
+    Fixed size store of (state, action, reward, next state, done) transitions
+    in typed arrays. Once full, the oldest transitions are overwritten.
+
+    When given a directory `path`, the arrays are memory-mapped .npy files
+    in that directory, so the buffer persists on disk and can be reopened with `load`.
+    """
+
+    def __init__(self, capacity, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.position = 0  # Where the next transition goes
+        self.size = 0  # How many transitions are stored
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+        for name, dtype in FIELDS.items():
+            if path:
+                array = np.lib.format.open_memmap(
+                    self.get_field_path(path, name), mode='w+', dtype=dtype, shape=(capacity,),
+                )
+            else:
+                array = np.zeros(capacity, dtype=dtype)
+
+            setattr(self, name, array)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reopen a buffer which was saved to disk
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        buffer = cls.__new__(cls)
+        buffer.capacity = meta['capacity']
+        buffer.position = meta['position']
+        buffer.size = meta['size']
+        buffer.path = path
+        for name in FIELDS:
+            setattr(buffer, name, np.load(cls.get_field_path(path, name), mmap_mode='r+'))
+
+        return buffer
+
+    @staticmethod
+    def get_field_path(path, name):
+        return os.path.join(path, name + '.npy')
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Store a single transition
+        """
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Store one transition from each environment of a vectorized environment
+        """
+        count = len(states)
+        if count > self.capacity:
+            # Only the newest transitions would survive anyway
+            states, actions, rewards = states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_states, dones = next_states[-self.capacity:], dones[-self.capacity:]
+            count = self.capacity
+
+        index = (self.position + np.arange(count)) % self.capacity
+        self.states[index] = states
+        self.actions[index] = actions
+        self.rewards[index] = rewards
+        self.next_states[index] = next_states
+        self.dones[index] = dones
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def get(self, index):
+        """
+        Gather the transitions at an array of buffer positions
+        """
+        return Transitions(
+            self.states[index], self.actions[index], self.rewards[index],
+            self.next_states[index], self.dones[index],
+        )
+
+    def sample(self, batch_size, rng=None):
+        """
+        Sample a batch of stored transitions uniformly, with replacement,
+        using a NumPy Generator
+        """
+        assert self.size > 0, 'Cannot sample from an empty buffer'
+        rng = rng or np.random.default_rng()
+        return self.get(rng.integers(self.size, size=batch_size))
+
+    def latest(self, count):
+        """
+        The most recent transitions, oldest first
+        """
+        count = min(count, self.size)
+        return self.get((self.position - count + np.arange(count)) % self.capacity)
+
+    def flush(self):
+        """
+        Write memory-mapped arrays and the buffer position to disk
+        """
+        if not self.path:
+            return
+
+        for name in FIELDS:
+            getattr(self, name).flush()
+
+        meta = {'capacity': self.capacity, 'position': self.position, 'size': self.size}
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
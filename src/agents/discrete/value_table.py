@@ -0,0 +1,134 @@
+"""
+Dense array-backed table of state-action values
+"""
+import numpy as np
+
+
+class ValueTable:
+    """
+    A (num_states, num_actions) array with a dict-like interface.
+
+    Indexing with a state returns a row view, which is handy for reading.
+    Write through the table instead, as in `values[state, action] += x`,
+    since each state's greedy action is cached until its row changes and
+    setting items through the table is what forgets the cache.
+    The old dict-of-dicts pattern `values[state][action] += x` writes to the
+    row view behind the table's back, leaving a stale greedy action.
+
+    Hot paths can write to `table.array` directly, as long as they then call
+    `invalidate` with the states they changed.
+    """
+
+    def __init__(self, num_states, num_actions, initial=0, dtype=np.float64):
+        self.array = np.full((num_states, num_actions), initial, dtype=dtype)
+        self.greedy_actions = [-1] * num_states  # -1 means not cached
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        Wrap an existing 2D array without copying it
+        """
+        assert array.ndim == 2
+        table = cls.__new__(cls)
+        table.array = array
+        table.greedy_actions = [-1] * array.shape[0]
+        return table
+
+    @property
+    def num_states(self):
+        return self.array.shape[0]
+
+    @property
+    def num_actions(self):
+        return self.array.shape[1]
+
+    def __getitem__(self, key):
+        return self.array[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict):
+            value = [value[a] for a in range(self.num_actions)]
+
+        self.array[key] = value
+        self.invalidate(key[0] if isinstance(key, tuple) else key)
+
+    def __len__(self):
+        return self.num_states
+
+    def __iter__(self):
+        return iter(range(self.num_states))
+
+    def __contains__(self, state):
+        return 0 <= state < self.num_states
+
+    def keys(self):
+        return range(self.num_states)
+
+    def items(self):
+        return zip(range(self.num_states), self.array)
+
+    def argmax(self, state):
+        """
+        Index of the best action in the given state (ties go to the lowest action)
+        """
+        action = self.greedy_actions[state]
+        if action < 0:
+            action = self.greedy_actions[state] = int(self.array[state].argmax())
+
+        return action
+
+    def invalidate(self, states=None):
+        """
+        Forget the cached greedy actions of a state, an array of states, or every state
+        """
+        if states is None or isinstance(states, slice) or (hasattr(states, '__len__') and len(states) >= self.num_states):
+            # Clearing the whole cache is cheaper than clearing this many states one by one
+            self.greedy_actions = [-1] * self.num_states
+        elif isinstance(states, (int, np.integer)):
+            self.greedy_actions[states] = -1
+        else:
+            greedy_actions = self.greedy_actions
+            for state in (states if isinstance(states, list) else np.ravel(states).tolist()):
+                greedy_actions[state] = -1
+
+    def add_mean(self, states, actions, updates):
+        """
+        Add a batch of updates to state-action pairs. A pair which appears more
+        than once gets the mean of its updates, since each one was worked out
+        from the same old value, and adding them all up would overshoot.
+        """
+        keys = np.asarray(states) * self.num_actions + actions
+        keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        if len(keys) == len(inverse):
+            # No repeats, so each update can go straight in
+            self.array[states, actions] += updates
+            self.invalidate(states)
+            return
+
+        updates = np.broadcast_to(updates, inverse.shape)
+        states, actions = np.divmod(keys, self.num_actions)
+        self.array[states, actions] += np.bincount(inverse.reshape(-1), weights=updates.reshape(-1)) / counts
+        self.invalidate(states)
+
+    def fill(self, value):
+        self.array.fill(value)
+        self.invalidate()
+
+    def to_dict(self):
+        return {
+            state: {action: row[action].item() for action in range(self.num_actions)}
+            for state, row in self.items()
+        }
+
+
+class UncachedValueTable(ValueTable):
+    """
+    A value table which works out greedy actions every time, for arrays which
+    other processes write to, since their writes can't invalidate our cache.
+    """
+
+    def argmax(self, state):
+        return int(self.array[state].argmax())
+
+    def invalidate(self, states=None):
+        pass
@@ -0,0 +1,2 @@
+from .tile_coding import TileCoder, IndexHashTable
+from .linear_agent import LinearSarsaLambdaAgent, LinearQLambdaAgent
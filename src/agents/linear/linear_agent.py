@@ -0,0 +1,162 @@
+"""
+Linear SARSA-Lambda and Watkins' Q-Lambda over tile-coded features,
+using epsilon-greedy exploration
+"""
+from ..discrete.base_agent import BaseAgent
+from ..discrete.traces import EligibilityTrace, REPLACING
+from ..discrete.value_table import ValueTable
+from .tile_coding import TileCoder
+
+
+class LinearSarsaLambdaAgent(BaseAgent):
+    """
+    Action values are a sum of weights, one for each active tile.
+    Only the active tiles' weights are read when acting, and only the tiles
+    in the eligibility trace are updated, so a step costs the same however
+    big the observation space is. Weights live in a `size` x actions table.
+    """
+
+    EPISODE_ATTRS = BaseAgent.EPISODE_ATTRS + (
+        'features', 'prev_features', 'action', 'reward', 'eligibility',
+    )
+    HYPERPARAMETERS = BaseAgent.HYPERPARAMETERS + (
+        'num_tilings', 'tiles_per_dim', 'size', 'bounds', 'trace', 'trace_threshold',
+    )
+    COMPONENTS = ()
+
+    def __init__(self, gamma=0, alpha=0, lambd=0, num_tilings=8, tiles_per_dim=8, size=4096,
+                 bounds=None, trace=REPLACING, trace_threshold=1e-4):
+        super().__init__(gamma, alpha, lambd)
+        self.num_tilings = num_tilings
+        self.tiles_per_dim = tiles_per_dim
+        self.size = size
+        self.bounds = bounds
+        self.trace = trace
+        self.trace_threshold = trace_threshold
+
+    def start_environment(self, env):
+        """
+        Setup the tile coder, without listing the states, there may be too many
+        """
+        self.actions = list(range(env.action_space.n))
+        self.observation_space = env.observation_space
+        self.tile_coder = self.make_tile_coder()
+        self.weights = ValueTable(self.size, len(self.actions))
+
+    def make_tile_coder(self):
+        return TileCoder.from_space(
+            self.observation_space, self.bounds, self.num_tilings, self.tiles_per_dim, self.size,
+        )
+
+    def start_episode(self):
+        super().start_episode()
+        self.features, self.prev_features = None, None
+        self.action, self.reward = None, None
+        self.eligibility = EligibilityTrace(self.trace, self.trace_threshold)
+
+    def observe(self, obs):
+        self.features, self.prev_features = self.tile_coder(obs), self.features
+
+    def get_action_values(self, features):
+        return self.weights.array[features].sum(axis=0)
+
+    def get_action_greedily(self, obs):
+        return int(self.get_action_values(self.tile_coder(obs)).argmax())
+
+    def bootstrap_value(self, action_values, action):
+        """
+        Value of the next state, SARSA uses the action which will be taken
+        """
+        return action_values[action]
+
+    def get_next_action(self):
+        """
+        Select the next action, then learn from the step which led here
+        """
+        action_values = self.get_action_values(self.features)
+        greedy_action = int(action_values.argmax())
+        if self.draw_uniform() >= self.get_epsilon():
+            action = greedy_action
+        else:
+            action = self.get_action_randomly()
+
+        if self.action is not None:
+            next_value = self.bootstrap_value(action_values, action)
+            self.learn(self.prev_features, self.action, self.reward, next_value)
+            if action != greedy_action:
+                self.explored()
+
+        self.action = action
+        return action
+
+    def explored(self):
+        """
+        Called after learning, when the next action is exploratory
+        """
+        pass
+
+    def receive_reward(self, reward):
+        super().receive_reward(reward)
+        self.reward = reward
+
+    def learn(self, features, action, reward, next_value):
+        """
+        Linear TD update, spreading the step size over the active tilings
+        """
+        weights = self.weights.array
+        td_error = reward + self.gamma * next_value - weights[features, action].sum()
+        self.eligibility.decay(self.gamma * self.lambd)
+        self.eligibility.visit(features * weights.shape[1] + action)
+        self.eligibility.apply(weights.reshape(-1), self.alpha / self.num_tilings * td_error)
+        self.td_error = td_error
+
+    def finish_episode(self, final_obs):
+        """
+        Perform final update for end of episode
+        Returns episode return
+        """
+        if self.action is not None:
+            self.learn(self.features, self.action, self.reward, 0)
+
+        return super().finish_episode(final_obs)
+
+    def save(self, path, **extra):
+        """
+        Save the tile indices along with the weights, so they still line up,
+        and the bounds being tiled, so the tile coder can be rebuilt without the environment
+        """
+        tile_coder = self.tile_coder
+        super().save(
+            path, tiles=tile_coder.hash_table.to_array(), low=tile_coder.low, high=tile_coder.high, **extra,
+        )
+
+    def load(self, path):
+        """
+        Restore a checkpoint, rebuilding the tile coder from the saved bounds,
+        since the saved hyperparameters may describe different tilings
+        """
+        extra = super().load(path)
+        self.actions = list(range(self.weights.num_actions))
+        self.tile_coder = TileCoder(
+            extra.pop('low'), extra.pop('high'), self.num_tilings, self.tiles_per_dim, self.size,
+        )
+        self.tile_coder.hash_table.load_array(extra.pop('tiles'))
+        return extra
+
+    def print_values(self):
+        hash_table = self.tile_coder.hash_table
+        print('Tiles in use:\t', len(hash_table), 'of', hash_table.size)
+        print('Hash overflows:\t', hash_table.overflows)
+
+
+class LinearQLambdaAgent(LinearSarsaLambdaAgent):
+    """
+    Watkins' Q-Lambda: bootstraps from the greedy action, and since the trace
+    only describes the greedy policy, cuts it after each exploratory action.
+    """
+
+    def bootstrap_value(self, action_values, action):
+        return action_values.max()
+
+    def explored(self):
+        self.eligibility.reset()
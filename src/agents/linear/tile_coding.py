@@ -0,0 +1,94 @@
+"""
+Tile coding, which turns a continuous (or very large) observation into a few
+active binary features, one tile from each of several offset grids.
+"""
+import numpy as np
+
+
+class IndexHashTable:
+    """
+    Gives each tile its own index until `size` indices have been handed out,
+    after that new tiles share indices by hashing, so memory never grows past `size`.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.indices = {}
+        self.overflows = 0  # How many lookups had to fall back on hashing
+
+    def __len__(self):
+        return len(self.indices)
+
+    def get_index(self, coordinates):
+        index = self.indices.get(coordinates)
+        if index is not None:
+            return index
+
+        count = len(self.indices)
+        if count < self.size:
+            self.indices[coordinates] = count
+            return count
+
+        self.overflows += 1
+        return hash(coordinates) % self.size
+
+    def to_array(self):
+        """
+        Every stored tile's coordinates, in order of their indices, for checkpoints
+        """
+        return np.array(list(self.indices), dtype=np.int64)
+
+    def load_array(self, coordinates):
+        """
+        Restore the tiles saved by `to_array`
+        """
+        self.indices = {tuple(row): index for index, row in enumerate(coordinates.tolist())}
+
+
+class TileCoder:
+    """
+    Covers the box between `low` and `high` with `num_tilings` grids of
+    `tiles_per_dim` tiles along each dimension. Each grid is shifted by a different
+    fraction of a tile, by an uneven amount along each dimension, so nearby
+    observations share most of their tiles.
+    """
+
+    def __init__(self, low, high, num_tilings=8, tiles_per_dim=8, size=4096):
+        low = np.asarray(low, dtype=np.float64).ravel()
+        high = np.asarray(high, dtype=np.float64).ravel()
+        assert np.isfinite(low).all() and np.isfinite(high).all(), \
+            'Tile coding needs finite bounds, pass them in for unbounded observations'
+        self.low = low
+        self.high = high
+        self.num_tilings = num_tilings
+        # Scales an observation into units of 1 / num_tilings of a tile
+        self.scale = tiles_per_dim * num_tilings / (high - low)
+        # Tiling t is shifted by t * (1, 3, 5, ...) / num_tilings of a tile
+        tilings = np.arange(num_tilings)[:, None]
+        self.offsets = tilings * (2 * np.arange(len(low)) + 1)
+        self.tilings = tilings
+        self.hash_table = IndexHashTable(size)
+
+    @classmethod
+    def from_space(cls, space, bounds=None, num_tilings=8, tiles_per_dim=8, size=4096):
+        """
+        Tile code a gym space, using explicit (low, high) bounds per dimension if given
+        """
+        if bounds is not None:
+            low, high = zip(*bounds)
+        elif hasattr(space, 'n'):
+            low, high = [0], [space.n]
+        else:
+            low, high = space.low, space.high
+
+        return cls(low, high, num_tilings, tiles_per_dim, size)
+
+    def __call__(self, observation):
+        """
+        The index of each tiling's active tile, an array of num_tilings indices
+        """
+        scaled = np.floor((np.asarray(observation, dtype=np.float64).ravel() - self.low) * self.scale)
+        coordinates = (scaled.astype(np.int64) + self.offsets) // self.num_tilings
+        keys = np.concatenate([self.tilings, coordinates], axis=1).tolist()
+        get_index = self.hash_table.get_index
+        return np.array([get_index(tuple(key)) for key in keys], dtype=np.int64)
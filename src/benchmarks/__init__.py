@@ -0,0 +1 @@
+from .harness import run_benchmarks, compare_to_baseline, AGENTS, ENVIRONMENTS
@@ -0,0 +1,71 @@
+"""
+Benchmark agent step latency, throughput and episodes to solve.
+
+    python3 -m src.benchmarks --output benchmark.json --baseline benchmark_baseline.json
+
+Exits with status 1 if any metric regressed against the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from .harness import run_benchmarks, compare_to_baseline, AGENTS, ENVIRONMENTS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark agents')
+    parser.add_argument('--agent', nargs='+', choices=list(AGENTS), default=None)
+    parser.add_argument('--env', nargs='+', choices=list(ENVIRONMENTS), default=None)
+    parser.add_argument('--steps', type=int, default=10 * 1000, help='Steps to time per agent')
+    parser.add_argument('--episodes', type=int, default=10 * 1000, help='Training episode budget')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--baseline', default=None, help='Results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.agent, args.env, args.steps, args.episodes, args.seed)
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'steps': args.steps,
+            'episodes': args.episodes,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        print('{agent:<20}{env:<34}step {get_next_action_ns:>8.0f}ns '
+              'update {receive_reward_ns:>8.0f}ns {episodes_per_sec:>10.0f} eps/s '
+              'solved in {episodes_to_solve}'.format(**r))
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print('No baseline at', args.baseline)
+            return
+
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for agent, env, metric, old_value, new_value in regressions:
+            print('REGRESSION {} {} {}: {} -> {}'.format(agent, env, metric, old_value, new_value))
+
+        if regressions:
+            sys.exit(1)
+
+        print('No regressions against', args.baseline)
+
+
+if __name__ == '__main__':
+    main()
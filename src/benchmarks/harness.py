@@ -0,0 +1,177 @@
+"""
+Measure how fast agents run, and how many episodes they need to solve each environment
+"""
+import time
+
+import numpy as np
+
+from .. import agents, training
+from ..envs.two_doors import TwoDoorsTestEnv
+from ..frozen_lake.environments import make_env, get_solved_threshold, MAX_EPISODE_STEPS
+
+GAMMA, ALPHA, LAMBDA = 0.9, 0.1, 0.8
+
+# Agent name -> factory
+AGENTS = {
+    'RandomAgent': lambda: agents.discrete.RandomAgent(),
+    'MonteCarloAgent': lambda: agents.discrete.MonteCarloAgent(GAMMA),
+    'TDZeroAgent': lambda: agents.discrete.TDZeroAgent(GAMMA, ALPHA),
+    'TDLambdaAgent': lambda: agents.discrete.TDLambdaAgent(GAMMA, ALPHA, LAMBDA),
+    'QLearningAgent': lambda: agents.discrete.QLearningAgent(GAMMA, ALPHA),
+    'ExpectedSarsaAgent': lambda: agents.discrete.ExpectedSarsaAgent(GAMMA, ALPHA),
+    'QLearningReplayAgent': lambda: agents.discrete.QLearningAgent(
+        GAMMA, ALPHA, replay_buffer=agents.discrete.TrajectoryBuffer(10 * 1000), replay_updates=4,
+    ),
+    'PrioritizedSweepingAgent': lambda: agents.discrete.PrioritizedSweepingAgent(GAMMA),
+    'DynamicProgrammingAgent': lambda: agents.discrete.DynamicProgrammingAgent(GAMMA),
+}
+
+
+def frozen_lake(is_slippery, map_name, fast=False):
+    return (
+        lambda: make_env(is_slippery, map_name, fast=fast),
+        get_solved_threshold(is_slippery, map_name),
+        MAX_EPISODE_STEPS[map_name],
+    )
+
+
+# Environment name -> (factory, solved threshold, max steps)
+ENVIRONMENTS = {
+    'FrozenLake4x4': frozen_lake(True, '4x4'),
+    'FrozenLake4x4NotSlippery': frozen_lake(False, '4x4'),
+    'FrozenLake8x8': frozen_lake(True, '8x8'),
+    'FrozenLake8x8NotSlippery': frozen_lake(False, '8x8'),
+    'FastFrozenLake4x4': frozen_lake(True, '4x4', fast=True),
+    'FastFrozenLake8x8': frozen_lake(True, '8x8', fast=True),
+    'TwoDoors': (lambda: TwoDoorsTestEnv(p_left=0.8, p_right=0.2), 0.7, 100),
+}
+
+# Generated lakes, to see how agents scale with the number of states.
+# They're slow to train on, so they only run when asked for by name.
+SCALING_ENVIRONMENTS = {
+    'FastFrozenLake{0}x{0}NotSlippery'.format(size): frozen_lake(False, '{0}x{0}'.format(size), fast=True)
+    for size in (16, 32, 64, 128, 256)
+}
+DEFAULT_ENVIRONMENTS = list(ENVIRONMENTS)
+ENVIRONMENTS.update(SCALING_ENVIRONMENTS)
+
+# Metric name -> whether a bigger number is better
+METRICS = {
+    'get_next_action_ns': False,
+    'receive_reward_ns': False,
+    'finish_episode_ns': False,
+    'episodes_per_sec': True,
+    'episodes_to_solve': False,
+}
+
+
+def summarize_ns(timings):
+    timings = np.array(timings)
+    return {
+        'mean': float(timings.mean()) if len(timings) else None,
+        'p50': float(np.percentile(timings, 50)) if len(timings) else None,
+        'p95': float(np.percentile(timings, 95)) if len(timings) else None,
+    }
+
+
+def measure_step_latency(agent, env, num_steps, max_steps, seed=0):
+    """
+    Time every call to get_next_action, receive_reward and finish_episode
+    over num_steps environment steps, in nanoseconds
+    """
+    clock = time.perf_counter_ns
+    training.seed_run(agent, env, seed)
+    agent.start_environment(env)
+    timings = {'get_next_action': [], 'receive_reward': [], 'finish_episode': []}
+    steps = 0
+    while steps < num_steps:
+        agent.start_episode()
+        observation = env.reset()
+        for t in range(max_steps):
+            agent.observe(observation)
+            start = clock()
+            action = agent.get_next_action()
+            timings['get_next_action'].append(clock() - start)
+            observation, reward, done, info = env.step(action)
+            start = clock()
+            agent.receive_reward(reward)
+            timings['receive_reward'].append(clock() - start)
+            steps += 1
+            if done:
+                start = clock()
+                agent.finish_episode(observation)
+                timings['finish_episode'].append(clock() - start)
+                break
+
+    return {name: summarize_ns(values) for name, values in timings.items()}
+
+
+def measure_training(agent, env, num_episodes, max_steps, solved, seed=0):
+    """
+    Train until solved or out of episodes, measuring episodes per second
+    """
+    start_time = time.perf_counter()
+    result = training.run_environment(agent, env, num_episodes, max_steps, solved, verbose=False, seed=seed)
+    wall_time = time.perf_counter() - start_time
+    return {
+        'episodes': result.episodes,
+        'episodes_per_sec': result.episodes / wall_time,
+        'episodes_to_solve': result.episodes if result.solved else None,
+        'average_return': result.average_return,
+        'wall_time': wall_time,
+    }
+
+
+def run_benchmarks(agent_names=None, env_names=None, num_steps=10 * 1000,
+                   num_episodes=10 * 1000, seed=0):
+    """
+    Benchmark every agent on every environment, returns a list of result dicts
+    """
+    results = []
+    for env_name in env_names or DEFAULT_ENVIRONMENTS:
+        make, solved, max_steps = ENVIRONMENTS[env_name]
+        for agent_name in agent_names or AGENTS:
+            latency = measure_step_latency(AGENTS[agent_name](), make(), num_steps, max_steps, seed)
+            training_result = measure_training(
+                AGENTS[agent_name](), make(), num_episodes, max_steps, solved, seed,
+            )
+            result = {'agent': agent_name, 'env': env_name, 'seed': seed}
+            for method, summary in latency.items():
+                result[method + '_ns'] = summary['p50']
+                result[method + '_ns_summary'] = summary
+
+            result.update(training_result)
+            results.append(result)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Find metrics which got worse than the baseline by more than a fraction `tolerance`
+    Returns a list of (agent, env, metric, baseline value, new value)
+    """
+    baseline_by_key = {(r['agent'], r['env']): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = baseline_by_key.get((result['agent'], result['env']))
+        if old is None:
+            continue
+
+        for metric, bigger_is_better in METRICS.items():
+            old_value, new_value = old.get(metric), result.get(metric)
+            if old_value is None or new_value is None:
+                # Failing to solve at all is a regression in episodes to solve
+                if metric == 'episodes_to_solve' and old_value is not None:
+                    regressions.append((result['agent'], result['env'], metric, old_value, new_value))
+                continue
+
+            if bigger_is_better:
+                is_worse = new_value < old_value * (1 - tolerance)
+            else:
+                is_worse = new_value > old_value * (1 + tolerance)
+
+            if is_worse:
+                regressions.append((result['agent'], result['env'], metric, old_value, new_value))
+
+    return regressions
@@ -0,0 +1,5 @@
+from .tables import TransitionTable, DiscreteSpace
+from .vector import VectorEnv, DiscreteVectorEnv, make_vector_env
+from .fast_frozen_lake import FastFrozenLake
+from .indexing import MixedRadixIndexer, HashIndexer, IndexedEnv, make_indexer, make_blackjack, make_minigrid
+from .remote import EnvServer, RemoteEnv, RemoteVectorEnv, RemoteEnvError
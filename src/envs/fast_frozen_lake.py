@@ -0,0 +1,302 @@
+"""
+Pure NumPy frozen lake, a drop-in replacement for gym's FrozenLakeEnv.
+
+Uses the same maps and slip rules as FrozenLake-v0, but builds its
+transition table with array operations instead of a dict of lists, and
+samples transitions with NumPy, for one lake or a whole batch of them.
+Doesn't import gym, so it's quick to start.
+"""
+import sys
+
+import numpy as np
+
+from .tables import TransitionTable, DiscreteSpace
+from .vector import DiscreteVectorEnv
+
+LEFT = 0
+DOWN = 1
+RIGHT = 2
+UP = 3
+
+# Same as gym.envs.toy_text.frozen_lake.MAPS
+MAPS = {
+    '4x4': [
+        'SFFF',
+        'FHFH',
+        'FFFH',
+        'HFFG'
+    ],
+    '8x8': [
+        'SFFFFFFF',
+        'FFFFFFFF',
+        'FFFHFFFF',
+        'FFFFFHFF',
+        'FFFHFFFF',
+        'FHHFFFHF',
+        'FHFFHFHF',
+        'FFFHFFFG'
+    ],
+}
+
+# gym id -> (map name, is slippery, max episode steps)
+ENV_IDS = {
+    'FrozenLake-v0': ('4x4', True, 100),
+    'FrozenLake8x8-v0': ('8x8', True, 200),
+    'FrozenLakeNotSlippery-v0': ('4x4', False, 100),
+    'FrozenLake8x8NotSlippery-v0': ('8x8', False, 200),
+}
+
+# Bigger lakes, with random holes, for measuring how agents scale with the number of states.
+# Each size always gets the same map, generated from GENERATED_SEED the first time it's used.
+GENERATED_SIZES = (16, 32, 64, 128, 256)
+GENERATED_HOLE_DENSITY = 0.2
+GENERATED_SEED = 0
+
+
+def get_max_episode_steps(size):
+    """
+    Time limit for a size x size lake, which scales like gym's 100 for 4x4 and 200 for 8x8
+    """
+    return 25 * size
+
+
+GENERATED_ENV_IDS = {}
+for size in GENERATED_SIZES:
+    map_name = '{0}x{0}'.format(size)
+    GENERATED_ENV_IDS['FrozenLake{}-v0'.format(map_name)] = (map_name, True, get_max_episode_steps(size))
+    GENERATED_ENV_IDS['FrozenLake{}NotSlippery-v0'.format(map_name)] = (map_name, False, get_max_episode_steps(size))
+
+
+def is_solvable(desc):
+    """
+    Whether the goal can be reached from the start without falling in a hole,
+    by a depth first search over the frozen tiles
+    """
+    desc = np.asarray(desc, dtype='c')
+    num_rows, num_cols = desc.shape
+    letters = desc.ravel()
+    is_open = (letters != b'H').tolist()
+    goals = set(np.flatnonzero(letters == b'G').tolist())
+    start = int(np.flatnonzero(letters == b'S')[0])
+    seen = bytearray(len(is_open))
+    seen[start] = 1
+    stack = [start]
+    while stack:
+        state = stack.pop()
+        if state in goals:
+            return True
+
+        row, col = divmod(state, num_cols)
+        for neighbour, is_inside in (
+            (state - 1, col > 0),
+            (state + 1, col < num_cols - 1),
+            (state - num_cols, row > 0),
+            (state + num_cols, row < num_rows - 1),
+        ):
+            if is_inside and is_open[neighbour] and not seen[neighbour]:
+                seen[neighbour] = 1
+                stack.append(neighbour)
+
+    return False
+
+
+def generate_map(size, hole_density=GENERATED_HOLE_DENSITY, seed=None, max_tries=100):
+    """
+    A random solvable size x size map, starting in the top left with the goal in the bottom right,
+    where each other tile is a hole with probability hole_density.
+    Much above 0.4 the holes usually cut the start off from the goal on big maps.
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(max_tries):
+        desc = np.where(rng.random((size, size)) < hole_density, b'H', b'F')
+        desc[0, 0] = b'S'
+        desc[-1, -1] = b'G'
+        if is_solvable(desc):
+            return [row.tobytes().decode('utf-8') for row in desc]
+
+    raise ValueError('No solvable {0}x{0} map with hole density {1} in {2} tries'.format(
+        size, hole_density, max_tries,
+    ))
+
+
+def get_map(map_name):
+    """
+    One of gym's maps, or a generated map for names like '64x64'
+    """
+    if map_name not in MAPS:
+        num_rows, num_cols = map_name.split('x')
+        assert num_rows == num_cols, 'Generated maps are square'
+        MAPS[map_name] = generate_map(int(num_rows), seed=GENERATED_SEED)
+
+    return MAPS[map_name]
+
+
+def get_env_spec(env_id):
+    """
+    (map name, is slippery, max episode steps) for a gym or generated lake id
+    """
+    if env_id in ENV_IDS:
+        return ENV_IDS[env_id]
+
+    return GENERATED_ENV_IDS[env_id]
+
+
+def build_table(desc, is_slippery=True):
+    """
+    Build the frozen lake transition table for a map, for every state at once.
+    Holes and the goal are absorbing, reaching either ends the episode,
+    and reaching the goal is worth 1. On slippery ice, the agent moves in the
+    intended direction or either perpendicular direction with equal probability.
+    """
+    desc = np.asarray(desc, dtype='c')
+    num_rows, num_cols = desc.shape
+    num_states, num_actions = num_rows * num_cols, 4
+    rows, cols = np.divmod(np.arange(num_states), num_cols)
+    letters = desc.ravel()
+    is_terminal = (letters == b'G') | (letters == b'H')
+
+    # Where each direction leads from each state, bumping into the edges
+    moves = np.empty((num_states, num_actions), dtype=np.int64)
+    moves[:, LEFT] = rows * num_cols + np.maximum(cols - 1, 0)
+    moves[:, DOWN] = np.minimum(rows + 1, num_rows - 1) * num_cols + cols
+    moves[:, RIGHT] = rows * num_cols + np.minimum(cols + 1, num_cols - 1)
+    moves[:, UP] = np.maximum(rows - 1, 0) * num_cols + cols
+
+    actions = np.arange(num_actions)
+    if is_slippery:
+        directions = np.stack([(actions - 1) % 4, actions, (actions + 1) % 4], axis=-1)
+    else:
+        directions = actions[:, None]
+
+    num_outcomes = directions.shape[1]
+    next_states = moves[:, directions]
+    probs = np.full(next_states.shape, 1.0 / num_outcomes)
+    # Terminal states loop back to themselves with certainty
+    self_loops = np.broadcast_to(np.arange(num_states)[:, None, None], next_states.shape)
+    next_states = np.where(is_terminal[:, None, None], self_loops, next_states)
+    if num_outcomes > 1:
+        probs[is_terminal, :, 0] = 1.0
+        probs[is_terminal, :, 1:] = 0.0
+
+    next_letters = letters[next_states]
+    rewards = (next_letters == b'G').astype(np.float64)
+    dones = (next_letters == b'G') | (next_letters == b'H')
+    rewards[is_terminal] = 0
+    dones[is_terminal] = True
+
+    initial_distribution = (letters == b'S').astype(np.float64)
+    initial_distribution /= initial_distribution.sum()
+    return TransitionTable(probs, next_states, rewards, dones, initial_distribution)
+
+
+class FastFrozenLake:
+    """
+    One frozen lake, with the same reset/step/seed interface as gym.make('FrozenLake-v0'),
+    including the time limit that gym.make adds.
+    """
+
+    def __init__(self, desc=None, map_name='4x4', is_slippery=True, max_episode_steps=None, seed=None):
+        if desc is None:
+            desc = get_map(map_name)
+        self.desc = np.asarray(desc, dtype='c')
+        self.nrow, self.ncol = self.desc.shape
+        self.transition_table = build_table(self.desc, is_slippery)
+        self.nS, self.nA = self.transition_table.num_states, self.transition_table.num_actions
+        self.observation_space = DiscreteSpace(self.nS)
+        self.action_space = DiscreteSpace(self.nA)
+        self.reward_range = (0, 1)
+        self.max_episode_steps = max_episode_steps
+        self.seed(seed)
+        # Nested list copies of each state's rows of the table, since indexing lists
+        # one element at a time is much cheaper than indexing NumPy arrays.
+        # They're made the first time each state is visited, so big lakes start quickly.
+        self.step_rows = [None] * self.nS
+        self.s = 0
+        self.elapsed_steps = 0
+        self.lastaction = None
+
+    @property
+    def unwrapped(self):
+        return self
+
+    def seed(self, seed=None):
+        """
+        Seed the lake's generator, from an int or a SeedSequence
+        """
+        self.np_random = np.random.default_rng(seed)
+        self.uniforms = []
+        self.uniform_index = 0
+        return [seed]
+
+    def draw_uniform(self):
+        """
+        A uniform draw in [0, 1), taken from the generator in batches
+        """
+        i = self.uniform_index
+        if i == len(self.uniforms):
+            self.uniforms = self.np_random.random(1024).tolist()
+            i = 0
+
+        self.uniform_index = i + 1
+        return self.uniforms[i]
+
+    def reset(self):
+        uniforms = np.array([self.draw_uniform()])
+        self.s = int(self.transition_table.sample_initial(uniforms)[0])
+        self.elapsed_steps = 0
+        self.lastaction = None
+        return self.s
+
+    def get_step_row(self, s):
+        table = self.transition_table
+        row = self.step_rows[s] = [
+            array[s].tolist()
+            for array in (table.cumulative_probs, table.next_states, table.rewards, table.dones, table.probs)
+        ]
+        return row
+
+    def step(self, action):
+        s = self.s
+        row = self.step_rows[s] or self.get_step_row(s)
+        cumulative_probs, next_states, rewards, dones, probs = row
+        u = self.draw_uniform()
+        cumulative = cumulative_probs[action]
+        outcome, last = 0, len(cumulative) - 1
+        while outcome < last and u >= cumulative[outcome]:
+            outcome += 1
+
+        self.s = next_states[action][outcome]
+        self.lastaction = action
+        self.elapsed_steps += 1
+        done = dones[action][outcome]
+        if self.max_episode_steps is not None and self.elapsed_steps >= self.max_episode_steps:
+            done = True
+
+        return self.s, rewards[action][outcome], done, {'prob': probs[action][outcome]}
+
+    def render(self, mode='human'):
+        row, col = divmod(self.s, self.ncol)
+        lines = [[c.decode('utf-8') for c in line] for line in self.desc.tolist()]
+        lines[row][col] = '[{}]'.format(lines[row][col])
+        if self.lastaction is not None:
+            print('  ({})'.format(['Left', 'Down', 'Right', 'Up'][self.lastaction]))
+
+        sys.stdout.write('\n'.join(''.join(line) for line in lines) + '\n')
+
+
+def make(env_id, seed=None):
+    """
+    Drop-in for gym.make, for the frozen lake ids and the generated lake ids
+    """
+    map_name, is_slippery, max_episode_steps = get_env_spec(env_id)
+    return FastFrozenLake(map_name=map_name, is_slippery=is_slippery,
+                          max_episode_steps=max_episode_steps, seed=seed)
+
+
+def make_vector(env_id, num_envs, seed=None):
+    """
+    A batch of num_envs lakes which are stepped together
+    """
+    map_name, is_slippery, max_episode_steps = get_env_spec(env_id)
+    table = build_table(get_map(map_name), is_slippery)
+    return DiscreteVectorEnv(table, num_envs, max_episode_steps, seed)
@@ -0,0 +1,187 @@
+"""
+Map structured observations to dense integer state ids, so the tabular agents,
+which only know about a Discrete observation space, run on any environment.
+
+Tuple and MultiDiscrete spaces of known size get a mixed-radix encoding:
+observation (x0, x1, ..., xk) is state x0 * stride0 + x1 * stride1 + ... + xk,
+which is a couple of multiply-adds per step. Other observations, like
+gridworld images, are given the next free id the first time they're seen.
+"""
+import numpy as np
+
+from .tables import DiscreteSpace
+
+
+def get_space_sizes(space):
+    """
+    The number of values of each discrete part of a space, in order,
+    or None if some part of it isn't discrete
+    """
+    if hasattr(space, 'n'):
+        return [space.n]
+    if hasattr(space, 'nvec'):
+        return [int(n) for n in np.ravel(space.nvec)]
+    if hasattr(space, 'spaces') and isinstance(space.spaces, (list, tuple)):
+        sizes = []
+        for subspace in space.spaces:
+            subspace_sizes = get_space_sizes(subspace)
+            if subspace_sizes is None:
+                return None
+            sizes.extend(subspace_sizes)
+        return sizes
+
+    return None
+
+
+def flatten(obs):
+    """
+    Nested tuples, lists and arrays of ints as one flat list
+    """
+    if isinstance(obs, (tuple, list)):
+        return [x for part in obs for x in flatten(part)]
+    if isinstance(obs, np.ndarray):
+        return obs.ravel().tolist()
+    return [obs]
+
+
+class MixedRadixIndexer:
+    """
+    Numbers every combination of a fixed list of discrete values,
+    with the last value changing fastest.
+    """
+
+    def __init__(self, sizes):
+        self.sizes = list(sizes)
+        strides = np.cumprod([1] + self.sizes[:0:-1])[::-1]
+        self.strides = [int(stride) for stride in strides]
+        self.n = int(np.prod(self.sizes))
+
+    def __call__(self, obs):
+        if not isinstance(obs, tuple) or len(obs) != len(self.strides):
+            obs = flatten(obs)
+        index = 0
+        for x, stride in zip(obs, self.strides):
+            index += int(x) * stride
+        return index
+
+    def index_batch(self, observations):
+        """
+        State ids of an array of flat observations, shape (num_obs, num_parts)
+        """
+        return np.asarray(observations, dtype=np.int64).reshape(-1, len(self.sizes)) @ self.strides
+
+    def observation(self, index):
+        """
+        The flat observation with the given state id
+        """
+        parts = []
+        for stride, size in zip(self.strides, self.sizes):
+            parts.append(index // stride % size)
+        return tuple(parts)
+
+
+class HashIndexer:
+    """
+    Gives each distinct observation the next free state id, up to `size` of them.
+    Observations can be anything made of tuples, lists, dicts and arrays.
+    """
+
+    def __init__(self, size):
+        self.n = size
+        self.indices = {}
+
+    def get_key(self, obs):
+        if isinstance(obs, dict):
+            return tuple((name, self.get_key(obs[name])) for name in sorted(obs))
+        if isinstance(obs, np.ndarray):
+            return (obs.shape, obs.tobytes())
+        if isinstance(obs, (tuple, list)):
+            return tuple(self.get_key(x) for x in obs)
+        return obs
+
+    def __call__(self, obs):
+        key = self.get_key(obs)
+        index = self.indices.get(key)
+        if index is None:
+            index = len(self.indices)
+            if index >= self.n:
+                raise ValueError('More than {} distinct observations, make the HashIndexer bigger'.format(self.n))
+            self.indices[key] = index
+
+        return index
+
+
+def make_indexer(space, size=None):
+    """
+    A mixed-radix indexer if every part of the space is discrete,
+    otherwise a hash indexer for up to `size` observations
+    """
+    sizes = get_space_sizes(space)
+    if sizes is not None:
+        return MixedRadixIndexer(sizes)
+
+    assert size, 'Observations from {} need a HashIndexer size'.format(space)
+    return HashIndexer(size)
+
+
+class IndexedEnv:
+    """
+    Wraps an environment so its observations are state ids from an indexer,
+    with a matching Discrete observation space.
+
+    The tabular agents zero the values of the final observation of an episode,
+    which is only right if it's an absorbing state. In blackjack, sticking on 20
+    ends the episode still showing 20, so with `terminal_state` every episode
+    ends in one extra state, numbered after the indexer's states, instead.
+    """
+
+    def __init__(self, env, indexer=None, size=None, terminal_state=True):
+        self.env = env
+        self.indexer = indexer or make_indexer(env.observation_space, size)
+        self.terminal_state = self.indexer.n if terminal_state else None
+        self.observation_space = DiscreteSpace(self.indexer.n + (1 if terminal_state else 0))
+        self.action_space = env.action_space
+        self.reward_range = getattr(env, 'reward_range', None)
+        self._max_episode_steps = getattr(env, '_max_episode_steps', getattr(env, 'max_episode_steps', None))
+
+    @property
+    def unwrapped(self):
+        return getattr(self.env, 'unwrapped', self.env)
+
+    def seed(self, seed=None):
+        return self.env.seed(seed)
+
+    def reset(self):
+        return self.indexer(self.env.reset())
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        if done and self.terminal_state is not None:
+            return self.terminal_state, reward, done, info
+
+        return self.indexer(obs), reward, done, info
+
+    def render(self, mode='human'):
+        return self.env.render(mode)
+
+    def close(self):
+        if hasattr(self.env, 'close'):
+            self.env.close()
+
+
+def make_blackjack(natural=False):
+    """
+    Blackjack with its (player sum, dealer card, usable ace) observations as state ids
+    """
+    from gym.envs.toy_text.blackjack import BlackjackEnv
+    return IndexedEnv(BlackjackEnv(natural))
+
+
+def make_minigrid(env_id, size=10 * 1000):
+    """
+    A gym-minigrid environment, with each distinct view of the grid as a state id.
+    Needs the gym-minigrid package.
+    """
+    import gym
+    import gym_minigrid  # noqa: F401, registers the MiniGrid ids
+    return IndexedEnv(gym.make(env_id), HashIndexer(size))
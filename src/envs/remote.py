@@ -0,0 +1,311 @@
+"""
+Environments which run in another process, or on another machine,
+and are driven over a socket with asyncio.
+
+The protocol is one JSON object per line. The client sends a command,
+the server sends back one response:
+
+    {"command": "spaces"}              -> {"observation_space": 16, "action_space": 4}
+    {"command": "seed", "seed": 3}     -> {"seeds": [3]}
+    {"command": "reset"}               -> {"observation": 0}
+    {"command": "step", "action": 2}   -> {"observation": 1, "reward": 0.0, "done": false, "info": {}}
+    {"command": "close"}               (the server hangs up)
+
+Failures come back as {"error": "..."}. Each connection gets its own environment,
+so one server can host many sessions at once.
+
+RemoteVectorEnv keeps a session per environment. Its `step` sends a batch of
+actions to all of them at once, so a step takes as long as the slowest session
+rather than the sum of all of them, like VectorEnv. Split into `step_async` and
+`step_wait`, sessions move independently instead: each wait returns whichever
+sessions have replied, so the batched runner can give them their next actions
+while slow sessions are still working, and one slow session holds back nobody else.
+"""
+import asyncio
+import json
+import threading
+
+import numpy as np
+
+from .. import seeding
+from .tables import DiscreteSpace
+
+
+class RemoteEnvError(Exception):
+    pass
+
+
+def encode(message):
+    return (json.dumps(message, default=to_json) + '\n').encode('utf-8')
+
+
+def to_json(value):
+    """
+    Convert NumPy scalars and arrays, which json doesn't know about
+    """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError('Cannot send {!r}'.format(value))
+
+
+class EnvServer:
+    """
+    Serves environments made by `make_env`, one per connection.
+    Every step is delayed by `latency` seconds, to stand in for a slow or far away environment.
+    Given a list of latencies, the nth connection gets the nth one, to mix slow sessions with fast ones.
+    """
+
+    def __init__(self, make_env, host='127.0.0.1', port=0, latency=0):
+        self.make_env = make_env
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.num_connections = 0
+        self.server = None
+        self.loop = None
+        self.thread = None
+
+    async def start(self):
+        """
+        Start listening, on a free port if none was given
+        """
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def handle(self, reader, writer):
+        env = self.make_env()
+        latency = self.latency
+        if isinstance(latency, (list, tuple)):
+            latency = latency[self.num_connections % len(latency)]
+        self.num_connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                request = json.loads(line)
+                if request.get('command') == 'close':
+                    break
+
+                try:
+                    response = self.respond(env, request)
+                except Exception as e:
+                    response = {'error': '{}: {}'.format(type(e).__name__, e)}
+
+                if latency and request.get('command') == 'step':
+                    await asyncio.sleep(latency)
+
+                writer.write(encode(response))
+                await writer.drain()
+        finally:
+            writer.close()
+            if hasattr(env, 'close'):
+                env.close()
+
+    def respond(self, env, request):
+        command = request.get('command')
+        if command == 'step':
+            observation, reward, done, info = env.step(request['action'])
+            return {'observation': observation, 'reward': reward, 'done': done, 'info': info}
+        if command == 'reset':
+            return {'observation': env.reset()}
+        if command == 'seed':
+            return {'seeds': env.seed(request.get('seed'))}
+        if command == 'spaces':
+            return {'observation_space': env.observation_space.n, 'action_space': env.action_space.n}
+
+        raise ValueError('Unknown command {}'.format(command))
+
+    def serve_in_thread(self):
+        """
+        Run the server on its own event loop in a background thread,
+        returns the port once it's listening
+        """
+        started = threading.Event()
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.start())
+            started.set()
+            self.loop.run_forever()
+            self.server.close()
+            # Sessions may still be mid-step, if their clients stopped waiting for them
+            sessions = asyncio.all_tasks(self.loop)
+            if sessions:
+                for task in sessions:
+                    task.cancel()
+                self.loop.run_until_complete(asyncio.wait(sessions))
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        return self.port
+
+    def close(self):
+        """
+        Stop a server started with `serve_in_thread`
+        """
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+
+def serve(make_env, host='127.0.0.1', port=0, latency=0):
+    """
+    Serve environments until interrupted
+    """
+    async def run():
+        server = EnvServer(make_env, host, port, latency)
+        await server.start()
+        print('Serving environments on {}:{}'.format(server.host, server.port))
+        async with server.server:
+            await server.server.serve_forever()
+
+    asyncio.run(run())
+
+
+class RemoteEnv:
+    """
+    Client side of one environment session, with coroutines for reset, step and seed
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.observation_space = None
+        self.action_space = None
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        env = cls(reader, writer)
+        spaces = await env.request('spaces')
+        env.observation_space = DiscreteSpace(spaces['observation_space'])
+        env.action_space = DiscreteSpace(spaces['action_space'])
+        return env
+
+    async def request(self, command, **kwargs):
+        kwargs['command'] = command
+        self.writer.write(encode(kwargs))
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise RemoteEnvError('The server hung up')
+
+        response = json.loads(line)
+        if 'error' in response:
+            raise RemoteEnvError(response['error'])
+
+        return response
+
+    async def seed(self, seed=None):
+        return (await self.request('seed', seed=seed))['seeds']
+
+    async def reset(self):
+        return (await self.request('reset'))['observation']
+
+    async def step(self, action):
+        response = await self.request('step', action=int(action))
+        return response['observation'], response['reward'], response['done'], response['info']
+
+    async def close(self):
+        self.writer.write(encode({'command': 'close'}))
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def gather(coroutines):
+    return await asyncio.gather(*coroutines)
+
+
+async def wait_for_any(tasks):
+    """
+    Wait until at least one task is done, then let any others which are
+    also ready finish, so replies which arrive together are handled together
+    """
+    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    await asyncio.sleep(0)
+
+
+class RemoteVectorEnv:
+    """
+    num_envs sessions with an environment server, stepped together or independently.
+    Runs its own event loop, so it can be used from ordinary synchronous code.
+    """
+
+    def __init__(self, host, port, num_envs):
+        self.num_envs = num_envs
+        self.loop = asyncio.new_event_loop()
+        self.envs = self.run([RemoteEnv.connect(host, port) for _ in range(num_envs)])
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        # Env id -> task of a step which has been sent but not waited for
+        self.pending = {}
+
+    def run(self, coroutines):
+        """
+        Run coroutines concurrently, returns their results in order
+        """
+        return self.loop.run_until_complete(gather(coroutines))
+
+    def seed(self, seed=None):
+        """
+        Seed each environment with its own stream, spawned from one root seed
+        """
+        children = seeding.spawn(seed, self.num_envs)
+        return self.run([env.seed(seeding.to_int(child)) for env, child in zip(self.envs, children)])
+
+    def reset(self):
+        return np.array(self.run([env.reset() for env in self.envs]))
+
+    def reset_envs(self, env_ids):
+        return np.array(self.run([self.envs[i].reset() for i in env_ids]))
+
+    def step(self, actions):
+        """
+        Step every session, and wait for all of them
+        """
+        results = self.run([env.step(action) for env, action in zip(self.envs, actions)])
+        return collect(results)
+
+    def step_async(self, env_ids, actions):
+        """
+        Send an action to each of the given sessions, without waiting for them
+        """
+        for env_id, action in zip(np.asarray(env_ids).tolist(), actions):
+            assert env_id not in self.pending, 'Env {} is already stepping'.format(env_id)
+            self.pending[env_id] = self.loop.create_task(self.envs[env_id].step(action))
+
+    def step_wait(self):
+        """
+        Wait until at least one session sent by `step_async` has replied.
+        Returns the ids of the sessions which have, in order, and their
+        observations, rewards, dones and infos.
+        """
+        self.loop.run_until_complete(wait_for_any(list(self.pending.values())))
+        env_ids = sorted(env_id for env_id, task in self.pending.items() if task.done())
+        results = [self.pending.pop(env_id).result() for env_id in env_ids]
+        return (np.array(env_ids, dtype=np.int64),) + collect(results)
+
+    def close(self):
+        if self.pending:
+            for task in self.pending.values():
+                task.cancel()
+            self.loop.run_until_complete(asyncio.wait(list(self.pending.values())))
+            self.pending.clear()
+
+        self.run([env.close() for env in self.envs])
+        self.loop.close()
+
+
+def collect(results):
+    """
+    Stack a list of (observation, reward, done, info) step results into arrays
+    """
+    observations, rewards, dones, infos = zip(*results)
+    return np.array(observations), np.array(rewards, dtype=float), np.array(dones), list(infos)
@@ -0,0 +1,103 @@
+"""
+Array form of the transition model of a discrete environment
+"""
+import numpy as np
+
+
+class DiscreteSpace:
+    """
+    Minimal stand in for gym.spaces.Discrete, agents only need `n`
+    """
+
+    def __init__(self, n):
+        self.n = n
+
+    def contains(self, x):
+        return 0 <= int(x) < self.n
+
+    def __repr__(self):
+        return 'DiscreteSpace({})'.format(self.n)
+
+
+class TransitionTable:
+    """
+    Transition model stored as padded (num_states, num_actions, K) arrays,
+    where K is the largest number of outcomes of any state-action pair.
+    Padding entries have zero probability.
+    """
+
+    def __init__(self, probs, next_states, rewards, dones, initial_distribution):
+        self.probs = probs
+        self.next_states = next_states
+        self.rewards = rewards
+        self.dones = dones
+        self.initial_distribution = initial_distribution
+        self.cumulative_probs = probs.cumsum(axis=-1)
+        self.cumulative_initial = initial_distribution.cumsum()
+
+    @property
+    def num_states(self):
+        return self.probs.shape[0]
+
+    @property
+    def num_actions(self):
+        return self.probs.shape[1]
+
+    @classmethod
+    def from_env(cls, env):
+        """
+        Build the table from a gym DiscreteEnv's P dict,
+        where P[s][a] is a list of (probability, nextstate, reward, done).
+        Environments which already have a table just hand it over.
+        """
+        env = getattr(env, 'unwrapped', env)
+        if getattr(env, 'transition_table', None) is not None:
+            return env.transition_table
+
+        num_states, num_actions = env.nS, env.nA
+        max_outcomes = max(len(env.P[s][a]) for s in range(num_states) for a in range(num_actions))
+        shape = (num_states, num_actions, max_outcomes)
+        probs = np.zeros(shape)
+        next_states = np.zeros(shape, dtype=np.int64)
+        rewards = np.zeros(shape)
+        dones = np.zeros(shape, dtype=bool)
+        for s in range(num_states):
+            for a in range(num_actions):
+                for k, (p, s_next, r, done) in enumerate(env.P[s][a]):
+                    probs[s, a, k] = p
+                    next_states[s, a, k] = s_next
+                    rewards[s, a, k] = r
+                    dones[s, a, k] = done
+
+        isd = np.zeros(num_states)
+        isd[:len(env.isd)] = env.isd
+        return cls(probs, next_states, rewards, dones, isd)
+
+    @staticmethod
+    def is_available(env):
+        """
+        Whether the environment exposes a transition model to build a table from
+        """
+        env = getattr(env, 'unwrapped', env)
+        return hasattr(env, 'P') or getattr(env, 'transition_table', None) is not None
+
+    def sample_initial(self, uniforms):
+        """
+        Sample one start state per uniform draw.
+        Like gym's categorical_sample, falls back to state 0 if the
+        distribution does not sum to one.
+        """
+        states = np.searchsorted(self.cumulative_initial, uniforms, side='right')
+        states[states >= len(self.cumulative_initial)] = 0
+        return states
+
+    def sample(self, states, actions, uniforms):
+        """
+        Sample one transition per (state, action, uniform) triple
+        Returns next states, rewards and done flags
+        """
+        cumulative = self.cumulative_probs[states, actions]
+        outcomes = (uniforms[:, None] >= cumulative).sum(axis=1)
+        outcomes = np.minimum(outcomes, self.probs.shape[2] - 1)
+        index = (states, actions, outcomes)
+        return self.next_states[index], self.rewards[index], self.dones[index]
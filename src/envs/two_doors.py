@@ -0,0 +1,43 @@
+"""
+Two doors test environment, a tiny MDP with known action values
+"""
+from gym.envs.toy_text import discrete
+
+START = 0
+END = 1
+LEFT = 0
+RIGHT = 1
+
+
+class TwoDoorsTestEnv(discrete.DiscreteEnv):
+    """
+    There are two doors (LEFT, RIGHT) which both lead to a terminal state.
+    LEFT produces reward 1 with some probability [0, 1].
+    RIGHT produces a reward 1 with some probablility [0, 1].
+    """
+    def __init__(self, p_left, p_right):
+        assert 0 <= p_left <= 1
+        assert 0 <= p_right <= 1
+        number_states = 2
+        number_actions = 2
+        initial_state_distribution = [0]
+        transitions = {
+            # States
+            START: {
+                # Actions
+                LEFT: [
+                    # probability, nextstate, reward, done
+                    (p_left, END, 1, False),
+                    (1- p_left, END, 0, False),
+                ],
+                RIGHT: [
+                    (p_right, 1, 1, False),
+                    (1- p_right, 1, 0, False),
+                ],
+            },
+            END: {
+                LEFT: [(1, END, 0, True)],
+                RIGHT: [(1, END, 0, True)],
+            },
+        }
+        super().__init__(number_states, number_actions, transitions, initial_state_distribution)
@@ -0,0 +1,115 @@
+"""
+Environments which step several copies of a problem in lockstep
+"""
+import numpy as np
+
+from .. import seeding
+from .tables import TransitionTable, DiscreteSpace
+
+
+class VectorEnv:
+    """
+    Steps a list of ordinary gym environments one after another.
+    Works for any environment, but is no faster than stepping them by hand.
+    """
+
+    def __init__(self, envs):
+        self.envs = envs
+        self.num_envs = len(envs)
+        self.observation_space = envs[0].observation_space
+        self.action_space = envs[0].action_space
+
+    def seed(self, seed=None):
+        """
+        Seed each environment with its own stream, spawned from one root seed
+        """
+        children = seeding.spawn(seed, self.num_envs)
+        return [env.seed(seeding.to_int(child)) for env, child in zip(self.envs, children)]
+
+    def reset(self):
+        """
+        Reset every environment, returns an array of observations
+        """
+        return np.array([env.reset() for env in self.envs])
+
+    def reset_envs(self, env_ids):
+        """
+        Reset only the given environments, returns their observations
+        """
+        return np.array([self.envs[i].reset() for i in env_ids])
+
+    def step(self, actions):
+        """
+        Returns arrays of observations, rewards and done flags, plus a list of infos
+        """
+        results = [env.step(action) for env, action in zip(self.envs, actions)]
+        observations, rewards, dones, infos = zip(*results)
+        return np.array(observations), np.array(rewards, dtype=float), np.array(dones), list(infos)
+
+
+class DiscreteVectorEnv:
+    """
+    Steps num_envs copies of a discrete environment at once by sampling
+    from its transition table with NumPy, instead of calling env.step.
+    Every copy's randomness comes from one batched draw per step, from one generator.
+    """
+
+    def __init__(self, table, num_envs, max_episode_steps=None, seed=None):
+        self.table = table
+        self.num_envs = num_envs
+        self.max_episode_steps = max_episode_steps
+        self.observation_space = DiscreteSpace(table.num_states)
+        self.action_space = DiscreteSpace(table.num_actions)
+        self.seed(seed)
+        self.states = np.zeros(num_envs, dtype=np.int64)
+        self.elapsed_steps = np.zeros(num_envs, dtype=np.int64)
+
+    @classmethod
+    def from_env(cls, env, num_envs, seed=None):
+        """
+        Copy the transition model and time limit of a gym DiscreteEnv
+        """
+        max_episode_steps = getattr(env, '_max_episode_steps', getattr(env, 'max_episode_steps', None))
+        return cls(TransitionTable.from_env(env), num_envs, max_episode_steps, seed)
+
+    def seed(self, seed=None):
+        """
+        Seed the generator, from an int or a SeedSequence
+        """
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    def reset(self):
+        return self.reset_envs(np.arange(self.num_envs))
+
+    def reset_envs(self, env_ids):
+        env_ids = np.asarray(env_ids)
+        self.states[env_ids] = self.table.sample_initial(self.np_random.random(len(env_ids)))
+        self.elapsed_steps[env_ids] = 0
+        return self.states[env_ids].copy()
+
+    def step(self, actions):
+        uniforms = self.np_random.random(self.num_envs)
+        states, rewards, dones = self.table.sample(self.states, actions, uniforms)
+        self.states = states
+        self.elapsed_steps += 1
+        if self.max_episode_steps is not None:
+            dones = dones | (self.elapsed_steps >= self.max_episode_steps)
+
+        return states.copy(), rewards, dones, [{} for _ in range(self.num_envs)]
+
+
+def make_vector_env(make_env, num_envs, seed=None):
+    """
+    Build a vectorized environment from an environment factory.
+    Discrete environments with a transition model get the fast NumPy version.
+    """
+    env = make_env()
+    if TransitionTable.is_available(env):
+        return DiscreteVectorEnv.from_env(env, num_envs, seed)
+
+    vector_env = VectorEnv([env] + [make_env() for _ in range(num_envs - 1)])
+    if seed is not None:
+        vector_env.seed(seed)
+
+    return vector_env
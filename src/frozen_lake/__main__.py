@@ -21,96 +21,183 @@ https://gym.openai.com/envs/FrozenLake-v0/
     average reward of at least 0.78 over 100 consecutive episodes.
     I can be solved in as few as 85 episodes.
 
+Usage:
+
+    python3 -m src.frozen_lake --agent TDZeroAgent --alpha 0.2 --not-slippery
+
+Only argparse is imported up front, so --help and bad arguments are reported
+straight away. The agents, NumPy and gym are imported once training starts.
 """
-import time
-from collections import deque
-
-import gym
-from gym.envs.registration import register
-
-from .. import agents
-
-IS_SLIPPERY = True
-if IS_SLIPPERY:
-    print('The ice is slippery.')
-    GYM_ENV = 'FrozenLake-v0'
-    SOLVED = 0.6
-else:
-    print('The ice is NOT slippery.')
-    GYM_ENV = 'FrozenLakeNotSlippery-v0'
-    SOLVED = 0.98
-
-NUM_EPISODES = 100 * 1000
-MAX_STEPS = 100
-GAMMA = 0.9   # How valuable is the expectation of future rewards?
-ALPHA = 0.1   # How much do you trust this sample?
-LAMBDA = 0.8  # How much do we prefer accuracy/high bias vs variance/low bias
-              # At 1 we are doing Monte Carlo
-              # At 0 we are doing TD(0)
-
-REPORT_PERIOD = 1000
-
-register(
-    id='FrozenLakeNotSlippery-v0',
-    entry_point='gym.envs.toy_text:FrozenLakeEnv',
-    kwargs={'map_name' : '4x4', 'is_slippery': False},
-    max_episode_steps=100,
-    reward_threshold=0.78, # optimum = .8196
-)
-
-
-def main():
-    # agent = agents.discrete.MonteCarloAgent(GAMMA)
-    # agent = agents.discrete.TDZeroAgent(GAMMA, ALPHA)
-    agent = agents.discrete.TDLambdaAgent(GAMMA, ALPHA, LAMBDA)
-    # agent = agents.discrete.PlayerAgent()
-    # agent = agents.discrete.RandomAgent()
-    run_environment(agent, NUM_EPISODES, MAX_STEPS, render=False)
-
-
-def run_environment(agent, num_episodes, max_steps, render=False):
-    env = gym.make(GYM_ENV)
-    agent.start_environment(env)
-    returns = deque(maxlen=100)
-
-    for k in range(num_episodes):
-        agent.start_episode()
-        observation = env.reset()
-        for t in range(max_steps):
-            if render:
-                display(env, agent, t, k)
-
-            agent.observe(observation)
-            action = agent.get_next_action()
-            observation, reward, done, info = env.step(action)
-            agent.receive_reward(reward)
-            if done:
-                if render:
-                    display(env, agent, t, k)
-
-                episode_return = agent.finish_episode(observation)
-                returns.append(episode_return)
-                break
-
-        average_return = sum(returns) / float(len(returns))
-        is_solved = average_return >= SOLVED
-        if is_solved or (k + 1) % REPORT_PERIOD == 0:
-            agent.print_values()
-            print('Average return of ', average_return, 'in episode', k + 1)
-            if is_solved:
-                print('Solved!')
-                break
-
-
-def display(env, agent, t, k):
-    print('EPISODE:\t', k)
-    print('TIME:\t\t', t)
-    print('EPSILON:\t', max(0.1, 1 / agent.episodes**0.5))
-    agent.print_values()
-    env.render()
-    input()
-    print(chr(27) + "[2J")
-
-
-
-main()
+import argparse
+
+AGENTS = [
+    'MonteCarloAgent',
+    'TDZeroAgent',
+    'TDLambdaAgent',
+    'QLearningAgent',
+    'ExpectedSarsaAgent',
+    'PrioritizedSweepingAgent',
+    'DynamicProgrammingAgent',
+    'PlayerAgent',
+    'RandomAgent',
+]
+
+# gym's maps, then lakes with random holes (see envs.fast_frozen_lake.GENERATED_SIZES)
+MAP_NAMES = ['4x4', '8x8', '16x16', '32x32', '64x64', '128x128', '256x256']
+
+EXPLORATIONS = ['EpsilonGreedy', 'VisitCountEpsilonGreedy', 'Boltzmann', 'UCB']
+
+STEP_SIZES = ['ConstantStepSize', 'VisitCountStepSize', 'HarmonicStepSize', 'AdaptiveStepSize']
+
+# Agents which neither explore nor learn from experience
+NON_LEARNING_AGENTS = ['DynamicProgrammingAgent', 'PlayerAgent', 'RandomAgent']
+
+# Agents without batched methods, which would only run slower with --num-envs
+UNBATCHED_AGENTS = ['PrioritizedSweepingAgent', 'DynamicProgrammingAgent', 'PlayerAgent', 'RandomAgent']
+
+# Agents with a planning_steps hyperparameter
+PLANNING_AGENTS = ['TDZeroAgent', 'QLearningAgent', 'ExpectedSarsaAgent', 'PrioritizedSweepingAgent']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m src.frozen_lake', description='Train an agent on frozen lake')
+    parser.add_argument('--agent', choices=AGENTS, default='TDLambdaAgent')
+    parser.add_argument('--gamma', type=float, default=0.9,
+                        help='How valuable is the expectation of future rewards?')
+    parser.add_argument('--alpha', type=float, default=0.1,
+                        help='How much do you trust this sample?')
+    parser.add_argument('--lambd', type=float, default=0.8,
+                        help='At 1 we are doing Monte Carlo, at 0 we are doing TD(0)')
+    parser.add_argument('--planning-steps', type=int, default=None,
+                        help='Simulated updates per real step, for agents which plan with a learned model')
+    parser.add_argument('--exploration', choices=EXPLORATIONS, default=None,
+                        help='How the agent explores, defaults to epsilon-greedy with a decaying epsilon')
+    parser.add_argument('--step-size', choices=STEP_SIZES, default=None,
+                        help='How far to move each value, defaults to a constant --alpha')
+    parser.add_argument('--map-name', choices=MAP_NAMES, default='4x4')
+    parser.add_argument('--not-slippery', action='store_true')
+    parser.add_argument('--episodes', type=int, default=100 * 1000)
+    parser.add_argument('--max-steps', type=int, default=None,
+                        help="Defaults to the environment's time limit")
+    parser.add_argument('--num-envs', type=int, default=1,
+                        help='Run this many copies of the lake in lockstep, for agents with batched updates')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Train in this many processes which share one value table')
+    parser.add_argument('--fast', action='store_true', help='Use the NumPy lake instead of gym')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report-period', type=int, default=1000)
+    parser.add_argument('--checkpoint', default=None, help='Path to save the agent to')
+    parser.add_argument('--checkpoint-period', type=int, default=None)
+    parser.add_argument('--resume', action='store_true', help='Carry on from --checkpoint')
+    parser.add_argument('--evaluate-period', type=int, default=None,
+                        help='Evaluate the greedy policy every this many episodes')
+    parser.add_argument('--convergence-period', type=int, default=None,
+                        help='Check for convergence every this many episodes, and stop once learning has plateaued')
+    parser.add_argument('--telemetry', default=None,
+                        help='Path to append a JSON lines stream of timings and training stats to')
+    parser.add_argument('--telemetry-period', type=int, default=100)
+    parser.add_argument('--show-values', action='store_true', help="Print the agent's values with each report")
+    parser.add_argument('--render', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not 0 <= args.gamma <= 1:
+        parser.error('--gamma must be between 0 and 1')
+    if not 0 <= args.lambd <= 1:
+        parser.error('--lambd must be between 0 and 1')
+    if args.alpha < 0:
+        parser.error('--alpha must not be negative')
+    for name in ('episodes', 'num_envs', 'workers', 'report_period', 'telemetry_period', 'convergence_period'):
+        if getattr(args, name) is not None and getattr(args, name) < 1:
+            parser.error('--{} must be at least 1'.format(name.replace('_', '-')))
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs a --checkpoint')
+    if args.render and args.num_envs > 1:
+        parser.error('--render only works with a single environment')
+    if args.num_envs > 1 and args.agent in UNBATCHED_AGENTS:
+        parser.error('--num-envs does not work with {}, which only runs one environment at a time'.format(args.agent))
+    if args.workers > 1:
+        if (args.num_envs > 1 or args.checkpoint or args.evaluate_period or args.telemetry or args.render
+                or args.convergence_period):
+            parser.error('--workers does not work with --num-envs, --checkpoint, --evaluate-period, '
+                         '--telemetry, --convergence-period or --render')
+        if args.agent in NON_LEARNING_AGENTS:
+            parser.error('--workers does not apply to {}'.format(args.agent))
+    if args.exploration and args.agent in NON_LEARNING_AGENTS:
+        parser.error('--exploration does not apply to {}'.format(args.agent))
+    if args.step_size and args.agent in NON_LEARNING_AGENTS:
+        parser.error('--step-size does not apply to {}'.format(args.agent))
+    if args.planning_steps is not None and args.agent not in PLANNING_AGENTS:
+        parser.error('--planning-steps does not apply to {}'.format(args.agent))
+
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from functools import partial
+
+    from .. import agents, envs, training
+    from .environments import make_env, get_solved_threshold, MAX_EPISODE_STEPS
+
+    is_slippery = not args.not_slippery
+    if is_slippery:
+        print('The ice is slippery.')
+    else:
+        print('The ice is NOT slippery.')
+
+    agent_class = getattr(agents.discrete, args.agent)
+    hyperparameters = {'gamma': args.gamma, 'alpha': args.alpha, 'lambd': args.lambd}
+    if args.planning_steps is not None:
+        hyperparameters['planning_steps'] = args.planning_steps
+    kwargs = {k: v for k, v in hyperparameters.items() if k in agent_class.HYPERPARAMETERS}
+    if args.exploration:
+        kwargs['exploration'] = getattr(agents.discrete, args.exploration)()
+    if args.step_size:
+        kwargs['step_size'] = getattr(agents.discrete, args.step_size)()
+    agent = agent_class(**kwargs)
+    solved = get_solved_threshold(is_slippery, args.map_name)
+    max_steps = args.max_steps or MAX_EPISODE_STEPS[args.map_name]
+    env = make_env(is_slippery, args.map_name, fast=args.fast)
+
+    evaluator = None
+    if args.evaluate_period:
+        evaluator = training.PeriodicEvaluator(env, args.evaluate_period, max_steps=max_steps, seed=args.seed or 0)
+
+    telemetry = None
+    if args.telemetry:
+        telemetry = training.Telemetry(args.telemetry, period=args.telemetry_period)
+
+    options = dict(
+        verbose=True,
+        telemetry=telemetry,
+        checkpoint_path=args.checkpoint,
+        checkpoint_period=args.checkpoint_period,
+        resume=args.resume,
+        evaluator=evaluator,
+        seed=args.seed,
+        monitor=training.ConvergenceMonitor(args.convergence_period) if args.convergence_period else None,
+    )
+    try:
+        if args.workers > 1:
+            training.run_parallel(agent, partial(make_env, is_slippery, args.map_name, fast=args.fast),
+                                  args.episodes, max_steps, args.workers, solved, args.report_period,
+                                  seed=args.seed)
+        elif args.num_envs > 1:
+            vector_env = envs.make_vector_env(
+                lambda: make_env(is_slippery, args.map_name, fast=args.fast), args.num_envs,
+            )
+            training.run_vectorized(agent, vector_env, args.episodes, max_steps, solved, args.report_period,
+                                    **options)
+        else:
+            training.run_environment(agent, env, args.episodes, max_steps, solved, args.report_period,
+                                     render=args.render, show_values=args.show_values, **options)
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+        if evaluator is not None:
+            evaluator.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Frozen lake environments, and the average return that counts as solving them
+"""
+from ..envs import fast_frozen_lake
+
+MAX_EPISODE_STEPS = {'4x4': 100, '8x8': 200}
+
+# (map name, is slippery) -> (gym id, solved threshold)
+ENVIRONMENTS = {
+    ('4x4', True): ('FrozenLake-v0', 0.6),
+    ('4x4', False): ('FrozenLakeNotSlippery-v0', 0.98),
+    ('8x8', True): ('FrozenLake8x8-v0', 0.6),
+    ('8x8', False): ('FrozenLake8x8NotSlippery-v0', 0.98),
+}
+
+# The generated lakes have no known best return, so they never count as solved
+for env_id, (map_name, is_slippery, max_episode_steps) in fast_frozen_lake.GENERATED_ENV_IDS.items():
+    MAX_EPISODE_STEPS[map_name] = max_episode_steps
+    ENVIRONMENTS[(map_name, is_slippery)] = (env_id, None)
+
+
+def register_environments(map_names=('4x4', '8x8')):
+    """
+    Register the non-slippery lakes, and any generated lakes in map_names, with gym.
+    Safe to call more than once.
+    """
+    import gym
+    from gym.envs.registration import register
+
+    for (map_name, is_slippery), (env_id, _) in ENVIRONMENTS.items():
+        if env_id in gym.envs.registry.env_specs or map_name not in map_names:
+            continue
+
+        kwargs = {'map_name' : map_name, 'is_slippery': is_slippery}
+        if env_id in fast_frozen_lake.GENERATED_ENV_IDS:
+            kwargs['desc'] = fast_frozen_lake.get_map(map_name)
+
+        register(
+            id=env_id,
+            entry_point='gym.envs.toy_text:FrozenLakeEnv',
+            kwargs=kwargs,
+            max_episode_steps=MAX_EPISODE_STEPS[map_name],
+            reward_threshold=0.78, # optimum = .8196
+        )
+
+
+def get_env_id(is_slippery=True, map_name='4x4'):
+    return ENVIRONMENTS[(map_name, is_slippery)][0]
+
+
+def get_solved_threshold(is_slippery=True, map_name='4x4'):
+    return ENVIRONMENTS[(map_name, is_slippery)][1]
+
+
+def make_env(is_slippery=True, map_name='4x4', seed=None, fast=False):
+    """
+    Create a frozen lake gym environment, optionally seeded.
+    With `fast`, use the NumPy version which doesn't need gym at all.
+    """
+    if fast:
+        return fast_frozen_lake.make(get_env_id(is_slippery, map_name), seed)
+
+    import gym
+
+    register_environments([map_name])
+    env = gym.make(get_env_id(is_slippery, map_name))
+    if seed is not None:
+        env.seed(seed)
+
+    return env
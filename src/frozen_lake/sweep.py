@@ -0,0 +1,176 @@
+"""
+Hyperparameter sweeps over frozen lake, run across all cores.
+
+    python3 -m src.frozen_lake.sweep --agent TDZeroAgent TDLambdaAgent \
+        --gamma 0.9 0.99 --alpha 0.05 0.1 --lambd 0.5 0.8 --output sweep.jsonl
+
+Each trial trains one agent until it solves the lake or runs out of episodes,
+and its result is appended to the output file as a line of JSON as soon as it finishes.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .. import seeding
+from .__main__ import AGENTS, MAP_NAMES
+
+# The player agent needs someone at the keyboard
+SWEEP_AGENTS = [agent for agent in AGENTS if agent != 'PlayerAgent']
+
+HYPERPARAMETERS = ('gamma', 'alpha', 'lambd')
+DEFAULTS = {
+    'agent': 'TDZeroAgent',
+    'gamma': 0.9,
+    'alpha': 0.1,
+    'lambd': 0.8,
+    'is_slippery': True,
+    'map_name': '4x4',
+    'num_episodes': 100 * 1000,
+    'max_steps': None,  # Use the environment's own time limit
+}
+
+
+def grid_search(space):
+    """
+    Yield every combination of the listed values in the search space,
+    eg. {'agent': ['TDZeroAgent'], 'gamma': [0.9, 0.99]}
+    """
+    keys = list(space.keys())
+    for combination in itertools.product(*[space[k] for k in keys]):
+        yield dict(zip(keys, combination))
+
+
+def random_search(space, num_trials, seed=0):
+    """
+    Yield num_trials random configurations from the search space.
+    A list is sampled as a choice, a (low, high) tuple is sampled uniformly.
+    """
+    rng = random.Random(seed)
+    for _ in range(num_trials):
+        config = {}
+        for key, options in space.items():
+            if isinstance(options, tuple):
+                config[key] = rng.uniform(*options)
+            else:
+                config[key] = rng.choice(options)
+
+        yield config
+
+
+def get_trial_seed(root_seed, trial_id):
+    """
+    Derive a deterministic, independent seed for each trial
+    """
+    return seeding.to_int([root_seed, trial_id])
+
+
+def make_trials(configs, root_seed=0):
+    """
+    Fill in defaults, and give each trial an id and a seed
+    """
+    trials = []
+    for trial_id, config in enumerate(configs):
+        trial = dict(DEFAULTS, **config)
+        trial['trial_id'] = trial_id
+        trial['seed'] = get_trial_seed(root_seed, trial_id)
+        trials.append(trial)
+
+    return trials
+
+
+def run_trial(trial):
+    """
+    Train one agent until it solves the lake or runs out of episodes.
+    Runs inside a worker process, so everything is imported and seeded here.
+    """
+    from .. import agents, training
+    from .environments import make_env, get_solved_threshold, MAX_EPISODE_STEPS
+
+    env = make_env(trial['is_slippery'], trial['map_name'])
+    agent_class = getattr(agents.discrete, trial['agent'])
+    # Only pass the hyperparameters this agent takes
+    agent = agent_class(**{k: trial[k] for k in HYPERPARAMETERS if k in agent_class.HYPERPARAMETERS})
+    solved = get_solved_threshold(trial['is_slippery'], trial['map_name'])
+    max_steps = trial['max_steps'] or MAX_EPISODE_STEPS[trial['map_name']]
+
+    start_time = time.perf_counter()
+    result = training.run_environment(
+        agent, env, trial['num_episodes'], max_steps, solved, verbose=False, seed=trial['seed'],
+    )
+    return dict(
+        trial,
+        episodes=result.episodes,
+        solved=result.solved,
+        average_return=result.average_return,
+        wall_time=time.perf_counter() - start_time,
+    )
+
+
+def run_sweep(trials, results_path, workers=None):
+    """
+    Run trials across a process pool, appending each result to results_path
+    as a line of JSON as soon as it completes. Returns all results.
+    """
+    workers = workers or os.cpu_count()
+    results = []
+    with open(results_path, 'a') as results_file:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_trial, trial) for trial in trials]
+            for future in as_completed(futures):
+                result = future.result()
+                results_file.write(json.dumps(result) + '\n')
+                results_file.flush()
+                results.append(result)
+
+    return sorted(results, key=lambda r: r['trial_id'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Hyperparameter sweep over frozen lake')
+    parser.add_argument('--agent', nargs='+', choices=SWEEP_AGENTS, default=[DEFAULTS['agent']])
+    for key in HYPERPARAMETERS:
+        parser.add_argument('--' + key, nargs='+', type=float, default=[DEFAULTS[key]])
+    parser.add_argument('--not-slippery', action='store_true')
+    parser.add_argument('--map-name', choices=MAP_NAMES, default=DEFAULTS['map_name'])
+    parser.add_argument('--episodes', type=int, default=DEFAULTS['num_episodes'])
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--trials', type=int, default=10, help='Number of random search trials')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='sweep.jsonl')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    space = {'agent': args.agent}
+    for key in HYPERPARAMETERS:
+        values = getattr(args, key)
+        # Random search samples uniformly between a pair of values
+        is_range = args.search == 'random' and len(values) == 2
+        space[key] = tuple(values) if is_range else values
+
+    if args.search == 'grid':
+        configs = grid_search(space)
+    else:
+        configs = random_search(space, args.trials, args.seed)
+
+    fixed = {
+        'is_slippery': not args.not_slippery,
+        'map_name': args.map_name,
+        'num_episodes': args.episodes,
+    }
+    trials = make_trials([dict(config, **fixed) for config in configs], args.seed)
+    print('Running {} trials, writing results to {}'.format(len(trials), args.output))
+    for result in run_sweep(trials, args.output, args.workers):
+        print('{agent} gamma={gamma:.3f} alpha={alpha:.3f} lambd={lambd:.3f}: '
+              '{episodes} episodes, average return {average_return:.2f}, '
+              '{wall_time:.1f}s'.format(**result))
+
+
+if __name__ == '__main__':
+    main()
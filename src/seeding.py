@@ -0,0 +1,32 @@
+"""
+Derive independent random streams from one root seed.
+
+Every agent, environment and worker process gets its own stream, spawned
+from a SeedSequence, so they never share or collide, and a run can be
+repeated exactly from its root seed.
+"""
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """
+    Accept an int, a list of ints, an existing SeedSequence, or None for fresh entropy
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+
+    return np.random.SeedSequence(seed)
+
+
+def spawn(seed, count):
+    """
+    `count` independent child SeedSequences
+    """
+    return as_seed_sequence(seed).spawn(count)
+
+
+def to_int(seed):
+    """
+    A 32 bit int seed for APIs which don't take a SeedSequence, like gym's env.seed
+    """
+    return int(as_seed_sequence(seed).generate_state(1)[0])
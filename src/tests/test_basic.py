@@ -1,54 +1,14 @@
 """
 Veify that agents learn basic MDPs
 """
-from gym.envs.toy_text import discrete
-
 from .. import agents
-
-START = 0
-END = 1
-LEFT = 0
-RIGHT = 1
+from ..envs.two_doors import TwoDoorsTestEnv, START, END, LEFT, RIGHT
 
 
 def assert_equalish(expected, actual, error, message):
     assert expected - error <= actual <= expected + error, message
 
 
-class TwoDoorsTestEnv(discrete.DiscreteEnv):
-    """
-    There are two doors (LEFT, RIGHT) which both lead to a terminal state.
-    LEFT produces reward 1 with some probability [0, 1].
-    RIGHT produces a reward 1 with some probablility [0, 1].
-    """
-    def __init__(self, p_left, p_right):
-        assert 0 <= p_left <= 1
-        assert 0 <= p_right <= 1
-        number_states = 2
-        number_actions = 2
-        initial_state_distribution = [0]
-        transitions = {
-            # States
-            START: {
-                # Actions
-                LEFT: [
-                    # probability, nextstate, reward, done
-                    (p_left, END, 1, False),
-                    (1- p_left, END, 0, False),
-                ],
-                RIGHT: [
-                    (p_right, 1, 1, False),
-                    (1- p_right, 1, 0, False),
-                ],
-            },
-            END: {
-                LEFT: [(1, END, 0, True)],
-                RIGHT: [(1, END, 0, True)],
-            },
-        }
-        super().__init__(number_states, number_actions, transitions, initial_state_distribution)
-
-
 def run_environment(agent, env, num_episodes):
     """
     Run the agent through the environment for the given number of episodes.
@@ -73,6 +33,8 @@ def assert_test_case(agent, test_case, num_episodes, error):
     Assert that the agent passes the test case within the given margin of error.
     """
     env = TwoDoorsTestEnv(p_left=test_case['p_left'], p_right=test_case['p_right'])
+    env.seed(0)
+    agent.seed(0)
     agent.start_environment(env)
     run_environment(agent, env, num_episodes)
     for state, action in ((START, LEFT), (START, RIGHT), (END, LEFT), (END, RIGHT)):
@@ -225,3 +187,83 @@ def test_two_doors_stochastic__td_lambda():
         return agents.discrete.TDLambdaAgent(GAMMA, ALPHA, LAMBDA)
 
     assert_two_doors_stochastic(get_agent, NUM_EPISODES, ERROR)
+
+
+def test_two_doors_deterministic__td_lambda_replacing():
+    """
+    Ensure TD Lambda with replacing traces works in a deterministic 2 door env.
+    """
+    NUM_EPISODES = 100
+    GAMMA, ALPHA, LAMBDA = 1, 1, 0.5
+    ERROR = 0.01
+    def get_agent():
+        return agents.discrete.TDLambdaAgent(GAMMA, ALPHA, LAMBDA, trace=agents.discrete.REPLACING)
+
+    assert_two_doors_deterministic(get_agent, NUM_EPISODES, ERROR)
+
+
+def test_two_doors_stochastic__monte_carlo_first_visit():
+    """
+    Ensure first visit Monte Carlo works in a stochastic 2 door env.
+    """
+    NUM_EPISODES = 10000
+    GAMMA = 1
+    ERROR = 0.1  # We're being pretty generous here
+    def get_agent():
+        return agents.discrete.MonteCarloAgent(GAMMA, first_visit=True)
+
+    assert_two_doors_stochastic(get_agent, NUM_EPISODES, ERROR)
+
+
+def test_two_doors_deterministic__q_learning():
+    """
+    Ensure Q-learning works in a deterministic 2 door env.
+    """
+    NUM_EPISODES = 100
+    GAMMA, ALPHA = 1, 1
+    ERROR = 0.01
+    def get_agent():
+        return agents.discrete.QLearningAgent(GAMMA, ALPHA)
+
+    assert_two_doors_deterministic(get_agent, NUM_EPISODES, ERROR)
+
+
+def test_two_doors_stochastic__q_learning_replay():
+    """
+    Ensure Q-learning with experience replay works in a stochastic 2 door env,
+    with far fewer episodes than learning from each step once.
+    """
+    NUM_EPISODES = 1000
+    GAMMA, ALPHA = 1, 0.01
+    ERROR = 0.2  # We're being pretty generous here
+    def get_agent():
+        buffer = agents.discrete.TrajectoryBuffer(capacity=10 * 1000)
+        return agents.discrete.QLearningAgent(GAMMA, ALPHA, replay_buffer=buffer, replay_updates=4)
+
+    assert_two_doors_stochastic(get_agent, NUM_EPISODES, ERROR)
+
+
+def test_two_doors_stochastic__q_learning_replay_repeated_samples():
+    """
+    Ensure replaying the few transitions stored early on doesn't blow up the values,
+    even though the same pair is sampled many times in each minibatch.
+    """
+    env = TwoDoorsTestEnv(p_left=0.8, p_right=0.2)
+    buffer = agents.discrete.TrajectoryBuffer(capacity=10 * 1000)
+    agent = agents.discrete.QLearningAgent(1, 0.3, replay_buffer=buffer)
+    agent.seed(0)
+    run_environment(agent, env, 300)
+    assert abs(agent.values.array).max() <= 1
+    assert agent.get_action_greedily(START) == LEFT
+
+def test_two_doors_stochastic__expected_sarsa():
+    """
+    Ensure Expected SARSA works in a stochastic 2 door env.
+    """
+    NUM_EPISODES = 10000
+    GAMMA, ALPHA = 1, 0.05
+    ERROR = 0.2  # We're being pretty generous here
+    def get_agent():
+        return agents.discrete.ExpectedSarsaAgent(GAMMA, ALPHA)
+
+    assert_two_doors_stochastic(get_agent, NUM_EPISODES, ERROR)
@@ -0,0 +1,38 @@
+"""
+Verify the benchmark harness
+"""
+from .. import benchmarks
+
+
+def test_run_benchmarks__two_doors():
+    """
+    Ensure a small benchmark run produces every metric.
+    """
+    results = benchmarks.run_benchmarks(['TDZeroAgent'], ['TwoDoors'], num_steps=200, num_episodes=300)
+    assert len(results) == 1
+    result = results[0]
+    assert result['get_next_action_ns'] > 0
+    assert result['episodes_per_sec'] > 0
+    assert result['episodes_to_solve'] is not None
+
+
+def test_compare_to_baseline__finds_regressions():
+    """
+    Ensure slower steps and failing to solve are reported, but noise within tolerance is not.
+    """
+    baseline = [{
+        'agent': 'TDZeroAgent', 'env': 'TwoDoors', 'get_next_action_ns': 1000,
+        'episodes_per_sec': 100, 'episodes_to_solve': 200,
+    }]
+    results = [dict(baseline[0], get_next_action_ns=1100, episodes_per_sec=50, episodes_to_solve=None)]
+    regressions = benchmarks.compare_to_baseline(results, baseline, tolerance=0.2)
+    assert {r[2] for r in regressions} == {'episodes_per_sec', 'episodes_to_solve'}
+
+
+def test_run_benchmarks__dynamic_programming():
+    """
+    Ensure the planning agent is benchmarked too.
+    """
+    results = benchmarks.run_benchmarks(['DynamicProgrammingAgent'], ['TwoDoors'], num_steps=200, num_episodes=300)
+    assert results[0]['get_next_action_ns'] > 0
+    assert results[0]['episodes_to_solve'] is not None
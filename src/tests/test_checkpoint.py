@@ -0,0 +1,79 @@
+"""
+Verify saving, loading and resuming agents
+"""
+import numpy as np
+
+from .. import agents, training
+from ..envs.two_doors import TwoDoorsTestEnv, START, LEFT
+
+
+def test_checkpoint__round_trip(tmp_path):
+    """
+    Ensure tables, counters and hyperparameters survive a save and load.
+    """
+    path = str(tmp_path / 'agent.npz')
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    agent = agents.discrete.MonteCarloAgent(0.9, first_visit=True)
+    training.run_environment(agent, env, 20, 100, verbose=False)
+    agent.save(path)
+
+    loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+    assert type(loaded) is agents.discrete.MonteCarloAgent
+    assert loaded.first_visit and loaded.gamma == 0.9
+    assert loaded.episodes == 20
+    assert np.array_equal(loaded.values.array, agent.values.array)
+    assert np.array_equal(loaded.visits.array, agent.visits.array)
+    assert loaded.get_action_greedily(START) == LEFT
+
+
+def test_run_environment__resumes_from_checkpoint(tmp_path):
+    """
+    Ensure an interrupted run carries on where its checkpoint left off.
+    """
+    path = str(tmp_path / 'run.npz')
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    agent = agents.discrete.TDZeroAgent(1, 0.5)
+    training.run_environment(agent, env, 30, 100, verbose=False, checkpoint_path=path, checkpoint_period=10)
+    saved_values = agent.values.array.copy()
+
+    resumed = agents.discrete.TDZeroAgent(1, 0.5)
+    result = training.run_environment(resumed, env, 30, 100, verbose=False, checkpoint_path=path, resume=True)
+    assert result.episodes == 30
+    assert np.array_equal(resumed.values.array, saved_values)
+
+    result = training.run_environment(resumed, env, 50, 100, verbose=False, checkpoint_path=path, resume=True)
+    assert result.episodes == 50
+    assert resumed.episodes == 50
+
+
+def test_from_checkpoint__rebuilds_exploration_and_step_size(tmp_path):
+    """
+    Ensure the exploration policy and step size come back with their settings and tables.
+    """
+    path = str(tmp_path / 'agent.npz')
+    env = TwoDoorsTestEnv(0.8, 0.2)
+    agent = agents.discrete.QLearningAgent(
+        1, exploration=agents.discrete.Boltzmann(temperature=2.0),
+        step_size=agents.discrete.HarmonicStepSize(a=5.0, minimum=0.01),
+    )
+    training.run_environment(agent, env, 50, 10, verbose=False, seed=0)
+    agent.save(path)
+
+    loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+    assert type(loaded.exploration) is agents.discrete.Boltzmann
+    assert loaded.exploration.temperature == 2.0
+    assert type(loaded.step_size) is agents.discrete.HarmonicStepSize
+    assert (loaded.step_size.a, loaded.step_size.minimum) == (5.0, 0.01)
+    assert loaded.step_counts.array.sum() > 0
+    assert np.array_equal(loaded.step_counts.array, agent.step_counts.array)
+
+
+def test_from_checkpoint__keeps_monte_carlo_sample_average(tmp_path):
+    """
+    Ensure a Monte Carlo agent without a step size still averages returns once loaded.
+    """
+    path = str(tmp_path / 'agent.npz')
+    agent = agents.discrete.MonteCarloAgent(0.9)
+    training.run_environment(agent, TwoDoorsTestEnv(p_left=1, p_right=0), 5, 100, verbose=False)
+    agent.save(path)
+    assert agents.discrete.BaseAgent.from_checkpoint(path).is_sample_average
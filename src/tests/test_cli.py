@@ -0,0 +1,76 @@
+"""
+Verify the frozen lake command line interface
+"""
+import subprocess
+import sys
+
+import pytest
+
+from .. import agents
+from ..frozen_lake.__main__ import parse_args, main, AGENTS, PLANNING_AGENTS
+
+
+def test_parse_args__defaults():
+    """
+    Ensure the defaults match the old hardcoded configuration.
+    """
+    args = parse_args([])
+    assert args.agent == 'TDLambdaAgent'
+    assert (args.gamma, args.alpha, args.lambd) == (0.9, 0.1, 0.8)
+    assert args.map_name == '4x4'
+    assert not args.not_slippery
+
+
+@pytest.mark.parametrize('argv', [
+    ['--gamma', '1.5'],
+    ['--agent', 'NoSuchAgent'],
+    ['--episodes', '0'],
+    ['--resume'],
+    ['--agent', 'RandomAgent', '--exploration', 'UCB'],
+    ['--workers', '2', '--num-envs', '4'],
+    ['--agent', 'PrioritizedSweepingAgent', '--num-envs', '4'],
+    ['--workers', '2', '--convergence-period', '100'],
+    ['--convergence-period', '0'],
+    ['--agent', 'MonteCarloAgent', '--planning-steps', '5'],
+])
+def test_parse_args__rejects_bad_config(argv):
+    """
+    Ensure invalid configurations are rejected before training starts.
+    """
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_planning_agents__match_hyperparameters():
+    """
+    Ensure --planning-steps is allowed for exactly the agents which take it.
+    """
+    planning = [
+        name for name in AGENTS
+        if 'planning_steps' in getattr(agents.discrete, name).HYPERPARAMETERS
+    ]
+    assert planning == PLANNING_AGENTS
+
+
+def test_help__skips_heavy_imports():
+    """
+    Ensure --help doesn't import NumPy or gym.
+    """
+    code = (
+        'import sys\n'
+        'from src.frozen_lake.__main__ import parse_args\n'
+        'try:\n'
+        '    parse_args(["--help"])\n'
+        'except SystemExit:\n'
+        '    pass\n'
+        'assert "numpy" not in sys.modules and "gym" not in sys.modules\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_main__trains_agent(capsys):
+    """
+    Ensure a short run can solve the lake from the command line.
+    """
+    main(['--agent', 'TDZeroAgent', '--not-slippery', '--fast', '--seed', '1', '--episodes', '3000'])
+    assert 'Solved!' in capsys.readouterr().out
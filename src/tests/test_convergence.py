@@ -0,0 +1,63 @@
+"""
+Verify convergence monitoring and early stopping
+"""
+import numpy as np
+
+from .. import agents, training
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv, START, RIGHT
+from ..training.convergence import improvement_p_value
+
+
+def test_improvement_p_value__only_real_improvements_are_significant():
+    """
+    Ensure a clear jump in returns is significant, and noise or a drop is not.
+    """
+    rng = np.random.default_rng(0)
+    old_returns = rng.binomial(1, 0.3, 100)
+    assert improvement_p_value(old_returns, rng.binomial(1, 0.7, 100)) < 0.001
+    assert improvement_p_value(old_returns, rng.binomial(1, 0.3, 100)) > 0.05
+    assert improvement_p_value(old_returns, rng.binomial(1, 0.1, 100)) > 0.5
+    assert improvement_p_value([1, 1, 1], [1, 1, 1]) == 1.0
+
+
+def test_convergence_monitor__measures_changes():
+    """
+    Ensure each check counts changed greedy actions and the biggest value change.
+    """
+    agent = agents.discrete.QLearningAgent()
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    monitor = training.ConvergenceMonitor(period=10, patience=2)
+    assert not monitor.step(agent, 10, [0, 1] * 50)
+    agent.values[START, RIGHT] = 1.0
+    assert not monitor.step(agent, 20, [0, 1] * 50)
+    assert not monitor.step(agent, 30, [0, 1] * 50)
+    assert monitor.step(agent, 40, [0, 1] * 50)
+    first_check = monitor.checks[0]
+    assert (first_check.policy_changes, first_check.max_value_change) == (1, 0.5)
+    assert not first_check.is_plateau
+    assert all(check.is_plateau for check in monitor.checks[1:])
+
+
+def test_run_environment__stops_once_converged():
+    """
+    Ensure training stops early once a fixed policy has stopped changing.
+    """
+    env = fast_frozen_lake.make('FrozenLake-v0')
+    agent = agents.discrete.DynamicProgrammingAgent(0.99)
+    monitor = training.ConvergenceMonitor(period=100, patience=3)
+    result = training.run_environment(agent, env, 10 * 1000, 100, verbose=False, seed=0, monitor=monitor)
+    assert result.converged and not result.solved
+    assert result.episodes == 400
+
+
+def test_run_vectorized__stops_once_converged():
+    """
+    Ensure the batched runner stops early too.
+    """
+    vector_env = fast_frozen_lake.make_vector('FrozenLakeNotSlippery-v0', 8)
+    agent = agents.discrete.TDZeroAgent(0.9, 0.1)
+    monitor = training.ConvergenceMonitor(period=200, value_tolerance=None, patience=2)
+    result = training.run_vectorized(agent, vector_env, 100 * 1000, 100, verbose=False, seed=0, monitor=monitor)
+    assert result.converged
+    assert result.episodes < 100 * 1000
@@ -0,0 +1,85 @@
+"""
+Verify the Dyna-Q model and planning
+"""
+import numpy as np
+
+from .. import agents, training
+from ..agents.discrete import DynaModel
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv
+
+
+def test_dyna_model__samples_observed_outcomes():
+    """
+    Ensure simulated transitions only come from observed pairs, in proportion to their outcomes.
+    """
+    model = DynaModel(num_states=4, num_actions=2, outcomes=4)
+    for next_state in (1, 1, 1, 2):
+        model.add(0, 1, 0.0, next_state, False)
+    model.add(3, 0, 1.0, 3, True)
+
+    assert len(model) == 2
+    batch = model.sample(4000, np.random.default_rng(0))
+    pairs = set(zip(batch.states.tolist(), batch.actions.tolist()))
+    assert pairs == {(0, 1), (3, 0)}
+    from_start = batch.states == 0
+    assert abs((batch.next_states[from_start] == 1).mean() - 0.75) < 0.05
+    assert batch.dones[~from_start].all() and (batch.rewards[~from_start] == 1).all()
+
+
+def test_dyna_q__learns_from_fewer_episodes():
+    """
+    Ensure planning finds the path across the big lake in episodes that aren't enough without it.
+    """
+    for make_agent in (agents.discrete.QLearningAgent, agents.discrete.TDZeroAgent):
+        greedy_returns = []
+        for planning_steps in (0, 20):
+            env = fast_frozen_lake.make('FrozenLake8x8NotSlippery-v0')
+            agent = make_agent(0.9, 0.1, planning_steps=planning_steps)
+            training.run_environment(agent, env, 100, 200, verbose=False, seed=0)
+            greedy_returns.append(training.evaluate_agent(agent, env, 10, 200).mean)
+
+        assert greedy_returns == [0, 1]
+
+
+def test_dyna_q__vectorized():
+    """
+    Ensure the vectorized TD(0) update plans from every environment's transitions.
+    """
+    agent = agents.discrete.TDZeroAgent(0.9, 0.1, planning_steps=5)
+    vector_env = fast_frozen_lake.make_vector('FrozenLake8x8NotSlippery-v0', 16)
+    training.run_vectorized(agent, vector_env, 400, 200, verbose=False, seed=0)
+    assert len(agent.model) > 100
+    env = fast_frozen_lake.make('FrozenLake8x8NotSlippery-v0')
+    assert training.evaluate_agent(agent, env, 10, 200).mean == 1
+
+
+def test_dyna_q__repeated_samples_stay_bounded():
+    """
+    Ensure planning from a model of a few pairs doesn't blow up the values,
+    though each pair is sampled many times per batch.
+    """
+    agent = agents.discrete.TDZeroAgent(1, 0.3, planning_steps=32)
+    training.run_environment(agent, TwoDoorsTestEnv(0.8, 0.2), 300, 100, verbose=False, seed=0)
+    assert abs(agent.values.array).max() <= 1
+
+
+def test_dyna_q__plans_after_loading(tmp_path):
+    """
+    Ensure an agent loaded from a checkpoint has a model to plan with.
+    """
+    path = str(tmp_path / 'agent.npz')
+    env = TwoDoorsTestEnv(0.8, 0.2)
+    for make_agent in (agents.discrete.QLearningAgent, agents.discrete.TDZeroAgent):
+        agent = make_agent(1, 0.3, planning_steps=4)
+        training.run_environment(agent, env, 20, 100, verbose=False, seed=0)
+        agent.save(path)
+        loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+        loaded.start_episode()
+        observation, done = env.reset(), False
+        while not done:
+            loaded.observe(observation)
+            observation, reward, done, info = env.step(loaded.get_next_action())
+            loaded.receive_reward(reward)
+        loaded.finish_episode(observation)
+        assert len(loaded.model) > 0
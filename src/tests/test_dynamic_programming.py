@@ -0,0 +1,51 @@
+"""
+Verify planning with the environment's transition model
+"""
+import time
+
+import numpy as np
+
+from .. import agents
+from ..frozen_lake.environments import make_env
+from ..envs.two_doors import TwoDoorsTestEnv, START, END, LEFT, RIGHT
+
+
+def test_dynamic_programming__two_doors():
+    """
+    Ensure both planning methods find the exact values of a stochastic 2 door env.
+    """
+    for method in (agents.discrete.VALUE_ITERATION, agents.discrete.POLICY_ITERATION):
+        agent = agents.discrete.DynamicProgrammingAgent(gamma=1, method=method)
+        agent.start_environment(TwoDoorsTestEnv(p_left=0.7, p_right=0.3))
+        assert np.allclose(agent.values[START], [0.7, 0.3]), method
+        assert np.allclose(agent.values[END], [0, 0]), method
+
+
+def test_dynamic_programming__frozen_lake_8x8():
+    """
+    Ensure value and policy iteration agree on the slippery 8x8 lake, and are quick.
+    """
+    env = make_env(is_slippery=True, map_name='8x8')
+    value_agent = agents.discrete.DynamicProgrammingAgent(0.99)
+    start_time = time.perf_counter()
+    value_agent.start_environment(env)
+    assert time.perf_counter() - start_time < 1
+
+    policy_agent = agents.discrete.DynamicProgrammingAgent(0.99, agents.discrete.POLICY_ITERATION)
+    policy_agent.start_environment(env)
+    assert np.allclose(value_agent.values.array, policy_agent.values.array, atol=1e-4)
+    assert value_agent.values.array.max() > 0
+
+
+def test_dynamic_programming__warm_start():
+    """
+    Ensure planned values can seed a sampling agent.
+    """
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    planner = agents.discrete.DynamicProgrammingAgent(gamma=1)
+    planner.start_environment(env)
+    agent = agents.discrete.TDZeroAgent(1, 0.1)
+    agent.start_environment(env)
+    planner.warm_start(agent)
+    assert agent.get_action_greedily(START) == LEFT
+    assert agent.values[START][RIGHT] == 0
@@ -0,0 +1,50 @@
+"""
+Verify greedy policy evaluation
+"""
+import numpy as np
+
+from .. import agents, envs, training
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv
+
+
+def test_evaluate_agent__matches_planned_value():
+    """
+    Ensure the evaluated return of the optimal policy matches its planned value.
+    """
+    env = fast_frozen_lake.make('FrozenLake-v0')
+    planner = agents.discrete.DynamicProgrammingAgent(gamma=1, tolerance=1e-10)
+    planner.start_environment(env)
+    result = training.evaluate_agent(planner, env, num_episodes=20000, max_steps=1000, seed=0)
+    assert result.num_episodes == 20000
+    assert result.ci_low < planner.values.array[0].max() < result.ci_high
+    assert result.ci_high - result.ci_low < 0.02
+
+
+def test_evaluate_policy__parallel_workers():
+    """
+    Ensure splitting rollouts across processes gives a deterministic evaluation.
+    """
+    env = TwoDoorsTestEnv(p_left=0.7, p_right=0.2)
+    policy = np.array([0, 0])
+    table = envs.TransitionTable.from_env(env)
+    first = training.evaluate_policy(policy, table, 4000, 100, seed=3, workers=2)
+    second = training.evaluate_policy(policy, table, 4000, 100, seed=3, workers=2)
+    assert first == second
+    assert abs(first.mean - 0.7) < 0.03
+
+
+def test_periodic_evaluator__runs_alongside_training():
+    """
+    Ensure the runner hands the agent to the evaluator at each period.
+    """
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    evaluator = training.PeriodicEvaluator(env, period=10, num_episodes=100)
+    try:
+        training.run_environment(agents.discrete.TDZeroAgent(1, 0.5), env, 30, 100, verbose=False,
+                                 evaluator=evaluator)
+    finally:
+        evaluator.close()
+
+    assert [episode for episode, _ in evaluator.results] == [10, 20, 30]
+    assert evaluator.results[-1][1].mean == 1
@@ -0,0 +1,103 @@
+"""
+Verify the exploration policies and the value table's greedy action cache
+"""
+import numpy as np
+
+from .. import agents, training
+from ..agents.discrete import ValueTable, EpsilonGreedy, VisitCountEpsilonGreedy, Boltzmann, UCB
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv, START, LEFT, RIGHT
+
+
+def test_value_table__greedy_cache_follows_writes():
+    """
+    Ensure the cached greedy action is forgotten when its row changes.
+    """
+    table = ValueTable(3, 2)
+    assert table.argmax(0) == 0
+    table[0, 1] = 1
+    assert table.argmax(0) == 1
+    table[0] = [2, 0]
+    assert table.argmax(0) == 0
+    table.array[1, 1] = 1
+    assert table.argmax(1) == 1
+    table.array[1, 0] = 2
+    table.invalidate(np.array([1]))
+    assert table.argmax(1) == 0
+    table.fill(0)
+    assert [table.argmax(s) for s in range(3)] == [0, 0, 0]
+
+
+def test_visit_count_epsilon__decays_per_state():
+    """
+    Ensure epsilon only decays in the states which have been visited.
+    """
+    agent = agents.discrete.TDZeroAgent(exploration=VisitCountEpsilonGreedy())
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    for _ in range(100):
+        agent.exploration.select(agent, START)
+
+    epsilons = agent.exploration.get_epsilons(np.arange(len(agent.states)))
+    assert epsilons[START] < 0.2
+    assert (np.delete(epsilons, START) == 1).all()
+
+
+def test_probabilities__expected_sarsa_matches_epsilon_greedy():
+    """
+    Ensure the epsilon-greedy action probabilities give the old Expected SARSA target.
+    """
+    agent = agents.discrete.ExpectedSarsaAgent(1, 0.1)
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    agent.values.array[:] = np.random.default_rng(0).random(agent.values.array.shape)
+    agent.values.invalidate()
+    agent.episodes = 10
+    agent.exploration.start_episode(agent.episodes)
+    states = np.arange(len(agent.states))
+    next_values = agent.values.array[states]
+    epsilon = agent.get_epsilon()
+    expected = (1 - epsilon) * next_values.max(axis=-1) + epsilon * next_values.mean(axis=-1)
+    assert np.allclose(agent.bootstrap_values(states), expected)
+
+
+def test_boltzmann_and_ucb__learn_two_doors():
+    """
+    Ensure the softmax and UCB policies still find the likelier door.
+    """
+    for exploration in (Boltzmann(temperature=0.5), UCB(c=0.5)):
+        agent = agents.discrete.QLearningAgent(1, 0.05, exploration=exploration)
+        training.run_environment(agent, TwoDoorsTestEnv(p_left=0.8, p_right=0.2), 2000, 10, verbose=False, seed=0)
+        assert agent.values[START][LEFT] > agent.values[START][RIGHT]
+        assert abs(agent.values[START][LEFT] - 0.8) < 0.15
+
+
+def test_exploration__vectorized():
+    """
+    Ensure every exploration policy works with the vectorized TD(0) update.
+    """
+    for exploration in (EpsilonGreedy(), VisitCountEpsilonGreedy(), Boltzmann(), UCB()):
+        agent = agents.discrete.TDZeroAgent(0.9, 0.1, exploration=exploration)
+        vector_env = fast_frozen_lake.make_vector('FrozenLakeNotSlippery-v0', 8)
+        result = training.run_vectorized(agent, vector_env, 200, 100, verbose=False, seed=0)
+        assert result.episodes >= 200
+
+
+def test_exploration__counts_saved_in_checkpoints(tmp_path):
+    """
+    Ensure visit counts carry on from a checkpoint, so a resumed agent doesn't start exploring afresh.
+    """
+    path = str(tmp_path / 'agent.npz')
+    env = TwoDoorsTestEnv(0.8, 0.2)
+    for exploration in (VisitCountEpsilonGreedy, UCB):
+        agent = agents.discrete.QLearningAgent(1, 0.1, exploration=exploration())
+        training.run_environment(agent, env, 50, 10, verbose=False, checkpoint_path=path, seed=0)
+        resumed = agents.discrete.QLearningAgent(1, 0.1, exploration=exploration())
+        resumed.start_environment(env)
+        resumed.load(path)
+        loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+        for restored in (resumed, loaded):
+            if exploration is UCB:
+                assert np.array_equal(restored.exploration.counts, agent.exploration.counts)
+                assert restored.exploration.state_counts[START] == 50
+            else:
+                assert restored.exploration.visits[START] == 50
+                assert restored.exploration.get_epsilon(START) == agent.exploration.get_epsilon(START) < 1
@@ -0,0 +1,120 @@
+"""
+Verify the NumPy frozen lake matches gym's
+"""
+import subprocess
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from .. import envs
+from ..envs import fast_frozen_lake
+from ..frozen_lake.environments import make_env
+
+
+def get_distributions(table):
+    """
+    (state, action) -> {next state: (total probability, reward, done)}
+    """
+    distributions = {}
+    for s in range(table.num_states):
+        for a in range(table.num_actions):
+            outcomes = defaultdict(float)
+            for k in range(table.probs.shape[2]):
+                p = table.probs[s, a, k]
+                if p > 0:
+                    key = (int(table.next_states[s, a, k]), table.rewards[s, a, k], bool(table.dones[s, a, k]))
+                    outcomes[key] += p
+
+            distributions[(s, a)] = {key: round(p, 9) for key, p in outcomes.items()}
+
+    return distributions
+
+
+def test_fast_frozen_lake__same_transition_model_as_gym():
+    """
+    Ensure every map and slip setting has exactly gym's transition probabilities.
+    """
+    for env_id, (map_name, is_slippery, max_steps) in fast_frozen_lake.ENV_IDS.items():
+        gym_table = envs.TransitionTable.from_env(make_env(is_slippery, map_name))
+        fast_env = fast_frozen_lake.make(env_id)
+        assert get_distributions(fast_env.transition_table) == get_distributions(gym_table), env_id
+        assert np.allclose(fast_env.transition_table.initial_distribution, gym_table.initial_distribution)
+
+
+def run_random_episodes(env, num_episodes, seed):
+    rng = np.random.RandomState(seed)
+    env.seed(seed)
+    returns, lengths = [], []
+    for _ in range(num_episodes):
+        env.reset()
+        for t in range(1000):
+            _, reward, done, _ = env.step(rng.randint(4))
+            if done:
+                break
+
+        returns.append(reward)
+        lengths.append(t + 1)
+
+    return np.mean(returns), np.mean(lengths)
+
+
+def test_fast_frozen_lake__statistically_matches_gym():
+    """
+    Ensure random play gives the same success rate and episode length as gym.
+    """
+    fast_return, fast_length = run_random_episodes(fast_frozen_lake.make('FrozenLake-v0'), 4000, seed=0)
+    gym_return, gym_length = run_random_episodes(make_env(is_slippery=True), 4000, seed=0)
+    assert abs(fast_return - gym_return) < 0.01
+    assert abs(fast_length - gym_length) < 0.5
+
+
+def test_fast_frozen_lake__time_limit_and_batches():
+    """
+    Ensure the time limit from gym.make is kept, for single and batched lakes.
+    """
+    env = fast_frozen_lake.make('FrozenLakeNotSlippery-v0', seed=0)
+    env.reset()
+    for t in range(100):
+        # Walking into the top wall never ends the episode by itself
+        _, _, done, _ = env.step(fast_frozen_lake.UP)
+
+    assert done and t == 99
+
+    vector_env = fast_frozen_lake.make_vector('FrozenLake8x8-v0', num_envs=32, seed=0)
+    assert (vector_env.reset() == 0).all()
+    observations, rewards, dones, _ = vector_env.step(np.full(32, fast_frozen_lake.RIGHT))
+    assert set(observations.tolist()) <= {0, 1, 8}
+
+
+def test_fast_frozen_lake__does_not_import_gym():
+    """
+    Ensure the fast lake can start up without paying for a gym import.
+    """
+    code = 'import sys; import src.envs.fast_frozen_lake; assert "gym" not in sys.modules'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_generate_map__solvable_and_repeatable():
+    """
+    Ensure generated maps can be solved, have about the asked for hole density, and depend only on the seed.
+    """
+    desc = fast_frozen_lake.generate_map(64, hole_density=0.3, seed=1)
+    assert len(desc) == 64 and all(len(row) == 64 for row in desc)
+    assert desc[0][0] == 'S' and desc[-1][-1] == 'G'
+    assert fast_frozen_lake.is_solvable(desc)
+    assert abs(''.join(desc).count('H') / 64**2 - 0.3) < 0.03
+    assert fast_frozen_lake.generate_map(64, hole_density=0.3, seed=1) == desc
+    assert not fast_frozen_lake.is_solvable(['SFH', 'HHF', 'FFG'])
+
+
+def test_generated_lake__same_transition_model_as_gym():
+    """
+    Ensure a generated lake is the same map in gym and in NumPy, with a time limit for its size.
+    """
+    for is_slippery in (True, False):
+        gym_env = make_env(is_slippery, '16x16')
+        fast_env = make_env(is_slippery, '16x16', fast=True)
+        gym_table = envs.TransitionTable.from_env(gym_env)
+        assert get_distributions(fast_env.transition_table) == get_distributions(gym_table)
+        assert gym_env._max_episode_steps == fast_env.max_episode_steps == 400
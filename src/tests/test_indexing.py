@@ -0,0 +1,60 @@
+"""
+Verify observation indexing for structured observation spaces
+"""
+import numpy as np
+import pytest
+from gym import spaces
+
+from .. import agents, envs, training
+from ..envs.indexing import get_space_sizes
+
+
+def test_mixed_radix__dense_and_reversible():
+    """
+    Ensure every blackjack observation gets its own id in [0, n).
+    """
+    space = spaces.Tuple((spaces.Discrete(32), spaces.Discrete(11), spaces.Discrete(2)))
+    indexer = envs.make_indexer(space)
+    assert indexer.n == 32 * 11 * 2
+    observations = [(s, d, a) for s in range(32) for d in range(11) for a in (False, True)]
+    ids = [indexer(obs) for obs in observations]
+    assert sorted(ids) == list(range(indexer.n))
+    assert indexer.observation(indexer((20, 10, True))) == (20, 10, 1)
+    assert (indexer.index_batch(np.array(observations[:5], dtype=int)) == ids[:5]).all()
+
+
+def test_mixed_radix__nested_spaces():
+    """
+    Ensure MultiDiscrete spaces and nested tuples are flattened in order.
+    """
+    space = spaces.Tuple((spaces.MultiDiscrete([3, 4]), spaces.Discrete(5)))
+    assert get_space_sizes(space) == [3, 4, 5]
+    indexer = envs.make_indexer(space)
+    assert indexer((np.array([2, 3]), 4)) == indexer.n - 1
+    assert indexer((np.array([1, 0]), 2)) == 1 * 20 + 0 * 5 + 2
+
+
+def test_hash_indexer__assigns_ids_on_demand():
+    """
+    Ensure unstructured observations get the next free id, and running out of ids is an error.
+    """
+    indexer = envs.HashIndexer(2)
+    first = {'image': np.zeros((2, 2)), 'direction': 0}
+    second = {'image': np.ones((2, 2)), 'direction': 0}
+    assert indexer(first) == 0
+    assert indexer(second) == 1
+    assert indexer({'direction': 0, 'image': np.zeros((2, 2))}) == 0
+    with pytest.raises(ValueError):
+        indexer({'image': np.zeros((2, 2)), 'direction': 1})
+
+
+def test_blackjack__tabular_agents_learn_to_stick_on_20():
+    """
+    Ensure the tabular agents run unchanged on blackjack, and learn that sticking on 20 beats hitting.
+    """
+    for agent in (agents.discrete.MonteCarloAgent(1, 0.05), agents.discrete.TDZeroAgent(1, 0.05)):
+        env = envs.make_blackjack()
+        training.run_environment(agent, env, 5000, 100, verbose=False, seed=0)
+        state = env.indexer((20, 10, False))
+        stick, hit = agent.values[state]
+        assert stick > 0.2 > hit
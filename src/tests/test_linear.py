@@ -0,0 +1,91 @@
+"""
+Verify tile coding and the linear function approximation agents
+"""
+import gym
+import numpy as np
+
+from .. import agents, training
+from ..agents.linear import TileCoder, IndexHashTable
+from ..envs.two_doors import TwoDoorsTestEnv, START, LEFT
+
+
+def test_tile_coder__nearby_observations_share_tiles():
+    """
+    Ensure close observations share most tiles and distant ones share none.
+    """
+    coder = TileCoder([0, 0], [1, 1], num_tilings=8, tiles_per_dim=4)
+    tiles = coder([0.5, 0.5])
+    assert len(tiles) == 8
+    assert np.array_equal(tiles, coder([0.5, 0.5]))
+    assert len(set(tiles) & set(coder([0.52, 0.5]))) >= 6
+    assert not set(tiles) & set(coder([0.05, 0.95]))
+
+
+def test_index_hash_table__memory_is_bounded():
+    """
+    Ensure indices stay below the table size once it's full.
+    """
+    table = IndexHashTable(10)
+    indices = [table.get_index((i, i)) for i in range(100)]
+    assert indices[:10] == list(range(10))
+    assert all(0 <= index < 10 for index in indices)
+    assert len(table) == 10 and table.overflows == 90
+    assert table.get_index((3, 3)) == 3
+
+
+def test_linear_agents__choose_better_door():
+    """
+    Ensure both agents learn the better door from tile-coded discrete states.
+    """
+    for agent_class in (agents.linear.LinearSarsaLambdaAgent, agents.linear.LinearQLambdaAgent):
+        env = TwoDoorsTestEnv(p_left=0.8, p_right=0.2)
+        agent = agent_class(gamma=1, alpha=0.1, lambd=0.5, num_tilings=4, tiles_per_dim=2)
+        training.run_environment(agent, env, 500, 100, verbose=False, seed=1)
+        assert agent.get_action_greedily(START) == LEFT
+
+
+def test_linear_sarsa_lambda__learns_mountain_car():
+    """
+    Ensure linear SARSA-Lambda learns to reach the flag on a continuous environment.
+    """
+    env = gym.make('MountainCar-v0')
+    agent = agents.linear.LinearSarsaLambdaAgent(gamma=1, alpha=0.5, lambd=0.9)
+    result = training.run_environment(agent, env, 100, 200, verbose=False, seed=0)
+    assert result.average_return > -195
+    assert len(agent.tile_coder.hash_table) < agent.size
+
+
+def test_linear_agent__resumes_from_checkpoint(tmp_path):
+    """
+    Ensure the weights and tile indices are restored together.
+    """
+    path = str(tmp_path / 'linear.npz')
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    agent = agents.linear.LinearQLambdaAgent(gamma=1, alpha=0.5, lambd=0.5, num_tilings=2, tiles_per_dim=2)
+    training.run_environment(agent, env, 20, 100, verbose=False, checkpoint_path=path)
+
+    resumed = agents.linear.LinearQLambdaAgent()
+    training.run_environment(resumed, env, 20, 100, verbose=False, checkpoint_path=path, resume=True)
+    assert resumed.num_tilings == 2
+    assert np.array_equal(resumed.weights.array, agent.weights.array)
+    assert resumed.tile_coder.hash_table.indices == agent.tile_coder.hash_table.indices
+
+
+def test_linear_agent__from_checkpoint(tmp_path):
+    """
+    Ensure a linear agent can be rebuilt from a checkpoint without the environment.
+    """
+    path = str(tmp_path / 'linear.npz')
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    agent = agents.linear.LinearSarsaLambdaAgent(gamma=1, alpha=0.5, lambd=0.5, num_tilings=2, tiles_per_dim=2)
+    training.run_environment(agent, env, 20, 100, verbose=False)
+    agent.save(path)
+
+    loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+    assert type(loaded) is agents.linear.LinearSarsaLambdaAgent
+    assert loaded.get_action_greedily(START) == agent.get_action_greedily(START) == LEFT
+    loaded.start_episode()
+    loaded.observe(env.reset())
+    observation, reward, done, info = env.step(loaded.get_next_action())
+    loaded.receive_reward(reward)
+    loaded.finish_episode(observation)
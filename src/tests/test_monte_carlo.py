@@ -0,0 +1,110 @@
+"""
+Verify Monte Carlo episode bookkeeping
+"""
+import numpy as np
+
+from .. import agents
+from ..agents.discrete.monte_carlo import EpisodeBuffer, discounted_returns
+
+
+def test_episode_buffer__grows_and_tracks_first_visits():
+    """
+    Ensure the buffer outgrows its initial capacity and flags repeat visits.
+    """
+    buffer = EpisodeBuffer(capacity=2)
+    firsts = [buffer.append(s, 0, track_first_visits=True) for s in [0, 1, 0, 2, 1]]
+    assert firsts == [True, True, False, True, False]
+    assert buffer.length == 5
+    assert buffer.states[:5] == [0, 1, 0, 2, 1]
+    buffer.clear()
+    assert buffer.append(0, 0, track_first_visits=True)
+
+
+def test_monte_carlo__first_visit_counts_once_per_episode():
+    """
+    Ensure first visit MC only counts and learns from the first visit to a pair.
+    """
+    class LoopEnv:
+        class observation_space:
+            n = 2
+
+        class action_space:
+            n = 1
+
+    agent = agents.discrete.MonteCarloAgent(gamma=1, first_visit=True)
+    agent.start_environment(LoopEnv)
+    agent.start_episode()
+    for reward in [0, 0, 1]:
+        agent.observe(0)
+        agent.get_next_action()
+        agent.receive_reward(reward)
+
+    assert agent.finish_episode(1) == 1
+    assert agent.visits[0][0] == 1
+    assert agent.values[0][0] == 1
+
+
+def test_discounted_returns__matches_backward_pass():
+    """
+    Ensure the blockwise returns match the step by step recursion, across several blocks.
+    """
+    rewards = np.random.default_rng(0).normal(size=100)
+    for gamma in (0, 0.9, 1):
+        expected, return_t = np.zeros(100), 0.0
+        for t in reversed(range(100)):
+            return_t = rewards[t] + gamma * return_t
+            expected[t] = return_t
+
+        assert np.allclose(discounted_returns(rewards, gamma), expected)
+
+
+def test_monte_carlo__long_and_short_episodes_learn_the_same():
+    """
+    Ensure the vectorized update for long episodes matches the element by element one.
+    """
+    class LoopEnv:
+        class observation_space:
+            n = 3
+
+        class action_space:
+            n = 2
+
+    steps = [(t % 3, t % 2, float(t % 5 == 0)) for t in range(80)]
+    learned = []
+    for vectorize_length in (1, 1000):
+        agent = agents.discrete.MonteCarloAgent(gamma=0.9)
+        agent.VECTORIZE_LENGTH = vectorize_length
+        agent.start_environment(LoopEnv)
+        for _ in range(2):
+            agent.start_episode()
+            for state, action, reward in steps:
+                agent.buffer.append(state, action)
+                agent.receive_reward(reward)
+            agent.finish_episode(0)
+        learned.append((agent.values.array, agent.visits.array))
+
+    assert np.allclose(learned[0][0], learned[1][0])
+    assert (learned[0][1] == learned[1][1]).all()
+
+
+def test_monte_carlo__long_episode_step_size_stays_bounded():
+    """
+    Ensure a pair visited many times in one long episode moves by the mean of its updates,
+    so with a step size it stays between its old value and the returns.
+    """
+    class LoopEnv:
+        class observation_space:
+            n = 1
+
+        class action_space:
+            n = 1
+
+    agent = agents.discrete.MonteCarloAgent(gamma=1, step_size=agents.discrete.ConstantStepSize(0.5))
+    agent.start_environment(LoopEnv)
+    agent.start_episode()
+    for _ in range(100):
+        agent.buffer.append(0, 0)
+        agent.receive_reward(0.0)
+    agent.finish_episode(0)
+    # Every return is 0 and the value starts at 0.5, so it should halve
+    assert np.isclose(agent.values[0, 0], 0.25)
@@ -0,0 +1,35 @@
+"""
+Verify Hogwild style parallel training on a shared value table
+"""
+from functools import partial
+
+import numpy as np
+
+from .. import agents, training
+from ..agents.discrete import UncachedValueTable
+from ..frozen_lake.environments import make_env
+
+
+def test_uncached_value_table__sees_outside_writes():
+    """
+    Ensure greedy actions follow writes which bypass the table, like another process's.
+    """
+    array = np.zeros((2, 3))
+    table = UncachedValueTable.from_array(array)
+    assert table.argmax(0) == 0
+    array[0, 2] = 1
+    assert table.argmax(0) == 2
+
+
+def test_run_parallel__workers_share_values():
+    """
+    Ensure several workers solve the lake together and the learned values come back to the agent.
+    """
+    agent = agents.discrete.QLearningAgent(0.95, 0.1)
+    env_factory = partial(make_env, False, '8x8', fast=True)
+    result = training.run_parallel(agent, env_factory, 5000, 200, workers=3, solved=0.9, verbose=False, seed=0)
+    assert result.solved
+    assert type(agent.values) is agents.discrete.ValueTable
+    assert agent.episodes == result.episodes
+    evaluation = training.evaluate_agent(agent, env_factory(), 10, 200)
+    assert evaluation.mean == 1
@@ -0,0 +1,92 @@
+"""
+Verify the indexed priority queue and prioritized sweeping
+"""
+import numpy as np
+
+from .. import agents, training
+from ..agents.discrete import IndexedPriorityQueue
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv, START, LEFT
+
+
+def test_priority_queue__pops_in_priority_order():
+    """
+    Ensure keys come out highest priority first, and pushing again updates in place.
+    """
+    queue = IndexedPriorityQueue()
+    for key, priority in enumerate([0.3, 0.9, 0.1, 0.5, 0.7]):
+        queue.push(key, priority)
+
+    queue.push(2, 1.0)  # Raised
+    queue.push(1, 0.2)  # Lower than queued, ignored
+    queue.update(4, 0.05)  # Lowered
+    assert len(queue) == 5
+    assert [queue.pop() for _ in range(5)] == [(2, 1.0), (1, 0.9), (3, 0.5), (0, 0.3), (4, 0.05)]
+    assert not queue
+
+
+def test_prioritized_sweeping__choose_better_door():
+    """
+    Ensure the planned values follow the model's expected rewards.
+    """
+    env = TwoDoorsTestEnv(p_left=0.7, p_right=0.3)
+    agent = agents.discrete.PrioritizedSweepingAgent(gamma=1)
+    training.run_environment(agent, env, 500, 100, verbose=False, seed=0)
+    assert agent.get_action_greedily(START) == LEFT
+    assert abs(agent.values[START][LEFT] - 0.7) < 0.1
+
+
+def test_prioritized_sweeping__solves_lake_in_fewer_episodes():
+    """
+    Ensure planning solves slippery frozen lake in far fewer episodes than TD-Lambda manages.
+    """
+    results = {}
+    for agent in (
+        agents.discrete.PrioritizedSweepingAgent(gamma=0.99, planning_steps=20),
+        agents.discrete.TDLambdaAgent(gamma=0.9, alpha=0.1, lambd=0.8),
+    ):
+        env = fast_frozen_lake.make('FrozenLake-v0')
+        results[type(agent)] = training.run_environment(agent, env, 4000, 100, 0.6, verbose=False, seed=2)
+
+    assert results[agents.discrete.PrioritizedSweepingAgent].solved
+    assert not results[agents.discrete.TDLambdaAgent].solved
+
+
+def test_prioritized_sweeping__checkpoint_keeps_model(tmp_path):
+    """
+    Ensure the learned model survives a save and load.
+    """
+    path = str(tmp_path / 'sweeping.npz')
+    env = TwoDoorsTestEnv(p_left=0.7, p_right=0.3)
+    agent = agents.discrete.PrioritizedSweepingAgent(gamma=1, planning_steps=5)
+    training.run_environment(agent, env, 50, 100, verbose=False)
+    agent.save(path)
+
+    loaded = agents.discrete.PrioritizedSweepingAgent()
+    loaded.start_environment(env)
+    loaded.load(path)
+    assert loaded.planning_steps == 5
+    assert loaded.successors == agent.successors
+    assert loaded.predecessors == agent.predecessors
+    assert np.array_equal(loaded.visits.array, agent.visits.array)
+
+
+def test_prioritized_sweeping__from_checkpoint(tmp_path):
+    """
+    Ensure an agent rebuilt from a checkpoint has the model and carries on learning.
+    """
+    path = str(tmp_path / 'sweeping.npz')
+    env = TwoDoorsTestEnv(p_left=0.7, p_right=0.3)
+    agent = agents.discrete.PrioritizedSweepingAgent(gamma=1, planning_steps=5)
+    training.run_environment(agent, env, 50, 100, verbose=False)
+    agent.save(path)
+
+    loaded = agents.discrete.BaseAgent.from_checkpoint(path)
+    assert loaded.successors == agent.successors
+    assert loaded.predecessors == agent.predecessors
+    loaded.start_episode()
+    loaded.observe(env.reset())
+    observation, reward, done, info = env.step(loaded.get_next_action())
+    loaded.receive_reward(reward)
+    loaded.finish_episode(observation)
+    assert loaded.visits.array.sum() == agent.visits.array.sum() + 1
@@ -0,0 +1,99 @@
+"""
+Verify remote environments, served over a socket with asyncio
+"""
+import time
+
+import numpy as np
+import pytest
+
+from .. import agents, training
+from ..envs.remote import EnvServer, RemoteVectorEnv, RemoteEnvError
+from ..frozen_lake.environments import make_env
+
+LATENCY = 0.02
+
+
+@pytest.fixture
+def server():
+    server = EnvServer(lambda: make_env(is_slippery=False), latency=LATENCY)
+    server.serve_in_thread()
+    yield server
+    server.close()
+
+
+def test_remote_vector_env__overlaps_latency(server):
+    """
+    Ensure the sessions are stepped concurrently, so a step costs one latency rather than one per session.
+    """
+    vector_env = RemoteVectorEnv(server.host, server.port, 8)
+    assert vector_env.observation_space.n == 16
+    assert (vector_env.reset() == 0).all()
+    start = time.perf_counter()
+    for _ in range(5):
+        observations, rewards, dones, infos = vector_env.step(np.full(8, 2))
+
+    elapsed = time.perf_counter() - start
+    vector_env.close()
+    assert elapsed < 5 * 8 * LATENCY / 2
+    assert observations.tolist() == [3] * 8
+    assert not dones.any()
+    assert infos[0] == {'prob': 1.0}
+
+
+def test_remote_vector_env__slow_session_holds_back_nobody():
+    """
+    Ensure sessions which have replied can step again while a slow one is still working.
+    """
+    server = EnvServer(lambda: make_env(is_slippery=False), latency=[0.2, 0, 0, 0])
+    server.serve_in_thread()
+    vector_env = RemoteVectorEnv(server.host, server.port, 4)
+    vector_env.reset()
+    replies = np.zeros(4, dtype=int)
+    vector_env.step_async(np.arange(4), np.zeros(4, dtype=int))
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.3:
+        env_ids, observations, rewards, dones, infos = vector_env.step_wait()
+        replies[env_ids] += 1
+        # Moving left from the start doesn't go anywhere, so the episodes never end
+        vector_env.step_async(env_ids, np.zeros(len(env_ids), dtype=int))
+
+    vector_env.close()
+    server.close()
+    assert sorted(replies)[0] <= 2
+    assert sorted(replies)[1] > 20
+
+
+def test_run_remote__slow_session_holds_back_nobody():
+    """
+    Ensure the runner carries on with the fast sessions, rather than stepping at the slow one's pace.
+    """
+    server = EnvServer(lambda: make_env(is_slippery=False), latency=[0.1, 0, 0, 0])
+    server.serve_in_thread()
+    agent = agents.discrete.TDZeroAgent(0.9, 0.1)
+    start = time.perf_counter()
+    result = training.run_remote(agent, server.host, server.port, 4, 200, 100, verbose=False, seed=0)
+    elapsed = time.perf_counter() - start
+    server.close()
+    assert result.episodes >= 200
+    # In lockstep, each of the at least 6 * 200 / 4 steps would wait for the slow session
+    assert elapsed < 6 * 200 / 4 * 0.1 / 4
+
+
+def test_remote_vector_env__reports_errors(server):
+    """
+    Ensure an exception in the served environment is raised in the client.
+    """
+    vector_env = RemoteVectorEnv(server.host, server.port, 2)
+    vector_env.reset()
+    with pytest.raises(RemoteEnvError):
+        vector_env.step([9, 9])
+    vector_env.close()
+
+
+def test_run_remote__solves_lake(server):
+    """
+    Ensure an agent can learn through remote sessions, like through a vectorized env.
+    """
+    agent = agents.discrete.TDZeroAgent(0.9, 0.05)
+    result = training.run_remote(agent, server.host, server.port, 16, 600, 100, solved=0.9, verbose=False, seed=0)
+    assert result.solved
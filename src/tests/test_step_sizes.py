@@ -0,0 +1,79 @@
+"""
+Verify step size schedules
+"""
+import numpy as np
+
+from .. import agents, training
+from ..agents.discrete import VisitCountStepSize, HarmonicStepSize, AdaptiveStepSize
+from ..envs import fast_frozen_lake
+from ..envs.two_doors import TwoDoorsTestEnv, START, LEFT
+
+
+def test_visit_count_step_size__decays_per_entry():
+    """
+    Ensure each state-action pair's step size follows its own update count, kept in a table on the agent.
+    """
+    agent = agents.discrete.TDZeroAgent(1, 0.1, step_size=VisitCountStepSize(power=0.5))
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    step_sizes = [agent.step_size.get(START, LEFT, 1.0) for _ in range(4)]
+    assert np.allclose(step_sizes, [1, 1 / 2**0.5, 1 / 3**0.5, 1 / 4**0.5])
+    assert agent.step_counts[START].tolist() == [4, 0]
+    batch = agent.step_size.batch(np.array([START, START]), np.array([LEFT, 1]), np.zeros(2))
+    assert np.allclose(batch, [1 / 5**0.5, 1])
+    assert np.isclose(HarmonicStepSize(a=10).schedule[11], 10 / 20)
+
+
+def test_visit_count_step_size__keeps_decaying_past_schedule():
+    """
+    Ensure step sizes keep falling as 1/n after the precomputed schedule runs out.
+    """
+    agent = agents.discrete.TDZeroAgent(1, 0.1, step_size=VisitCountStepSize(power=1))
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    n = VisitCountStepSize.SCHEDULE_SIZE
+    agent.step_counts[START, LEFT] = n - 1
+    assert agent.step_size.get(START, LEFT, 1.0) == 1 / n
+    assert agent.step_size.get(START, LEFT, 1.0) == 1 / (n + 1)
+    batch = agent.step_size.batch(np.array([START, START]), np.array([LEFT, 1]), np.zeros(2))
+    assert np.allclose(batch, [1 / (n + 2), 1])
+
+def test_monte_carlo__harmonic_power_one_is_sample_average():
+    """
+    Ensure first visit Monte Carlo with 1/n step sizes learns exactly the sample average.
+    """
+    value_tables = []
+    for step_size in (None, VisitCountStepSize(power=1)):
+        agent = agents.discrete.MonteCarloAgent(0.9, first_visit=True, step_size=step_size)
+        training.run_environment(agent, fast_frozen_lake.make('FrozenLake-v0'), 300, 100, verbose=False, seed=0)
+        value_tables.append(agent.values.array)
+
+    assert np.allclose(value_tables[0], value_tables[1])
+
+
+def test_adaptive_step_size__grows_and_shrinks():
+    """
+    Ensure step sizes grow while the errors agree and shrink when they flip sign.
+    """
+    agent = agents.discrete.QLearningAgent(1, step_size=AdaptiveStepSize(initial=0.1, increase=0.01, decrease=0.5))
+    agent.start_environment(TwoDoorsTestEnv(0.8, 0.2))
+    step_size = agent.step_size
+    assert step_size.get(START, LEFT, 1.0) == 0.1
+    assert np.isclose(step_size.get(START, LEFT, 1.0), 0.11)
+    assert np.isclose(step_size.get(START, LEFT, -1.0), 0.055)
+    assert agent.adaptive_step_sizes[START][1] == 0.1
+
+
+def test_step_sizes__saved_in_checkpoints(tmp_path):
+    """
+    Ensure update counts carry on from a checkpoint.
+    """
+    path = str(tmp_path / 'agent.npz')
+    env = TwoDoorsTestEnv(0.8, 0.2)
+    agent = agents.discrete.QLearningAgent(1, step_size=HarmonicStepSize())
+    training.run_environment(agent, env, 50, 10, verbose=False, checkpoint_path=path, seed=0)
+    restored = agents.discrete.QLearningAgent(1, step_size=HarmonicStepSize())
+    restored.start_environment(env)
+    restored.load(path)
+    assert restored.step_counts[START][LEFT] > 0
+    assert (restored.step_counts.array == agent.step_counts.array).all()
+    restored.step_size.get(START, LEFT, 0.0)
+    assert restored.step_counts[START][LEFT] == agent.step_counts[START][LEFT] + 1
@@ -0,0 +1,68 @@
+"""
+Verify the hyperparameter sweep engine
+"""
+import json
+
+import pytest
+
+from ..frozen_lake import sweep
+
+
+def test_grid_search__all_combinations():
+    """
+    Ensure the grid covers every combination of values.
+    """
+    space = {'agent': ['TDZeroAgent', 'TDLambdaAgent'], 'gamma': [0.9, 0.99], 'alpha': [0.1]}
+    configs = list(sweep.grid_search(space))
+    assert len(configs) == 4
+    assert {'agent': 'TDLambdaAgent', 'gamma': 0.99, 'alpha': 0.1} in configs
+
+
+def test_random_search__deterministic():
+    """
+    Ensure random search samples ranges and choices reproducibly.
+    """
+    space = {'agent': ['TDZeroAgent', 'TDLambdaAgent'], 'alpha': (0.01, 0.5)}
+    first = list(sweep.random_search(space, 5, seed=3))
+    assert first == list(sweep.random_search(space, 5, seed=3))
+    assert all(0.01 <= config['alpha'] <= 0.5 for config in first)
+
+
+def test_run_sweep__streams_reproducible_results(tmp_path):
+    """
+    Ensure every trial is written to the results file, and reruns give the same results.
+    """
+    configs = sweep.grid_search({'agent': ['TDZeroAgent'], 'alpha': [0.1, 0.5]})
+    trials = sweep.make_trials([dict(c, num_episodes=200) for c in configs], root_seed=7)
+    assert trials[0]['seed'] != trials[1]['seed']
+
+    results_path = tmp_path / 'sweep.jsonl'
+    first = sweep.run_sweep(trials, str(results_path), workers=2)
+    lines = [json.loads(line) for line in results_path.read_text().splitlines()]
+    assert sorted(line['trial_id'] for line in lines) == [0, 1]
+
+    second = sweep.run_sweep(trials, str(tmp_path / 'again.jsonl'), workers=2)
+    for a, b in zip(first, second):
+        assert a['episodes'] == b['episodes']
+        assert a['average_return'] == b['average_return']
+
+
+def test_run_trial__passes_only_the_agents_hyperparameters():
+    """
+    Ensure agents whose constructors don't take gamma, alpha and lambd in order still run.
+    """
+    trial = sweep.make_trials([{'agent': 'DynamicProgrammingAgent', 'gamma': 0.99, 'num_episodes': 100}])[0]
+    result = sweep.run_trial(trial)
+    assert result['episodes'] <= 100
+
+
+@pytest.mark.parametrize('argv', [
+    ['--agent', 'TDZeroAgnet'],
+    ['--map-name', '5x5'],
+])
+def test_parse_args__rejects_unknown_names(argv):
+    """
+    Ensure typos are caught before any worker starts.
+    """
+    with pytest.raises(SystemExit):
+        sweep.parse_args(argv)
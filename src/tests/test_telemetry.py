@@ -0,0 +1,55 @@
+"""
+Verify training telemetry
+"""
+import io
+
+import pytest
+
+from .. import agents, training
+from ..envs import fast_frozen_lake
+
+
+def test_telemetry__records_each_period(tmp_path):
+    """
+    Ensure the runner writes one line per period with timings and stats.
+    """
+    path = str(tmp_path / 'telemetry.jsonl')
+    telemetry = training.Telemetry(path, period=50)
+    agent = agents.discrete.QLearningAgent(gamma=0.9, alpha=0.1)
+    env = fast_frozen_lake.make('FrozenLake-v0', seed=0)
+    training.run_environment(agent, env, 200, 100, verbose=False, telemetry=telemetry, seed=0)
+    telemetry.close()
+    records = training.read_telemetry(path)
+    assert [r['episode'] for r in records] == [50, 100, 150, 200]
+    for record in records:
+        assert record['episodes'] == 50
+        assert record['steps'] == pytest.approx(record['mean_length'] * 50)
+        assert all(record['seconds'][phase] > 0 for phase in ('step', 'action', 'update'))
+        assert record['td_error'] > 0
+        assert 0.05 <= record['epsilon'] <= 1
+
+
+def test_telemetry__vectorized():
+    """
+    Ensure the vectorized runner counts every environment's steps and episodes.
+    """
+    stream = io.StringIO()
+    telemetry = training.Telemetry(stream=stream, period=100)
+    agent = agents.discrete.TDZeroAgent(gamma=0.9, alpha=0.1)
+    vector_env = fast_frozen_lake.make_vector('FrozenLake-v0', 16, seed=0)
+    result = training.run_vectorized(agent, vector_env, 400, 100, verbose=False, telemetry=telemetry, seed=0)
+    records = [line for line in stream.getvalue().splitlines()]
+    assert len(records) == result.episodes // 100
+    assert '"td_error": null' not in records[0]
+
+
+def test_run_environment__prints_values_on_request(capsys):
+    """
+    Ensure reports only dump the value table when asked to.
+    """
+    agent = agents.discrete.TDZeroAgent(gamma=0.9, alpha=0.1)
+    env = fast_frozen_lake.make('FrozenLake-v0', seed=0)
+    training.run_environment(agent, env, 10, 100, report_period=5)
+    assert 'LEFT' not in capsys.readouterr().out
+    training.run_environment(agent, env, 10, 100, report_period=5, show_values=True)
+    assert 'LEFT' in capsys.readouterr().out
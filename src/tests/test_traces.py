@@ -0,0 +1,50 @@
+"""
+Verify sparse eligibility traces
+"""
+import numpy as np
+
+from .. import agents
+
+
+def test_trace__accumulating_matches_dense():
+    """
+    Ensure an untruncated sparse trace matches the dense update it replaced.
+    """
+    trace = agents.discrete.EligibilityTrace(agents.discrete.ACCUMULATING, threshold=0)
+    dense = np.zeros(6)
+    for index in [0, 3, 0, 5]:
+        trace.decay(0.5)
+        trace.visit(index)
+        dense *= 0.5
+        dense[index] += 1
+
+    assert np.allclose(trace.to_array(6), dense)
+    values = np.zeros(6)
+    trace.apply(values, 2)
+    assert np.allclose(values, 2 * dense)
+
+
+def test_trace__replacing_resets_to_one():
+    """
+    Ensure replacing traces cap eligibility at one.
+    """
+    trace = agents.discrete.EligibilityTrace(agents.discrete.REPLACING, threshold=0)
+    trace.visit(1)
+    trace.decay(0.9)
+    trace.visit(1)
+    assert trace.to_array(2)[1] == 1
+
+
+def test_trace__drops_negligible_entries():
+    """
+    Ensure the active set only holds entries above the threshold.
+    """
+    trace = agents.discrete.EligibilityTrace(threshold=0.1)
+    trace.visit(0)
+    trace.decay(0.5)
+    trace.visit(1)
+    assert len(trace) == 2
+    for _ in range(4):
+        trace.decay(0.5)
+
+    assert len(trace) == 0
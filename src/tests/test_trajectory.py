@@ -0,0 +1,72 @@
+"""
+Verify the trajectory ring buffer and replaying stored experience
+"""
+import numpy as np
+
+from .. import agents, envs, training
+from ..envs.two_doors import TwoDoorsTestEnv, START, END, LEFT, RIGHT
+
+
+def test_trajectory_buffer__wraps_around():
+    """
+    Ensure the oldest transitions are overwritten once the buffer is full.
+    """
+    buffer = agents.discrete.TrajectoryBuffer(capacity=3)
+    for i in range(4):
+        buffer.add(i, 0, 1.0, i + 1, False)
+
+    buffer.add_batch(np.array([10, 11]), np.array([1, 1]), np.zeros(2), np.array([0, 0]), np.array([True, False]))
+    assert len(buffer) == 3
+    latest = buffer.latest(3)
+    assert latest.states.tolist() == [3, 10, 11]
+    assert latest.dones.tolist() == [False, True, False]
+    assert latest.states.dtype == np.int32
+    assert latest.rewards.dtype == np.float32
+
+
+def test_trajectory_buffer__persists_to_disk(tmp_path):
+    """
+    Ensure a memory-mapped buffer can be reopened with its contents.
+    """
+    path = str(tmp_path / 'buffer')
+    buffer = agents.discrete.TrajectoryBuffer(capacity=10, path=path)
+    buffer.add(1, 2, 0.5, 3, True)
+    buffer.flush()
+
+    loaded = agents.discrete.TrajectoryBuffer.load(path)
+    assert len(loaded) == 1
+    transition = loaded.latest(1)
+    assert (transition.states[0], transition.actions[0], transition.next_states[0]) == (1, 2, 3)
+    assert transition.rewards[0] == 0.5 and transition.dones[0]
+    loaded.add(4, 0, 0, 5, False)
+    assert len(loaded) == 2
+
+
+def test_replay__learns_from_recorded_experience():
+    """
+    Ensure an agent can learn two doors purely from experience recorded by the runner.
+    """
+    env = TwoDoorsTestEnv(p_left=1, p_right=0)
+    buffer = agents.discrete.TrajectoryBuffer(capacity=1000)
+    training.run_environment(agents.discrete.RandomAgent(), env, 50, 100, verbose=False, recorder=buffer)
+    assert len(buffer) == 100
+
+    agent = agents.discrete.TDZeroAgent(gamma=1, alpha=0.5)
+    agent.start_environment(env)
+    agent.values.fill(0)
+    for _ in range(50):
+        agent.replay(buffer.sample(16))
+
+    assert np.isclose(agent.values[START][LEFT], 1, atol=0.01)
+    assert np.isclose(agent.values[START][RIGHT], 0, atol=0.01)
+    assert agent.values[END][LEFT] == 0
+
+
+def test_run_vectorized__records_transitions():
+    """
+    Ensure the batched runner records one transition per env per step.
+    """
+    vector_env = envs.DiscreteVectorEnv.from_env(TwoDoorsTestEnv(p_left=1, p_right=0), num_envs=4)
+    buffer = agents.discrete.TrajectoryBuffer(capacity=100)
+    training.run_vectorized(agents.discrete.TDZeroAgent(1, 0.1), vector_env, 8, 100, verbose=False, recorder=buffer)
+    assert len(buffer) == 16
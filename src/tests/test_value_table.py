@@ -0,0 +1,42 @@
+"""
+Verify the array-backed value table behaves like the old dict-of-dicts
+"""
+from .. import agents
+
+
+def test_value_table__dict_access():
+    """
+    Ensure rows can be read and written with dict-style indexing.
+    """
+    table = agents.discrete.ValueTable(3, 2, initial=0.5)
+    assert table[1][0] == 0.5
+    table[1, 0] += 1
+    assert table[1][0] == 1.5
+    assert table.array[1, 0] == 1.5
+    table[2] = {0: 3, 1: 4}
+    assert table.to_dict()[2] == {0: 3, 1: 4}
+    assert list(table.keys()) == [0, 1, 2]
+    assert len(table) == 3
+
+
+def test_value_table__argmax_prefers_lowest_action_on_ties():
+    """
+    Ensure greedy lookup matches the original scan, which kept the first best action.
+    """
+    table = agents.discrete.ValueTable(2, 3)
+    assert table.argmax(0) == 0
+    table[1] = [0, 2, 2]
+    assert table.argmax(1) == 1
+
+
+def test_value_table__writes_through_table_forget_greedy_action():
+    """
+    Ensure item writes update the cached greedy action, and array writes do once invalidated.
+    """
+    table = agents.discrete.ValueTable(2, 3)
+    assert table.argmax(0) == 0
+    table[0, 2] += 1
+    assert table.argmax(0) == 2
+    table.array[0, 1] = 5
+    table.invalidate(0)
+    assert table.argmax(0) == 1
@@ -0,0 +1,163 @@
+"""
+Verify vectorized environments and the batched runner
+"""
+import numpy as np
+import pytest
+
+from .. import agents, envs, training
+from ..agents.discrete.traces import REPLACING
+from ..envs.two_doors import TwoDoorsTestEnv, START, END, LEFT, RIGHT
+
+
+def test_discrete_vector_env__matches_transition_probabilities():
+    """
+    Ensure the NumPy sampler follows the environment's transition model.
+    """
+    env = TwoDoorsTestEnv(p_left=0.7, p_right=0.2)
+    vector_env = envs.DiscreteVectorEnv.from_env(env, num_envs=20000, seed=1)
+    assert (vector_env.reset() == START).all()
+    _, rewards, dones, _ = vector_env.step(np.full(20000, LEFT))
+    assert abs(rewards.mean() - 0.7) < 0.02
+    assert not dones.any()
+    observations, _, dones, _ = vector_env.step(np.full(20000, RIGHT))
+    assert (observations == END).all()
+    assert dones.all()
+
+
+def assert_learns_two_doors_batched(agent, error, end_error=0, num_envs=16):
+    """
+    Ensure a batched agent learns to prefer the likelier door.
+    Every env starts in the same state, so they all update the same pairs.
+    """
+    env = TwoDoorsTestEnv(p_left=0.8, p_right=0.2)
+    vector_env = envs.DiscreteVectorEnv.from_env(env, num_envs=num_envs, seed=0)
+    agent.seed(0)
+    # The same number of batched steps however many envs there are
+    num_episodes = 250 * num_envs
+    result = training.run_vectorized(agent, vector_env, num_episodes=num_episodes, max_steps=100, verbose=False)
+    assert result.episodes >= num_episodes
+    assert abs(agent.values[START][LEFT] - 0.8) < error
+    assert abs(agent.values[START][RIGHT] - 0.2) < error
+    assert abs(agent.values[END][LEFT]) <= end_error
+
+
+def test_run_vectorized__td_zero():
+    """
+    Ensure the vectorized TD(0) update learns in a batch of envs.
+    """
+    assert_learns_two_doors_batched(agents.discrete.TDZeroAgent(1, 0.1), error=0.2)
+
+
+def test_run_vectorized__td_lambda():
+    """
+    Ensure the vectorized TD(lambda) update learns in a batch of envs.
+    """
+    assert_learns_two_doors_batched(agents.discrete.TDLambdaAgent(1, 0.1, 0.5), error=0.2)
+
+
+def test_run_vectorized__monte_carlo():
+    """
+    Ensure batched Monte Carlo learns in a batch of envs.
+    """
+    assert_learns_two_doors_batched(agents.discrete.MonteCarloAgent(1), error=0.1)
+
+
+def test_run_vectorized__q_learning():
+    """
+    Ensure the vectorized Q-learning update learns in a batch of envs.
+    Q-learning doesn't zero the end state, its values decay towards zero instead.
+    """
+    assert_learns_two_doors_batched(agents.discrete.QLearningAgent(1, 0.1), error=0.2, end_error=1e-6)
+
+
+@pytest.mark.parametrize('agent, end_error', [
+    (agents.discrete.TDZeroAgent(1, 0.1), 0),
+    (agents.discrete.TDLambdaAgent(1, 0.1, 0.5), 0),
+    (agents.discrete.QLearningAgent(1, 0.1), 1e-6),
+])
+def test_run_vectorized__many_envs_share_pairs(agent, end_error):
+    """
+    Ensure updates to a pair from many envs in one step don't add up to a huge step.
+    """
+    assert_learns_two_doors_batched(agent, error=0.2, end_error=end_error, num_envs=256)
+
+
+def test_run_vectorized__fallback():
+    """
+    Ensure agents without a vectorized update still work through the fallback.
+    """
+    assert_learns_two_doors_batched(agents.discrete.PrioritizedSweepingAgent(1), error=0.1)
+
+
+class SixStates:
+    class observation_space:
+        n = 6
+
+    class action_space:
+        n = 2
+
+
+class FixedPolicy:
+    """
+    Always takes action state % 2, so single and batched runs act the same
+    """
+
+    def start_environment(self, agent):
+        pass
+
+    def start_episode(self, episode):
+        pass
+
+    def get_epsilon(self, state=None):
+        return None
+
+    def select(self, agent, state):
+        return state % 2
+
+    def select_batch(self, agent, states):
+        return np.asarray(states) % 2
+
+
+# Observations and rewards of two episodes which visit different states
+EPISODE_A = [0, 1, 0, 2], [0, 0, 1]
+EPISODE_B = [3, 4, 4, 5], [0, 1, 0]
+
+
+def run_single(agent, episodes):
+    agent.start_environment(SixStates)
+    for observations, rewards in episodes:
+        agent.start_episode()
+        for observation, reward in zip(observations, rewards):
+            agent.observe(observation)
+            agent.get_next_action()
+            agent.receive_reward(reward)
+        agent.finish_episode(observations[-1])
+
+
+def run_batched(agent, episodes):
+    agent.start_environment(SixStates)
+    agent.start_batch(len(episodes))
+    all_envs = np.arange(len(episodes))
+    agent.start_episodes(all_envs)
+    observations, rewards = np.array([e[0] for e in episodes]), np.array([e[1] for e in episodes], dtype=float)
+    for t in range(rewards.shape[1]):
+        agent.get_next_actions(observations[:, t])
+        agent.receive_rewards(rewards[:, t])
+    return agent.finish_episodes(all_envs, observations[:, -1])
+
+
+@pytest.mark.parametrize('make_agent', [
+    lambda: agents.discrete.TDLambdaAgent(0.9, 0.1, 0.8, exploration=FixedPolicy()),
+    lambda: agents.discrete.TDLambdaAgent(0.9, 0.1, 0.8, trace=REPLACING, exploration=FixedPolicy()),
+    lambda: agents.discrete.MonteCarloAgent(0.9, first_visit=True, exploration=FixedPolicy()),
+    lambda: agents.discrete.QLearningAgent(0.9, 0.1, exploration=FixedPolicy()),
+])
+def test_batched_updates__match_single_env_updates(make_agent):
+    """
+    Ensure batched agents learn what they would one environment at a time,
+    with each environment's episode state, like eligibility traces, kept apart.
+    """
+    single, batched = make_agent(), make_agent()
+    run_single(single, [EPISODE_A, EPISODE_B])
+    assert run_batched(batched, [EPISODE_A, EPISODE_B]).tolist() == [1, 1]
+    assert np.allclose(single.values.array, batched.values.array)
@@ -0,0 +1,7 @@
+from .runner import run_environment, run_vectorized, run_remote, seed_run, RunResult
+from .evaluation import (
+    freeze_policy, evaluate_policy, evaluate_agent, PeriodicEvaluator, EvaluationResult,
+)
+from .telemetry import Telemetry, read_telemetry
+from .parallel import run_parallel
+from .convergence import ConvergenceMonitor, ConvergenceCheck
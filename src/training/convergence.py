@@ -0,0 +1,100 @@
+"""
+Decide when training has stopped getting anywhere, so runs can stop early
+instead of waiting for a noisy solved threshold or using up every episode.
+
+Every `period` episodes the monitor compares the agent with the last check:
+
+- how many states' greedy actions changed
+- the biggest change to any action value
+- whether the returns of the last 100 episodes are significantly better than
+  those at the last check, by a one sided Welch z-test
+
+A check where nothing is changing much counts as a plateau, and training
+has converged after `patience` plateaus in a row.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from .evaluation import freeze_policy
+
+ConvergenceCheck = namedtuple('ConvergenceCheck', [
+    'episode', 'policy_changes', 'max_value_change', 'return_improvement', 'p_value', 'is_plateau',
+])
+
+
+def improvement_p_value(old_returns, new_returns):
+    """
+    Probability of seeing at least this much improvement in mean return by chance,
+    if the returns weren't really getting better
+    """
+    if len(old_returns) < 2 or len(new_returns) < 2:
+        return 1.0
+
+    improvement = np.mean(new_returns) - np.mean(old_returns)
+    std_error = math.sqrt(np.var(old_returns, ddof=1) / len(old_returns) + np.var(new_returns, ddof=1) / len(new_returns))
+    if std_error == 0:
+        return 0.0 if improvement > 0 else 1.0
+
+    return 0.5 * math.erfc(improvement / std_error / math.sqrt(2))
+
+
+class ConvergenceMonitor:
+    """
+    Watches the agent every `period` episodes and says when it has converged.
+    A check is a plateau when at most `max_policy_changes` greedy actions changed,
+    no value moved more than `value_tolerance`, and returns didn't improve at the
+    `significance` level. Set a criterion to None to ignore it.
+    """
+
+    def __init__(self, period=1000, max_policy_changes=0, value_tolerance=0.1, significance=0.05, patience=5):
+        self.period = period
+        self.max_policy_changes = max_policy_changes
+        self.value_tolerance = value_tolerance
+        self.significance = significance
+        self.patience = patience
+        self.checks = []
+        self.policy = None
+        self.values = None
+        self.returns = []
+
+    @property
+    def converged(self):
+        recent = self.checks[-self.patience:]
+        return len(recent) == self.patience and all(check.is_plateau for check in recent)
+
+    def step(self, agent, episode, returns):
+        """
+        Check the agent, given the recent episode returns,
+        returns whether training has converged
+        """
+        policy = freeze_policy(agent)
+        table = getattr(agent, 'values', None)
+        values = table.array.copy() if table is not None else None
+        returns = list(returns)
+        if self.policy is None:
+            # Nothing to compare with yet
+            self.policy, self.values, self.returns = policy, values, returns
+            return False
+
+        policy_changes = int((policy != self.policy).sum())
+        max_value_change = float(np.abs(values - self.values).max()) if values is not None else 0.0
+        improvement = float(np.mean(returns) - np.mean(self.returns)) if returns and self.returns else 0.0
+        p_value = improvement_p_value(self.returns, returns)
+        is_plateau = (
+            (self.max_policy_changes is None or policy_changes <= self.max_policy_changes)
+            and (self.value_tolerance is None or max_value_change <= self.value_tolerance)
+            and (self.significance is None or p_value > self.significance)
+        )
+        self.checks.append(ConvergenceCheck(episode, policy_changes, max_value_change, improvement, p_value, is_plateau))
+        self.policy, self.values, self.returns = policy, values, returns
+        return self.converged
+
+    def report(self):
+        check = self.checks[-1]
+        print('Converged after {} episodes: {} greedy actions changed, values moved at most {:.4f}, '
+              'return changed by {:.3f} (p={:.2f})'.format(
+                  check.episode, check.policy_changes, check.max_value_change,
+                  check.return_improvement, check.p_value,
+              ))
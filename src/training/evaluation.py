@@ -0,0 +1,144 @@
+"""
+Evaluate an agent's greedy policy, without exploration noise,
+using the environment's transition model to roll out many episodes at once
+"""
+import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .. import seeding
+from ..envs.tables import TransitionTable
+
+EvaluationResult = namedtuple('EvaluationResult', ['mean', 'std', 'ci_low', 'ci_high', 'num_episodes'])
+
+# z-score for a 95% confidence interval
+Z_95 = 1.96
+
+
+def freeze_policy(agent):
+    """
+    Snapshot the agent's greedy policy as a state -> action array
+    """
+    values = getattr(agent, 'values', None)
+    if values is not None:
+        return values.array.argmax(axis=1)
+
+    return np.array([agent.get_action_greedily(s) for s in agent.states], dtype=np.int64)
+
+
+def rollout(policy, table, num_episodes, max_steps, seed=None):
+    """
+    Run num_episodes episodes of a fixed policy in lockstep,
+    returns an array with the return of each episode
+    """
+    rng = np.random.default_rng(seed)
+    states = table.sample_initial(rng.random(num_episodes))
+    returns = np.zeros(num_episodes)
+    active = np.arange(num_episodes)
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+
+        actions = policy[states[active]]
+        next_states, rewards, dones = table.sample(states[active], actions, rng.random(len(active)))
+        returns[active] += rewards
+        states[active] = next_states
+        active = active[~dones]
+
+    return returns
+
+
+def summarize(returns):
+    """
+    Mean return with a normal approximation 95% confidence interval
+    """
+    count = len(returns)
+    mean = float(np.mean(returns))
+    std = float(np.std(returns, ddof=1)) if count > 1 else 0.0
+    half_width = Z_95 * std / math.sqrt(count)
+    return EvaluationResult(mean, std, mean - half_width, mean + half_width, count)
+
+
+def evaluate_policy(policy, table, num_episodes, max_steps, seed=0, workers=1):
+    """
+    Evaluate a frozen policy over num_episodes episodes, split across worker processes,
+    each with its own random stream spawned from `seed`
+    """
+    if workers <= 1:
+        return summarize(rollout(policy, table, num_episodes, max_steps, seed))
+
+    chunks = np.array_split(np.arange(num_episodes), workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(rollout, policy, table, len(chunk), max_steps, child)
+            for chunk, child in zip(chunks, seeding.spawn(seed, workers))
+        ]
+        returns = np.concatenate([future.result() for future in futures])
+
+    return summarize(returns)
+
+
+def evaluate_agent(agent, env, num_episodes=1000, max_steps=100, seed=0, workers=1):
+    """
+    Evaluate an agent's greedy policy in an environment with a transition model
+    """
+    table = TransitionTable.from_env(env)
+    return evaluate_policy(freeze_policy(agent), table, num_episodes, max_steps, seed, workers)
+
+
+class PeriodicEvaluator:
+    """
+    Evaluates the greedy policy every `period` training episodes in a background
+    process pool, so training carries on while the rollouts run.
+    """
+
+    def __init__(self, env, period=1000, num_episodes=1000, max_steps=100, workers=1, seed=0):
+        self.table = TransitionTable.from_env(env)
+        self.period = period
+        self.num_episodes = num_episodes
+        self.max_steps = max_steps
+        self.seed = seed
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.pending = []
+        self.results = []  # (episode, EvaluationResult) pairs
+
+    def step(self, agent, episode):
+        """
+        Called after each training episode, submits an evaluation when one is due
+        Returns any evaluations which have finished since the last call
+        """
+        if episode % self.period == 0:
+            policy = freeze_policy(agent)
+            future = self.executor.submit(
+                evaluate_policy, policy, self.table, self.num_episodes, self.max_steps, [self.seed, episode],
+            )
+            self.pending.append((episode, future))
+
+        return self.collect()
+
+    def collect(self, wait=False):
+        """
+        Gather finished evaluations, optionally waiting for all of them
+        """
+        finished = []
+        still_pending = []
+        for episode, future in self.pending:
+            if wait or future.done():
+                finished.append((episode, future.result()))
+            else:
+                still_pending.append((episode, future))
+
+        self.pending = still_pending
+        self.results.extend(finished)
+        return finished
+
+    def close(self):
+        """
+        Wait for outstanding evaluations and shut down the workers
+        Returns any evaluations which finished
+        """
+        finished = self.collect(wait=True)
+        self.executor.shutdown()
+        return finished
@@ -0,0 +1,140 @@
+"""
+Hogwild style parallel training: several worker processes run episodes in their
+own copies of the environment, and all update one action-value table in shared
+memory, without locks. Tabular updates touch one or a few entries at a time,
+so workers rarely step on each other, and when they do, one update is lost.
+
+Only the agent's `values` table is shared. Anything else an agent learns,
+like Monte Carlo visit counts or a replay buffer, is kept per worker.
+"""
+import ctypes
+import multiprocessing
+import queue
+from collections import deque
+
+import numpy as np
+
+from .. import seeding
+from ..agents.discrete.value_table import UncachedValueTable
+from .runner import RunResult, run_episode, seed_run, is_solved_by
+
+# Workers report their returns to the coordinator every this many episodes
+RETURNS_BATCH_SIZE = 20
+
+
+def share_values(agent):
+    """
+    Move the agent's values into shared memory, returns the shared buffer
+    """
+    shape = agent.values.array.shape
+    shared = multiprocessing.RawArray(ctypes.c_double, int(np.prod(shape)))
+    array = np.frombuffer(shared).reshape(shape)
+    array[:] = agent.values.array
+    agent.values = UncachedValueTable.from_array(array)
+    return shared
+
+
+def train_worker(agent, make_env, shared, seed, max_steps, num_episodes, claimed, stop, results):
+    """
+    Run episodes until `num_episodes` have been claimed between all the workers,
+    or the coordinator says stop
+    """
+    env = make_env()
+    seed_run(agent, env, seed)
+
+    shape = agent.values.array.shape
+    agent.start_environment(env)
+    agent.values = UncachedValueTable.from_array(np.frombuffer(shared).reshape(shape))
+    returns, run = [], 0
+    while not stop.is_set():
+        with claimed.get_lock():
+            episode = claimed.value
+            if episode >= num_episodes:
+                break
+            claimed.value += 1
+
+        # Decay exploration with the episodes run by every worker
+        agent.episodes = episode
+        agent.start_episode()
+        run_episode(agent, env, env.reset(), max_steps, returns)
+        run += 1
+        if run >= RETURNS_BATCH_SIZE:
+            results.put((run, returns))
+            returns, run = [], 0
+
+    results.put((run, returns))
+    results.put(None)
+
+
+def run_parallel(agent, make_env, num_episodes, max_steps, workers=2, solved=None, report_period=1000,
+                 verbose=True, seed=None):
+    """
+    Train the agent with `workers` processes, each running episodes in its own `make_env()`,
+    stopping early once the average return over the last 100 episodes reaches `solved`.
+    `make_env` is called in the workers, so must be picklable where processes are spawned.
+    The agent's values are copied back when training finishes.
+    """
+    env = make_env()
+    agent.start_environment(env)
+    local_values = agent.values
+    shared = share_values(agent)
+    # Forked workers would otherwise share the agent's random stream
+    worker_seeds = seeding.spawn(seed, workers)
+
+    claimed = multiprocessing.Value(ctypes.c_long, 0)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=train_worker,
+            args=(agent, make_env, shared, worker_seed, max_steps, num_episodes, claimed, stop, results),
+            daemon=True,
+        )
+        for worker_seed in worker_seeds
+    ]
+    for process in processes:
+        process.start()
+
+    returns = deque(maxlen=100)
+    average_return, is_solved, completed, running = 0, False, 0, workers
+    try:
+        while running:
+            try:
+                batch = results.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError('Parallel training workers exited unexpectedly')
+                continue
+
+            if batch is None:
+                running -= 1
+                continue
+
+            if is_solved:
+                # Episodes which finished after solving don't count
+                continue
+
+            run, batch_returns = batch
+            prev_completed, completed = completed, completed + run
+            returns.extend(batch_returns)
+            average_return = sum(returns) / float(len(returns)) if returns else 0
+            is_solved = is_solved_by(returns, average_return, solved)
+            if is_solved:
+                stop.set()
+
+            if verbose and (is_solved or completed // report_period > prev_completed // report_period):
+                print('Average return of ', average_return, 'in episode', completed)
+                if is_solved:
+                    print('Solved!')
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    local_values.array[:] = agent.values.array
+    local_values.invalidate()
+    agent.values = local_values
+    agent.episodes += completed
+    return RunResult(completed, average_return, is_solved)
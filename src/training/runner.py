@@ -0,0 +1,339 @@
+"""
+Run an agent through an environment for many episodes
+"""
+import os
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .. import seeding
+from ..envs.remote import RemoteVectorEnv
+from .telemetry import clock
+
+RunResult = namedtuple('RunResult', ['episodes', 'average_return', 'solved', 'converged'], defaults=[False])
+
+
+def run_environment(agent, env, num_episodes, max_steps, solved=None, report_period=1000,
+                    render=False, verbose=True, recorder=None,
+                    checkpoint_path=None, checkpoint_period=None, resume=False, evaluator=None,
+                    telemetry=None, show_values=False, seed=None, monitor=None):
+    """
+    Run the agent through the environment one step at a time,
+    stopping early once the average return over 100 episodes reaches `solved`.
+    Every transition is stored in `recorder`, if given.
+
+    The agent is saved to `checkpoint_path` every `checkpoint_period` episodes
+    and at the end of the run. With `resume`, training carries on from the
+    checkpoint if there is one.
+
+    An `evaluator` (see evaluation.PeriodicEvaluator) is given the agent
+    after every episode, and evaluates its greedy policy in the background.
+
+    A `telemetry` (see telemetry.Telemetry) is given timings and stats for each
+    step and episode. Reports only print the agent's values with `show_values`.
+
+    A `monitor` (see convergence.ConvergenceMonitor) checks the agent every so
+    often, and training stops once it says learning has plateaued.
+
+    Given a `seed`, the agent and the environment are seeded with independent
+    streams spawned from it, so the run can be repeated exactly.
+    """
+    if seed is not None:
+        seed_run(agent, env, seed)
+
+    agent.start_environment(env)
+    returns = deque(maxlen=100)
+    average_return, is_solved, is_converged, k = 0, False, False, -1
+    first_episode = 0
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        first_episode = load_checkpoint(agent, checkpoint_path, returns)
+        k = first_episode - 1
+        average_return = sum(returns) / float(len(returns)) if returns else 0
+
+    for k in range(first_episode, num_episodes):
+        agent.start_episode()
+        observation = env.reset()
+        if telemetry is None:
+            length = run_episode(agent, env, observation, max_steps, returns, recorder, render, k)
+        else:
+            length = run_episode_timed(agent, env, observation, max_steps, returns, recorder, telemetry)
+
+        average_return = sum(returns) / float(len(returns)) if returns else 0
+        is_solved = is_solved_by(returns, average_return, solved)
+        if telemetry is not None:
+            telemetry.record_episodes(k + 1, length, agent, average_return)
+
+        if verbose and (is_solved or (k + 1) % report_period == 0):
+            if show_values:
+                agent.print_values()
+
+            print('Average return of ', average_return, 'in episode', k + 1)
+            if is_solved:
+                print('Solved!')
+
+        if is_solved:
+            break
+
+        if checkpoint_path and checkpoint_period and (k + 1) % checkpoint_period == 0:
+            save_checkpoint(agent, checkpoint_path, k + 1, returns)
+
+        if evaluator is not None:
+            report_evaluations(evaluator.step(agent, k + 1), verbose)
+
+        if monitor is not None and (k + 1) % monitor.period == 0:
+            is_converged = monitor.step(agent, k + 1, returns)
+            if is_converged:
+                if verbose:
+                    monitor.report()
+                break
+
+    if checkpoint_path:
+        save_checkpoint(agent, checkpoint_path, k + 1, returns)
+
+    if evaluator is not None:
+        report_evaluations(evaluator.collect(wait=True), verbose)
+
+    return RunResult(k + 1, average_return, is_solved, is_converged)
+
+
+def run_episode(agent, env, observation, max_steps, returns, recorder=None, render=False, k=0):
+    """
+    Step through one episode, adding its return to `returns` if it finishes
+    Returns the number of steps taken
+    """
+    for t in range(max_steps):
+        if render:
+            display(env, agent, t, k)
+
+        agent.observe(observation)
+        action = agent.get_next_action()
+        prev_observation = observation
+        observation, reward, done, info = env.step(action)
+        agent.receive_reward(reward)
+        if recorder is not None:
+            recorder.add(prev_observation, action, reward, observation, done)
+        if done:
+            if render:
+                display(env, agent, t, k)
+
+            returns.append(agent.finish_episode(observation))
+            return t + 1
+
+    return max_steps
+
+
+def run_episode_timed(agent, env, observation, max_steps, returns, recorder, telemetry):
+    """
+    Like run_episode, but timing each phase of every step for `telemetry`
+    """
+    for t in range(max_steps):
+        started = clock()
+        agent.observe(observation)
+        observed = clock()
+        action = agent.get_next_action()
+        acted = clock()
+        prev_observation = observation
+        observation, reward, done, info = env.step(action)
+        stepped = clock()
+        agent.receive_reward(reward)
+        if recorder is not None:
+            recorder.add(prev_observation, action, reward, observation, done)
+        if done:
+            returns.append(agent.finish_episode(observation))
+
+        updated = clock()
+        # Observing counts as part of the agent's update
+        update_seconds = (observed - started) + (updated - stepped)
+        telemetry.record_step(stepped - acted, acted - observed, update_seconds, agent)
+        if done:
+            return t + 1
+
+    return max_steps
+
+
+def run_vectorized(agent, vector_env, num_episodes, max_steps, solved=None, report_period=1000,
+                   verbose=True, recorder=None,
+                   checkpoint_path=None, checkpoint_period=None, resume=False, evaluator=None,
+                   telemetry=None, seed=None, monitor=None):
+    """
+    Run the agent through every copy of a vectorized environment in lockstep.
+    Finished environments are reset individually, while the others carry on.
+    Vector environments with `step_async` and `step_wait`, like RemoteVectorEnv,
+    aren't kept in lockstep: each step goes on with whichever environments have replied.
+    Every transition is stored in `recorder`, if given, and checkpoints,
+    evaluation, telemetry, seeding and convergence monitoring work like they do
+    in `run_environment`.
+    """
+    if seed is not None:
+        seed_run(agent, vector_env, seed)
+
+    num_envs = vector_env.num_envs
+    all_envs = np.arange(num_envs)
+    agent.start_environment(vector_env)
+    agent.start_batch(num_envs)
+    returns = deque(maxlen=100)
+    average_return, is_solved, is_converged, completed = 0, False, False, 0
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        completed = load_checkpoint(agent, checkpoint_path, returns)
+        average_return = sum(returns) / float(len(returns)) if returns else 0
+
+    observations = vector_env.reset()
+    agent.start_episodes(all_envs)
+    steps = np.zeros(num_envs, dtype=np.int64)
+    is_async = hasattr(vector_env, 'step_wait')
+    actions = np.zeros(num_envs, dtype=np.int64)
+    # The environments which act next, None for all of them
+    ready = None
+    while completed < num_episodes and not is_solved and not is_converged:
+        if telemetry is not None:
+            started = clock()
+
+        if ready is None:
+            actions = agent.get_next_actions(observations)
+        else:
+            actions[ready] = agent.get_next_actions(observations[ready], ready)
+        if telemetry is not None:
+            acted = clock()
+
+        if is_async:
+            sent = all_envs if ready is None else ready
+            vector_env.step_async(sent, actions[sent])
+            ready, next_observations, rewards, dones, infos = vector_env.step_wait()
+            if len(ready) == num_envs:
+                ready = None
+        else:
+            next_observations, rewards, dones, infos = vector_env.step(actions)
+        if telemetry is not None:
+            stepped = clock()
+
+        agent.receive_rewards(rewards, ready)
+        num_stepped = len(rewards)
+        if ready is None:
+            if recorder is not None:
+                recorder.add_batch(observations, actions, rewards, next_observations, dones)
+            observations = next_observations
+            steps += 1
+            timed_out = steps >= max_steps
+            stepped_ids = all_envs
+        else:
+            if recorder is not None:
+                recorder.add_batch(observations[ready], actions[ready], rewards, next_observations, dones)
+            observations[ready] = next_observations
+            steps[ready] += 1
+            timed_out = steps[ready] >= max_steps
+            stepped_ids = ready
+        if not (dones.any() or timed_out.any()):
+            if telemetry is not None:
+                telemetry.record_step(stepped - acted, acted - started, clock() - stepped, agent, num_stepped)
+            continue
+
+        # Like the single env runner, episodes cut off by max_steps are not finished
+        done_ids = stepped_ids[dones]
+        if len(done_ids):
+            returns.extend(agent.finish_episodes(done_ids, observations[done_ids]).tolist())
+
+        restart_ids = stepped_ids[dones | timed_out]
+        if telemetry is not None:
+            telemetry.record_step(stepped - acted, acted - started, clock() - stepped, agent, num_stepped)
+            lengths = int(steps[restart_ids].sum())
+
+        observations[restart_ids] = vector_env.reset_envs(restart_ids)
+        agent.start_episodes(restart_ids)
+        steps[restart_ids] = 0
+
+        prev_completed, completed = completed, completed + len(restart_ids)
+        average_return = sum(returns) / float(len(returns)) if returns else 0
+        is_solved = is_solved_by(returns, average_return, solved)
+        if telemetry is not None:
+            telemetry.record_episodes(completed, lengths, agent, average_return, len(restart_ids))
+
+        is_report = completed // report_period > prev_completed // report_period
+        if verbose and (is_solved or is_report):
+            print('Average return of ', average_return, 'in episode', completed)
+            if is_solved:
+                print('Solved!')
+
+        if checkpoint_path and checkpoint_period:
+            if completed // checkpoint_period > prev_completed // checkpoint_period:
+                save_checkpoint(agent, checkpoint_path, completed, returns)
+
+        if evaluator is not None:
+            if completed // evaluator.period > prev_completed // evaluator.period:
+                # Several episodes finish at once, evaluate as if at the last period boundary
+                report_evaluations(evaluator.step(agent, completed - completed % evaluator.period), verbose)
+            else:
+                report_evaluations(evaluator.collect(), verbose)
+
+        if monitor is not None and completed // monitor.period > prev_completed // monitor.period:
+            is_converged = monitor.step(agent, completed, returns)
+            if is_converged and verbose:
+                monitor.report()
+
+    if checkpoint_path:
+        save_checkpoint(agent, checkpoint_path, completed, returns)
+
+    if evaluator is not None:
+        report_evaluations(evaluator.collect(wait=True), verbose)
+
+    return RunResult(completed, average_return, is_solved, is_converged)
+
+
+def run_remote(agent, host, port, num_envs, num_episodes, max_steps, **kwargs):
+    """
+    Run the agent through num_envs sessions with an environment server (see envs.remote),
+    which are stepped concurrently. Takes the same options as `run_vectorized`.
+    """
+    vector_env = RemoteVectorEnv(host, port, num_envs)
+    try:
+        return run_vectorized(agent, vector_env, num_episodes, max_steps, **kwargs)
+    finally:
+        vector_env.close()
+
+
+def seed_run(agent, env, seed):
+    """
+    Seed an agent and an environment (or vector environment) from one root seed
+    """
+    agent_seed, env_seed = seeding.spawn(seed, 2)
+    agent.seed(agent_seed)
+    env.seed(seeding.to_int(env_seed))
+
+
+def report_evaluations(evaluations, verbose):
+    if not verbose:
+        return
+
+    for episode, result in evaluations:
+        print('Greedy policy return of {:.3f} (95% CI {:.3f} - {:.3f}) in episode {}'.format(
+            result.mean, result.ci_low, result.ci_high, episode,
+        ))
+
+
+def save_checkpoint(agent, path, episode, returns):
+    agent.save(path, episode=episode, returns=np.array(returns, dtype=float))
+
+
+def load_checkpoint(agent, path, returns):
+    """
+    Restore the agent and the recent returns, returns the number of episodes already run
+    """
+    extra = agent.load(path)
+    returns.extend(extra['returns'].tolist())
+    return int(extra['episode'])
+
+
+def is_solved_by(returns, average_return, solved):
+    """
+    Solved means averaging at least `solved` over a full window of episodes
+    """
+    return solved is not None and len(returns) == returns.maxlen and average_return >= solved
+
+
+def display(env, agent, t, k):
+    print('EPISODE:\t', k)
+    print('TIME:\t\t', t)
+    print('EPSILON:\t', agent.get_epsilon())
+    agent.print_values()
+    env.render()
+    input()
+    print(chr(27) + "[2J")
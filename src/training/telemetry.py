@@ -0,0 +1,109 @@
+"""
+Opt-in training metrics, written as a stream of JSON lines.
+
+The runners time each phase of a step: env.step, the agent picking an action,
+and the agent updating (observing, receiving rewards and finishing episodes).
+Every `period` episodes, one line sums up the period:
+
+    {"episode": 2000, "episodes": 1000, "steps": 7604, "mean_length": 7.6,
+     "seconds": {"step": 0.021, "action": 0.008, "update": 0.019},
+     "td_error": 0.031, "epsilon": 0.048, "average_return": 0.71}
+
+When the runners aren't given a Telemetry, none of this is measured.
+"""
+import json
+import time
+
+PHASES = ('step', 'action', 'update')
+
+clock = time.perf_counter
+
+
+class Telemetry:
+    """
+    Accumulates step timings and episode stats, and writes a summary line
+    to `path` (or the file-like `stream`) every `period` episodes.
+    """
+
+    def __init__(self, path=None, stream=None, period=100):
+        assert path or stream, 'Telemetry needs a path or a stream to write to'
+        self.path = path
+        self.stream = stream or open(path, 'a')
+        self.period = period
+        self.records = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Start a new period
+        """
+        self.episodes = 0
+        self.steps = 0
+        self.length_total = 0
+        self.step_seconds = 0.0
+        self.action_seconds = 0.0
+        self.update_seconds = 0.0
+        self.td_error_total = 0.0
+        self.td_error_count = 0
+
+    def record_step(self, step_seconds, action_seconds, update_seconds, agent, count=1):
+        """
+        Add the timings of one step, of `count` environments at once,
+        along with the agent's latest TD error, which is then cleared
+        so it's only counted once.
+        """
+        self.steps += count
+        self.step_seconds += step_seconds
+        self.action_seconds += action_seconds
+        self.update_seconds += update_seconds
+        td_error = agent.td_error
+        if td_error is not None:
+            self.td_error_total += abs(td_error)
+            self.td_error_count += 1
+            agent.td_error = None
+
+    def record_episodes(self, episode, length_total, agent, average_return, count=1):
+        """
+        Add `count` finished episodes, which took `length_total` steps between them.
+        Writes a line once a period's worth of episodes have finished.
+        """
+        self.episodes += count
+        self.length_total += length_total
+        if episode // self.period > (episode - count) // self.period:
+            self.write(episode, agent, average_return)
+
+    def write(self, episode, agent, average_return):
+        record = {
+            'episode': episode,
+            'episodes': self.episodes,
+            'steps': self.steps,
+            'mean_length': self.length_total / self.episodes if self.episodes else 0,
+            'seconds': {
+                'step': self.step_seconds,
+                'action': self.action_seconds,
+                'update': self.update_seconds,
+            },
+            'td_error': self.td_error_total / self.td_error_count if self.td_error_count else None,
+            'epsilon': agent.get_epsilon() if hasattr(agent, 'get_epsilon') else None,
+            'average_return': average_return,
+        }
+        self.stream.write(json.dumps(record) + '\n')
+        self.records += 1
+        self.reset()
+
+    def close(self):
+        """
+        Flush the stream, closing it if we opened it
+        """
+        if self.path:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+def read_telemetry(path):
+    """
+    Load a telemetry stream as a list of dicts
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]